@@ -17,9 +17,9 @@ if "bpy" in locals():
         importlib.reload(module)
 else:
     import bpy
-    from ST2 import importer, operations, properties, typesetter, search, exporting, font, util, interpolation
+    from ST2 import importer, operations, properties, typesetter, search, exporting, font, util, interpolation, sources, scripting, sandbox, watching, dependencies, fontindex, warmup, prefetch, fontcache, compiled, meshcache, collision, instancing
 
-modules = [importer, properties, operations, typesetter, search, exporting, font, util, interpolation]
+modules = [importer, properties, operations, typesetter, search, exporting, font, util, interpolation, sources, scripting, sandbox, watching, dependencies, fontindex, warmup, prefetch, fontcache, compiled, meshcache, collision, instancing]
 
 
 if importer.C is not None:
@@ -68,7 +68,7 @@ class ST2DefaultPanel(bpy.types.Panel):
             if util.on_mac():
                 row.operator("st2.search_font", text="", icon="VIEWZOOM")
             
-            row.label(text=f"{font.names()[0]}")
+            row.label(text=fontindex.display_name(data.font_path))
 
             if not data.enable_font_search:
                 row.operator("st2.load_prev_font", text="", icon="TRIA_LEFT")
@@ -124,6 +124,10 @@ class ST2MainPanel(bpy.types.Panel):
             row = self.layout.row()
             row.prop(st2, "text_file", text="File")
             row.operator("st2.refresh_settings", text="", icon="FILE_REFRESH")
+            if context.scene.st2.script_watch:
+                row.operator("st2.cancel_watch_source", text="", icon="CANCEL")
+            else:
+                row.operator("st2.watch_source", text="", icon="MONKEY")
         elif st2.text_mode == "BLOCK":
             row = self.layout.row()
             row.prop(st2, "text_block", text="Block")
@@ -166,11 +170,16 @@ class ST2ScriptPanel(bpy.types.Panel):
 
         row.operator("st2.refresh_settings", text="", icon="FILE_REFRESH")
 
-        if False:
-            if context.scene.st2.script_watch:
-                row.operator("st2.cancel_watch_source", text="", icon="CANCEL")
-            else:
-                row.operator("st2.watch_source", text="", icon="MONKEY")
+        row = self.layout.row()
+        row.prop(data, "script_sandboxed", text="Sandboxed", icon="LOCKED")
+        col = row.column()
+        col.enabled = data.script_sandboxed
+        col.prop(data, "script_timeout", text="Timeout")
+
+        if context.scene.st2.script_watch:
+            row.operator("st2.cancel_watch_source", text="", icon="CANCEL")
+        else:
+            row.operator("st2.watch_source", text="", icon="MONKEY")
 
 
 class ST2FontPanel(bpy.types.Panel):
@@ -188,13 +197,8 @@ class ST2FontPanel(bpy.types.Panel):
     def draw(self, context):
         ko = search.active_key_object(context)
         data = ko.st2
-        font = data.font()
-
-        mesh = None
-        try:
-            mesh = font.font.ttFont["MESH"]
-        except KeyError:
-            pass
+        meta = data.font_metadata()
+        mesh = meta.mesh
     
         row = self.layout.row()
         
@@ -202,7 +206,10 @@ class ST2FontPanel(bpy.types.Panel):
         if util.on_mac():
             row.operator("st2.search_font", text="", icon="VIEWZOOM")
         
-        row.label(text=f"{font.names()[0]}")
+        if data.font_path:
+            row.label(text=fontindex.display_name(data.font_path))
+        else:
+            row.label(text=meta.display_name)
         
         row.operator("st2.refresh_settings", text="", icon="FILE_REFRESH")
         if not data.enable_font_search:
@@ -222,6 +229,9 @@ class ST2FontPanel(bpy.types.Panel):
         if mesh:
             if data.use_mesh:
                 self.layout.row().operator("st2.convert_mesh_to_flat", text="Convert Mesh to Outlines")
+                row = self.layout.row()
+                row.prop(data, "mesh_lod", text="Detail", expand=True)
+                row.prop(data, "mesh_lod_render_full", text="", icon="RESTRICT_RENDER_OFF")
             else:
                 self.layout.row().operator("st2.convert_flat_to_mesh", text="Convert Outlines to Mesh")
 
@@ -268,8 +278,28 @@ class ST2GlobalPanel(bpy.types.Panel):
         return importer.C is not None
     
     def draw(self, context):
+        if warmup.in_progress():
+            self.layout.row().label(text=warmup.progress_text(), icon="TIME")
+
         row = self.layout.row()
         row.prop(context.scene.st2, "live_updating", text="Frame Updating")
+        row.operator("st2.refresh_settings", text="Rebuild All", icon="FILE_REFRESH").full = True
+
+        row = self.layout.row()
+        row.label(text=f"Font Cache: {fontcache.count()} fonts, ~{fontcache.total()/1024/1024:.0f} MB")
+        row.prop(context.scene.st2, "font_cache_budget", text="Budget (MB)")
+
+        row = self.layout.row()
+        resident = fontcache.resident()
+        if resident is not None:
+            row.label(text=f"Measured: {resident/1024/1024:.0f} MB resident")
+        else:
+            row.label(text="Measured: -")
+        row.prop(context.scene.st2, "large_font_size", text="Large (MB)")
+
+        row = self.layout.row()
+        row.label(text=f"Mesh Cache: {meshcache.count()} glyphs, ~{meshcache.total()/1024/1024:.0f} MB")
+        row.prop(context.scene.st2, "mesh_cache_budget", text="Budget (MB)")
 
         self.layout.row().label(text="New Objects")
         self.layout.row().prop(context.scene.st2, "interpolator_style", text="Interpolate")
@@ -339,6 +369,9 @@ def register():
 
     util.clear_frame_changers(properties.update_type_and_copy)
     util.ensure_frame_changer(frame_changers, properties.update_type_frame_change)
+    util.ensure_frame_changer(bpy.app.handlers.load_post, warmup.warm_fonts_on_load)
+
+    meshcache.start()
 
 
 def unregister():
@@ -350,5 +383,13 @@ def unregister():
 
     util.clear_frame_changers(properties.update_type_frame_change)
 
+    util.clear_handler(bpy.app.handlers.load_post, warmup.warm_fonts_on_load)
+
+    sandbox.shutdown()
+    fontindex.close()
+    warmup.shutdown()
+    prefetch.shutdown()
+    meshcache.shutdown()
+
 if __name__ == "__main__":
     register()
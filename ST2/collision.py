@@ -0,0 +1,104 @@
+import bpy
+
+from ST2 import tessellate
+
+
+PROXY_PREFIX = "ST2.Collision"
+PROXY_TOLERANCE = 0.02 # of each glyph's size; collisions don't need smooth curves
+
+
+def proxy_key(recordings, extrude, bevel, max_parts):
+    """A key for the proxies of some outlines (RecordingPen values) & the corner they're normalized to, so repeated glyphs share proxies wherever they sit"""
+    return tessellate.outline_key(recordings, "collision", round(extrude, 5), round(bevel, 5), max_parts, PROXY_TOLERANCE)
+
+
+def prism(name, polygon, depth):
+    """A mesh of a convex polygon, extruded `depth` either side of z=0"""
+    k = len(polygon)
+    vertices = [(x, y, depth) for x, y in polygon] + [(x, y, -depth) for x, y in polygon]
+    faces = [list(range(k)), list(range(2*k-1, k-1, -1))]
+    faces += [(i, i+k, (i+1)%k + k, (i+1)%k) for i in range(k)]
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(vertices, [], faces)
+    mesh.update()
+    return mesh
+
+
+def proxy_meshes(recordings, extrude, bevel, max_parts):
+    """Convex prisms covering the outlines (at most `max_parts` per glyph), relative to the returned origin; built once per proxy_key, then found again in bpy.data by name"""
+    key, origin = proxy_key(recordings, extrude, bevel, max_parts)
+    prefix = f"{PROXY_PREFIX}.{key}"
+
+    meshes = []
+    while f"{prefix}.{len(meshes)}" in bpy.data.meshes:
+        meshes.append(bpy.data.meshes[f"{prefix}.{len(meshes)}"])
+    if meshes:
+        return meshes, origin
+
+    for outline in tessellate.budgeted(recordings, PROXY_TOLERANCE, extrude, bevel):
+        for part in tessellate.convex_parts(outline, max_parts):
+            meshes.append(prism(f"{prefix}.{len(meshes)}", part - origin, extrude + bevel))
+    return meshes, origin
+
+
+def add_proxies(obj, recordings, extrude, bevel, max_parts):
+    """Parent (hidden, wireframe) collision proxies for outlines drawn in `obj`'s local space to `obj`; add them before applying `obj`'s transforms, which keeps children in place"""
+    meshes, origin = proxy_meshes(recordings, extrude, bevel, max_parts)
+    proxies = []
+
+    for mesh in meshes:
+        proxy = bpy.data.objects.new(f"{obj.name}.collision", mesh)
+        for collection in obj.users_collection:
+            collection.objects.link(proxy)
+        proxy.parent = obj
+        proxy.location = (origin[0], origin[1], 0)
+        proxy.display_type = "WIRE"
+        proxy.hide_render = True
+        proxies.append(proxy)
+
+    return proxies
+
+
+def is_proxy(obj):
+    return obj.type == "MESH" and obj.data.name.startswith(PROXY_PREFIX)
+
+
+def remove_proxies(obj):
+    for child in list(obj.children):
+        if is_proxy(child):
+            bpy.data.objects.remove(child, do_unlink=True)
+
+
+def world_collection(scene):
+    """The collection of the scene's rigid body world; Scene.rigidbody_world is read-only, so a missing world takes one world_add, but its collection is made directly"""
+    if scene.rigidbody_world is None:
+        bpy.ops.rigidbody.world_add()
+
+    world = scene.rigidbody_world
+    if world.collection is None:
+        world.collection = bpy.data.collections.new("RigidBodyWorld")
+    return world.collection
+
+
+def add_rigid_bodies(bodies, scene):
+    """Make each (obj, proxies) an active rigid body whose shape is the compound of its proxies (or Blender's default shape, if it has none); objects linked into the rigid body world's collection get their rigid body when the depsgraph is next updated, so every glyph is linked first & one update covers them all, with no operators"""
+    collection = world_collection(scene)
+    linked = set(collection.objects)
+
+    for obj, proxies in bodies:
+        for o in proxies + [obj]:
+            if o not in linked:
+                collection.objects.link(o)
+    bpy.context.view_layer.update()
+
+    for obj, proxies in bodies:
+        obj.rigid_body.type = "ACTIVE"
+        if proxies:
+            for proxy in proxies:
+                proxy.rigid_body.collision_shape = "CONVEX_HULL"
+            obj.rigid_body.collision_shape = "COMPOUND"
+
+
+classes = []
+panels = []
@@ -0,0 +1,170 @@
+import bpy, os, shutil, hashlib, threading, tempfile
+from pathlib import Path
+
+from ST2 import util
+
+
+SOURCE_SUFFIXES = [".ufo", ".designspace"]
+
+MAX_ENTRIES = 64 # compiled fonts kept on disk
+
+_lock = threading.Lock()
+_key_locks = {}
+_binaries = {} # normalized source path -> compiled binary path (for this session)
+_kept = set() # other cache entries in use (e.g. fontcache's subsets)
+
+
+def is_source(font_path):
+    return Path(font_path).suffix.lower() in SOURCE_SUFFIXES
+
+
+_cache_directory = None
+
+
+def cache_directory():
+    global _cache_directory
+    if _cache_directory is None:
+        config = Path(bpy.utils.user_resource("CONFIG", path="st2", create=True))
+        _cache_directory = config / "compiled"
+        _cache_directory.mkdir(parents=True, exist_ok=True)
+    return _cache_directory
+
+
+def _compiler_version():
+    try:
+        import ufo2ft
+        return ufo2ft.__version__
+    except (ImportError, AttributeError):
+        return "?"
+
+
+def _hash_files(h, root):
+    """Fold every file's relative path, mtime & size into a hash (stat only, nothing is read)"""
+    root = Path(root)
+    if root.is_file():
+        stat = root.stat()
+        h.update(f"{root.name}:{stat.st_mtime_ns}:{stat.st_size}\n".encode("utf-8"))
+        return
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            stat = path.stat()
+            h.update(f"{path.relative_to(root)}:{stat.st_mtime_ns}:{stat.st_size}\n".encode("utf-8"))
+
+
+def source_key(source_path, kind):
+    h = hashlib.sha1()
+    h.update(f"{kind}:{_compiler_version()}:{util.normalize(source_path)}\n".encode("utf-8"))
+    _hash_files(h, source_path)
+    return h.hexdigest()
+
+
+def _key_lock(key):
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def cached(key, filename, build):
+    """The cache entry `key`, calling `build(output_path)` to create it if it's missing; entries are written to a temporary path first so a crashed or concurrent compile never leaves a partial binary behind"""
+    directory = cache_directory() / key
+    output = directory / filename
+
+    with _key_lock(key):
+        if output.exists():
+            os.utime(directory) # mark as recently used, for pruning
+            return output
+
+        directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=cache_directory()) as tmp:
+            tmp_output = Path(tmp) / filename
+            build(tmp_output)
+            os.replace(tmp_output, output)
+
+    prune()
+    return output
+
+
+def _open_ufo(path):
+    try:
+        import ufoLib2
+        return ufoLib2.Font.open(path)
+    except ImportError:
+        import defcon
+        return defcon.Font(path)
+
+
+def compile_ufo(ufo_path):
+    def build(output):
+        import ufo2ft
+        ufo2ft.compileTTF(_open_ufo(ufo_path)).save(output)
+
+    key = source_key(ufo_path, "ttf")
+    return cached(key, Path(ufo_path).stem + ".ttf", build)
+
+
+def compile_designspace(designspace_path):
+    """A variable TTF, with the masters compiled together by ufo2ft so they're interpolatable (shared glyph order & compatible outlines, whichever masters are sparse); cached on the designspace & every master's files"""
+    from fontTools.designspaceLib import DesignSpaceDocument
+
+    doc = DesignSpaceDocument.fromfile(designspace_path)
+
+    def build(output):
+        import ufo2ft
+        doc.loadSourceFonts(_open_ufo)
+        ufo2ft.compileVariableTTF(doc).save(output)
+
+    h = hashlib.sha1(source_key(designspace_path, "variable-ttf").encode("utf-8"))
+    for s in doc.sources:
+        _hash_files(h, s.path)
+    return cached(h.hexdigest(), Path(designspace_path).stem + ".ttf", build)
+
+
+def binary_path(source_path):
+    """The compiled binary for a .ufo/.designspace source, compiling it only if no cached binary matches the source files' current mtimes"""
+    key = util.normalize(source_path)
+    if key not in _binaries:
+        if Path(source_path).suffix.lower() == ".designspace":
+            _binaries[key] = compile_designspace(source_path)
+        else:
+            _binaries[key] = compile_ufo(source_path)
+    return _binaries[key]
+
+
+def known_binary(source_path):
+    """The binary this session already compiled/found for a source, if any (never compiles)"""
+    return _binaries.get(util.normalize(source_path))
+
+
+def forget(source_path=None):
+    """Re-check the source files' mtimes on the next load (the binaries themselves stay on disk)"""
+    if source_path is None:
+        _binaries.clear()
+    else:
+        _binaries.pop(util.normalize(source_path), None)
+
+
+def keep(path):
+    """Mark a cache entry as in use, so prune leaves it alone until it's released"""
+    with _lock:
+        _kept.add(Path(path).parent)
+
+
+def release(path):
+    with _lock:
+        _kept.discard(Path(path).parent)
+
+
+def prune():
+    """Delete the least-recently-used entries beyond MAX_ENTRIES, except binaries this session has loaded or kept"""
+    with _lock:
+        referenced = {Path(b).parent for b in _binaries.values()} | _kept
+    entries = [d for d in cache_directory().iterdir() if d.is_dir() and len(d.name) == 40 and d not in referenced]
+    entries.sort(key=lambda d: d.stat().st_mtime, reverse=True)
+    for d in entries[MAX_ENTRIES:]:
+        shutil.rmtree(d, ignore_errors=True)
+
+
+classes = []
+panels = []
@@ -0,0 +1,116 @@
+import bpy
+
+from ST2 import util, typesetter, sources, scripting, prefetch, fontcache, fontindex, meshcache
+
+
+FONT = "FONT"
+TEXT_FILE = "TEXT_FILE"
+TEXT_BLOCK = "TEXT_BLOCK"
+SCRIPT_FILE = "SCRIPT_FILE"
+SCRIPT_BLOCK = "SCRIPT_BLOCK"
+
+FILE_KINDS = [FONT, TEXT_FILE, SCRIPT_FILE]
+
+
+def live_objects(scene):
+    return [o for o in scene.objects if o.st2.updatable and not o.st2.baked and not o.st2.parent]
+
+
+def object_dependencies(obj):
+    """The (kind, path-or-name) sources an object's typesetting reads from"""
+    data = obj.st2
+    deps = set()
+
+    if data.font_path:
+        deps.add((FONT, util.normalize(data.font_path)))
+
+    if data.text_mode == "FILE" and data.text_file:
+        deps.add((TEXT_FILE, util.normalize(data.text_file)))
+    elif data.text_mode == "BLOCK" and data.text_block:
+        deps.add((TEXT_BLOCK, data.text_block))
+
+    if data.script_enabled:
+        if data.script_mode == "FILE" and data.script_file:
+            deps.add((SCRIPT_FILE, util.normalize(data.script_file)))
+        elif data.script_mode == "BLOCK" and data.script_block:
+            deps.add((SCRIPT_BLOCK, data.script_block))
+
+    return deps
+
+
+class Graph():
+    def __init__(self, scene):
+        self.dependencies = {}
+        self.dependents = {}
+
+        for obj in live_objects(scene):
+            deps = object_dependencies(obj)
+            self.dependencies[obj.name] = deps
+            for dep in deps:
+                self.dependents.setdefault(dep, set()).add(obj.name)
+
+    def files(self):
+        return set(path for kind, path in self.dependents.keys() if kind in FILE_KINDS)
+
+    def keys_for_files(self, paths):
+        paths = set(util.normalize(p) for p in paths)
+        return set(k for k in self.dependents.keys() if k[0] in FILE_KINDS and k[1] in paths)
+
+    def objects_for(self, keys):
+        names = set()
+        for key in keys:
+            names.update(self.dependents.get(key, set()))
+        return [bpy.data.objects[n] for n in sorted(names) if n in bpy.data.objects]
+
+
+def invalidate(keys):
+    for kind, name in keys:
+        if kind == FONT:
+            fontcache.forget(name)
+            fontindex.forget(name)
+            meshcache.clear(name)
+            prefetch.clear()
+        elif kind == TEXT_FILE:
+            sources.clear("FILE", name)
+        elif kind == TEXT_BLOCK:
+            sources.clear("BLOCK", name)
+        elif kind == SCRIPT_FILE:
+            scripting.clear("FILE", name)
+        elif kind == SCRIPT_BLOCK:
+            scripting.clear("BLOCK", name)
+
+
+def invalidate_all():
+    fontcache.forget_all()
+    fontindex.forget()
+    meshcache.clear()
+    prefetch.clear()
+    sources.clear()
+    scripting.clear()
+
+
+def retypeset(context, objs):
+    ts = [typesetter.T(obj.st2, obj, context.scene).prepare() for obj in objs]
+    for t in ts:
+        t.update_live_text_obj(t.two_dimensional())
+
+
+def refresh(context, keys, graph=None, objs=()):
+    """Drop cached data for just these sources & re-typeset only the objects that read from them (plus any `objs` given explicitly)"""
+    if graph is None:
+        graph = Graph(context.scene)
+
+    invalidate(keys)
+
+    affected = graph.objects_for(keys)
+    affected.extend(o for o in objs if o not in affected)
+    retypeset(context, affected)
+
+
+def refresh_all(context):
+    invalidate_all()
+    retypeset(context, live_objects(context.scene))
+
+
+classes = []
+panels = []
@@ -2,6 +2,7 @@ import bpy
 
 from ST2 import typesetter
 from ST2 import search
+from ST2 import collision
 
 
 def bake_frames(context, framewise=True, frames=None, glyphwise=False, shapewise=False, layerwise=False, progress_fn=None):
@@ -88,6 +89,34 @@ def bake_frames(context, framewise=True, frames=None, glyphwise=False, shapewise
         bpy.context.view_layer.objects.active = bp.obj
 
     sc.frame_set(0)
+    return results
+
+
+def polygon_report(results):
+    """Print each exported mesh's polygon & triangle counts, returning a one-line summary (or None if nothing was exported as a mesh)"""
+    meshes = polygons = triangles = 0
+    
+    for res in results:
+        for bp in res:
+            if bp.obj.type != "MESH":
+                continue
+            mesh = bp.obj.data
+            # a polygon with n corners is n-2 triangles
+            mesh_triangles = len(mesh.loops) - 2*len(mesh.polygons)
+            print(f"{bp.obj.name}: {len(mesh.polygons)} polygons, {mesh_triangles} triangles")
+
+            meshes += 1
+            polygons += len(mesh.polygons)
+            triangles += mesh_triangles
+    
+    if meshes:
+        return f"Exported {meshes} meshes: {polygons} polygons, {triangles} triangles"
+
+
+def report_polygons(operator, results):
+    summary = polygon_report(results)
+    if summary:
+        operator.report({"INFO"}, summary)
 
 
 class ST2_OT_ExportSlug(bpy.types.Operator):
@@ -98,7 +127,7 @@ class ST2_OT_ExportSlug(bpy.types.Operator):
     bl_options = {"REGISTER","UNDO"}
     
     def execute(self, context):
-        bake_frames(context, framewise=False, glyphwise=False, frames=[context.scene.frame_current])
+        report_polygons(self, bake_frames(context, framewise=False, glyphwise=False, frames=[context.scene.frame_current]))
         return {"FINISHED"}
 
 
@@ -110,7 +139,7 @@ class ST2_OT_ExportGlyphs(bpy.types.Operator):
     bl_options = {"REGISTER","UNDO"}
     
     def execute(self, context):
-        bake_frames(context, framewise=False, glyphwise=True, frames=[context.scene.frame_current])
+        report_polygons(self, bake_frames(context, framewise=False, glyphwise=True, frames=[context.scene.frame_current]))
         return {"FINISHED"}
 
 
@@ -122,7 +151,7 @@ class ST2_OT_ExportShapes(bpy.types.Operator):
     bl_options = {"REGISTER","UNDO"}
     
     def execute(self, context):
-        bake_frames(context, framewise=False, glyphwise=True, shapewise=True, frames=[context.scene.frame_current])
+        report_polygons(self, bake_frames(context, framewise=False, glyphwise=True, shapewise=True, frames=[context.scene.frame_current]))
         return {"FINISHED"}
 
 
@@ -134,7 +163,7 @@ class ST2_OT_ExportLayers(bpy.types.Operator):
     bl_options = {"REGISTER","UNDO"}
     
     def execute(self, context):
-        bake_frames(context, framewise=False, glyphwise=True, shapewise=True, layerwise=True, frames=[context.scene.frame_current])
+        report_polygons(self, bake_frames(context, framewise=False, glyphwise=True, shapewise=True, layerwise=True, frames=[context.scene.frame_current]))
         return {"FINISHED"}
 
 
@@ -147,8 +176,8 @@ class ST2_OT_BakeFrames(bpy.types.Operator):
     
     def execute(self, context):
         context.window_manager.progress_begin(0, 1)
-        bake_frames(context, framewise=True, progress_fn=lambda x: 
-            context.window_manager.progress_update(x))
+        report_polygons(self, bake_frames(context, framewise=True, progress_fn=lambda x: 
+            context.window_manager.progress_update(x)))
         context.window_manager.progress_end()
         return {"FINISHED"}
 
@@ -162,8 +191,8 @@ class ST2_OT_BakeFramesNoTiming(bpy.types.Operator):
     
     def execute(self, context):
         context.window_manager.progress_begin(0, 1)
-        bake_frames(context, framewise=False, progress_fn=lambda x: 
-            context.window_manager.progress_update(x))
+        report_polygons(self, bake_frames(context, framewise=False, progress_fn=lambda x: 
+            context.window_manager.progress_update(x)))
         context.window_manager.progress_end()
         
         return {"FINISHED"}
@@ -187,6 +216,7 @@ class ST2_OT_BakeSelectAll(bpy.types.Operator):
 
 def delete_at_frame(context, o:bpy.types.Object, frame:int):
     context.scene.frame_set(frame)
+    collision.remove_proxies(o)
     bpy.ops.object.select_all(action='DESELECT')
     o.select_set(True)
     bpy.ops.object.delete()
@@ -221,6 +251,19 @@ class ST2_OT_DeleteBake(bpy.types.Operator):
         return {"FINISHED"}
 
 
+def draw_budget(layout, data):
+    row = layout.row()
+    row.enabled = data.export_meshes
+    row.prop(data, "export_budgeted")
+
+    if data.export_meshes and data.export_budgeted:
+        row = layout.row()
+        row.prop(data, "export_tolerance")
+        row = layout.row(align=True)
+        row.prop(data, "export_max_triangles")
+        row.prop(data, "export_budget_scope", text="")
+
+
 class ST2ExportPanel(bpy.types.Panel):
     bl_label = "Export"
     bl_idname = "ST2_PT_4_EXPORTPANEL"
@@ -253,6 +296,11 @@ class ST2ExportPanel(bpy.types.Panel):
         col.enabled = data.export_meshes
         col.prop(data, "export_rigidbody_active", icon="RIGID_BODY", icon_only=True)
 
+        if data.export_meshes and data.export_rigidbody_active:
+            layout.row().prop(data, "export_rigidbody_parts")
+
+        draw_budget(layout, data)
+
         row = layout.row()
         #row.label("Origin")
         row.prop(data, "export_origin", text="Origin")
@@ -273,13 +321,11 @@ class ST2ExportPanel(bpy.types.Panel):
         row.prop(data, "export_rotate_y", text="Y")
         row.prop(data, "export_rotate_z", text="Z")
 
-        font = data.font()
-    
         layout.row().operator("st2.export_slug", text="Export Slug")
         layout.row().operator("st2.export_glyphs", text="Export Glyphs")
         layout.row().operator("st2.export_shapes", text="Export Shapes")
 
-        if font._colr:
+        if data.font_metadata().colr:
             row.operator("st2.export_layers", text="Layers")
 
 
@@ -310,6 +356,8 @@ class ST2BakeAnimationPanel(bpy.types.Panel):
         row.prop(data, "export_every_x_frame", text="Frame Interval")
         row.prop(data, "export_meshes", icon="OUTLINER_OB_MESH", icon_only=True)
 
+        draw_budget(layout, data)
+
         layout.row().operator("st2.bake_frames", text="Bake Timed")
         layout.row().operator("st2.bake_frames_no_timing", text="Export Untimed")
         
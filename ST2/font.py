@@ -12,8 +12,7 @@ class ST2_OT_LoadVarAxesDefaults(bpy.types.Operator):
     
     def execute(self, context):
         for o in search.find_st2_all_selected(context):
-            font = o.st2.font()
-            for idx, (axis, v) in enumerate(o.st2.visible_variation_axes(font).items()):
+            for idx, (axis, v) in enumerate(o.st2.visible_variation_axes().items()):
                 diff = abs(v["maxValue"]-v["minValue"])
                 v = (v["defaultValue"]-v["minValue"])/diff
                 setattr(o.st2, f"fvar_axis{idx+1}", v)
@@ -41,6 +40,17 @@ class ST2Text3DSettingsPanel(bpy.types.Panel):
 
         row = layout.row()
         row.prop(ko, "rotation_euler", text="Rotation")
+        row = layout.row()
+        row.prop(ko.st2, "output_mode", expand=True)
+
+        if ko.type == "MESH":
+            row = layout.row()
+            row.prop(ko.st2, "mesh_extrude", text="Extrude")
+            row.prop(ko.st2, "mesh_bevel_depth", text="Bevel")
+            row = layout.row()
+            row.prop(ko.st2, "mesh_tolerance")
+            return
+
         row = layout.row()
         row.prop(ko.data, "extrude", text="Extrude")
         row.prop(ko.data, "bevel_depth", text="Bevel")
@@ -61,8 +71,7 @@ class ST2FontVariationsPanel(bpy.types.Panel):
     def poll(cls, context):
         ko = search.active_key_object(context)
         if ko:
-            font = ko.st2.font()
-            if ko.st2.visible_variation_axes(font):
+            if ko.st2.visible_variation_axes():
                 return True
         return False
     
@@ -71,8 +80,7 @@ class ST2FontVariationsPanel(bpy.types.Panel):
         
         layout = self.layout
         data = ko.st2
-        font = data.font()
-        fvars = ko.st2.visible_variation_axes(font)
+        fvars = ko.st2.visible_variation_axes()
     
         for idx, (k, v) in enumerate(fvars.items()):
             prop = f"fvar_axis{idx+1}"
@@ -120,10 +128,7 @@ class ST2FontStylisticSetsPanel(bpy.types.Panel):
     def poll(cls, context):
         ko = search.active_key_object(context)
         if ko:
-            font = ko.st2.font()
-            styles = [fea for fea in font.font.featuresGSUB if fea.startswith("ss")]
-
-            if len(styles) > 0:
+            if len(ko.st2.font_metadata().stylistic_sets) > 0:
                 return True
         return False
     
@@ -132,20 +137,16 @@ class ST2FontStylisticSetsPanel(bpy.types.Panel):
         
         layout = self.layout
         data = ko.st2
-        font = data.font()
+        meta = data.font_metadata()
 
         fi = 0
         row = None
 
-        styles = [fea for fea in sorted(font.font.featuresGSUB) if fea.startswith("ss")]
-
-        for style in styles:
+        for style in sorted(meta.stylistic_sets):
             if fi%2 == 0 or row is None:
                 row = layout.row()
             
-            ss_name = font.font.stylisticSetNames.get(style)
-            if not ss_name:
-                ss_name = "Stylistic Set " + str(int(style[2:]))
+            ss_name = meta.stylistic_set_name(style)
 
             row.prop(data, f"fea_{style}", text=f"{style}: {ss_name}")
             
@@ -169,7 +170,7 @@ class ST2FontFeaturesPanel(bpy.types.Panel):
         
         layout = self.layout
         data = ko.st2
-        font = data.font()
+        meta = data.font_metadata()
 
         fi = 0
         row = None
@@ -182,14 +183,14 @@ class ST2FontFeaturesPanel(bpy.types.Panel):
             row.prop(data, f"fea_{fea}")
             fi += 1
         
-        for fea in font.font.featuresGPOS:
+        for fea in meta.features_gpos:
             if not hasattr(data, f"fea_{fea}"):
                 #print("!", fea)
                 pass
             else:
                 show_fea(fea)
 
-        for fea in font.font.featuresGSUB:
+        for fea in meta.features_gsub:
             if not fea.startswith("cv") and not fea.startswith("ss"):
                 if not hasattr(data, f"fea_{fea}"):
                     #print(fea)
@@ -0,0 +1,260 @@
+import bpy, mmap, threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from ST2 import compiled, util
+
+
+# parsed fontTools tables + HarfBuzz blobs typically take a few times the
+# file's size once a font has been used for typesetting
+PARSED_SIZE_FACTOR = 3
+
+_lock = threading.Lock()
+_idle = threading.Condition(_lock) # notified when the last worker thread stops shaping
+_shaping = 0 # worker threads loading or shaping with cached fonts right now
+_usage = OrderedDict() # normalized path -> estimated (or measured) bytes, least-recently-used first
+_resident = {} # normalized path -> measured growth in resident memory when the font was parsed
+_opened = {} # normalized path -> the binary parsed for it (for large fonts, a subset)
+_characters = {} # normalized path of a large font -> every character the scene's text has needed from it
+_loading = 0
+
+
+def estimate(font_path):
+    path = Path(font_path)
+    if compiled.known_binary(font_path):
+        path = compiled.known_binary(font_path)
+    try:
+        if path.is_dir(): # .ufo
+            size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+        else:
+            size = path.stat().st_size
+    except OSError:
+        size = 0
+    return size * PARSED_SIZE_FACTOR
+
+
+def size_on_disk(font_path):
+    try:
+        return Path(compiled.known_binary(font_path) or font_path).stat().st_size
+    except OSError:
+        return 0
+
+
+def is_large(font_path, scene):
+    """Whether a font is over the scene's large-font threshold, so should only ever be parsed when it's actually typeset"""
+    return size_on_disk(font_path) > scene.st2.large_font_size * 1024 * 1024
+
+
+def _binary(font_path):
+    if compiled.is_source(font_path):
+        return compiled.binary_path(font_path)
+    return font_path
+
+
+def subset(font_path, characters):
+    """A cached subset of a large font holding only the glyphs `characters` need (with everything its layout features can substitute them with), so the shaper never parses outlines the text doesn't use; the font is read through a memory map & lazily, so only the tables & glyphs kept are decompiled"""
+    from fontTools import subset as ft_subset
+    from fontTools.ttLib import TTFont
+
+    source = _binary(font_path)
+    key = compiled.source_key(source, "subset:" + "".join(sorted(characters)))
+
+    def build(output):
+        options = ft_subset.Options(layout_features=["*"], name_IDs=["*"], name_languages=["*"], glyph_names=True, notdef_outline=True, legacy_kern=True)
+        with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, TTFont(mm, lazy=True, fontNumber=0) as ttf:
+            subsetter = ft_subset.Subsetter(options)
+            subsetter.populate(unicodes=[ord(c) for c in characters])
+            subsetter.subset(ttf)
+            ttf.save(output)
+    
+    path = compiled.cached(key, Path(source).name, build)
+    compiled.keep(path) # until it's outgrown or forgotten
+    return path
+
+
+def _subset_for(font_path, text):
+    """The subset to typeset `text` with; it only grows (to every character asked for so far), so text already seen never re-subsets"""
+    key = util.normalize(font_path)
+    with _lock:
+        characters = _characters.setdefault(key, set())
+        characters.update(text)
+        characters = frozenset(characters)
+    return subset(font_path, characters)
+
+
+def _open(path):
+    """Parse the font, measuring how much resident memory that took (only when no other font is being parsed at the same time, or the numbers would be meaningless)"""
+    from ST2.importer import ct
+    global _loading
+
+    with _lock:
+        _loading += 1
+        alone = _loading == 1
+    
+    try:
+        before = util.resident_memory() if alone else None
+        font = ct.Font.Cacheable(path)
+        after = util.resident_memory() if alone else None
+    finally:
+        with _lock:
+            _loading -= 1
+            alone = alone and _loading == 0
+    
+    measured = None
+    if alone and before is not None and after is not None:
+        measured = max(0, after - before)
+    return font, measured
+
+
+def load(font_path, text=None):
+    """ct.Font.Cacheable, with the font's use recorded for LRU eviction; .ufo/.designspace sources load from their cached compiled binary. With `text` (for large fonts, see is_large), only a subset covering the scene's text is parsed"""
+    from ST2.importer import ct
+
+    key = util.normalize(font_path)
+    path = _binary(font_path)
+    if text is not None:
+        path = _subset_for(font_path, text)
+
+    with _lock:
+        outgrown = _opened.get(key)
+    
+    if outgrown == path:
+        font = ct.Font.Cacheable(path)
+        measured = None
+    else:
+        font, measured = _open(path)
+        if outgrown is not None:
+            compiled.release(outgrown)
+            if threading.current_thread() is threading.main_thread():
+                _uncache(outgrown) # (a worker thread would wait on its own shaping)
+
+    with _lock:
+        added = key not in _usage
+        _opened[key] = path
+        if measured:
+            _resident[key] = measured
+        if added or outgrown != path:
+            _usage[key] = measured or estimate(path)
+        _usage.move_to_end(key)
+
+    if added and threading.current_thread() is threading.main_thread():
+        trim(bpy.context.scene)
+
+    return font
+
+
+@contextmanager
+def shaping():
+    """Hold around loading & shaping with cached fonts off the main thread (any number of threads at once); coldtype's FontCache & Fonts aren't safe to drop from under a shaping, so trim doesn't evict while any is in progress & forget waits for them"""
+    global _shaping
+    with _lock:
+        _shaping += 1
+    try:
+        yield
+    finally:
+        with _idle:
+            _shaping -= 1
+            if _shaping == 0:
+                _idle.notify_all()
+
+
+def _uncache(*paths):
+    """Drop the parsed fonts from coldtype's cache, once no worker thread is shaping; the lock is held throughout, so none can start until they're gone"""
+    from coldtype.text.font import FontCache
+
+    keys = [util.normalize(p) for p in paths]
+    with _idle:
+        _idle.wait_for(lambda: _shaping == 0)
+        for k in list(FontCache.keys()):
+            if util.normalize(k) in keys:
+                del FontCache[k]
+
+
+def forget(font_path):
+    key = util.normalize(font_path)
+    paths = [key]
+    if compiled.is_source(font_path):
+        binary = compiled.known_binary(font_path)
+        if binary:
+            paths.append(binary)
+        compiled.forget(font_path)
+
+    with _lock:
+        opened = _opened.pop(key, None)
+        _usage.pop(key, None)
+        _resident.pop(key, None)
+        _characters.pop(key, None)
+    
+    if opened is not None:
+        compiled.release(opened)
+        paths.append(opened)
+    _uncache(*paths)
+
+
+def forget_all():
+    from coldtype.text.font import FontCache
+
+    with _idle:
+        _idle.wait_for(lambda: _shaping == 0)
+        FontCache.clear()
+    compiled.forget()
+    with _lock:
+        for path in _opened.values():
+            compiled.release(path)
+        _usage.clear()
+        _resident.clear()
+        _opened.clear()
+        _characters.clear()
+
+
+def fonts_in_use(scene):
+    paths = set()
+    if scene and scene.st2.font_path:
+        paths.add(util.normalize(scene.st2.font_path))
+    if scene:
+        for obj in scene.objects:
+            if obj.st2.font_path and obj.st2.updatable:
+                paths.add(util.normalize(obj.st2.font_path))
+    return paths
+
+
+def total():
+    with _lock:
+        return sum(_usage.values())
+
+
+def count():
+    return len(_usage)
+
+
+def resident(font_path=None):
+    """Measured resident memory of one font (or all measured fonts), in bytes; None if it was never measured"""
+    with _lock:
+        if font_path is None:
+            return sum(_resident.values()) if _resident else None
+        return _resident.get(util.normalize(font_path))
+
+
+def trim(scene, budget=None):
+    """Evict least-recently-used fonts (never ones the scene uses) until the cache fits its budget; skipped while worker threads are shaping (the next load trims instead)"""
+    if budget is None:
+        if scene is None:
+            return
+        budget = scene.st2.font_cache_budget * 1024 * 1024
+
+    in_use = fonts_in_use(scene)
+
+    with _lock:
+        if _shaping:
+            return
+        candidates = [k for k in _usage.keys() if k not in in_use]
+
+    for key in candidates:
+        if total() <= budget:
+            break
+        forget(key)
+
+
+classes = []
+panels = []
@@ -0,0 +1,397 @@
+import bpy, os, json, mmap, hashlib, sqlite3, threading
+from pathlib import Path
+
+from ST2 import util
+
+
+SCHEMA_VERSION = 2
+
+LIBRARY_SUFFIXES = [".otf", ".ttf", ".ttc", ".otc"]
+CYCLE_SUFFIXES = [".otf", ".ttf", ".ufo"]
+
+BATCH_SIZE = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fonts (
+    path TEXT PRIMARY KEY,
+    directory TEXT,
+    filename TEXT,
+    mtime_ns INTEGER,
+    size INTEGER,
+    library INTEGER DEFAULT 0,
+    family TEXT,
+    style TEXT,
+    axes TEXT,
+    features TEXT,
+    ss_names TEXT,
+    mesh INTEGER,
+    colr INTEGER
+);
+CREATE INDEX IF NOT EXISTS fonts_directory ON fonts(directory);
+CREATE INDEX IF NOT EXISTS fonts_library ON fonts(library, family, style);
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER
+);
+"""
+
+
+def library_directories():
+    if util.on_mac():
+        dirs = ["/System/Library/Fonts", "/Library/Fonts", "~/Library/Fonts"]
+    elif util.on_windows():
+        dirs = [os.path.join(os.environ.get("WINDIR", "C:/Windows"), "Fonts"), "~/AppData/Local/Microsoft/Windows/Fonts"]
+    else:
+        dirs = ["/usr/share/fonts", "/usr/local/share/fonts", "~/.fonts", "~/.local/share/fonts"]
+    return [Path(d).expanduser() for d in dirs]
+
+
+_database_path = None
+
+
+def database_path():
+    global _database_path
+    if _database_path is None:
+        config = Path(bpy.utils.user_resource("CONFIG", path="st2", create=True))
+        _database_path = config / "fontindex.sqlite"
+    return _database_path
+
+
+def _connect(path, check_same_thread=True):
+    conn = sqlite3.connect(str(path), timeout=10, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript("DROP TABLE IF EXISTS fonts; DROP TABLE IF EXISTS directories;")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    conn.executescript(SCHEMA)
+    return conn
+
+
+_local = threading.local()
+_connections = {} # thread -> its connection, so close() can reach them all
+_connections_lock = threading.Lock()
+_connections_generation = 0 # bumped by close(), so threads still holding a closed connection reconnect
+
+
+def connect():
+    """A connection for the calling thread (sqlite connections can't be shared across threads)"""
+    conn = getattr(_local, "connection", None)
+    if conn is None or _local.generation != _connections_generation:
+        # only ever used by this thread, but closed by whichever thread calls close() or prunes it
+        conn = _connect(database_path(), check_same_thread=False)
+        _local.connection = conn
+        _local.generation = _connections_generation
+
+        with _connections_lock:
+            for thread in [t for t in _connections.keys() if not t.is_alive()]:
+                _close(_connections.pop(thread))
+            _connections[threading.current_thread()] = conn
+    return conn
+
+
+def _close(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def read_metadata(path):
+    from fontTools.ttLib import TTFont
+
+    record = dict(family=Path(path).stem, style="", axes=[],
+        features={"GSUB": [], "GPOS": []},
+        ss_names={}, mesh=False, colr=False)
+
+    if Path(path).suffix.lower() not in LIBRARY_SUFFIXES:
+        return record
+
+    try:
+        # mapped rather than read, and lazy, so only the handful of tables below are ever
+        # paged in & decompiled, even for 40 MB CJK fonts
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, TTFont(mm, lazy=True, fontNumber=0) as ttf:
+            name = ttf["name"]
+            record["family"] = str(name.getBestFamilyName() or record["family"])
+            record["style"] = str(name.getBestSubFamilyName() or "")
+
+            if "fvar" in ttf:
+                for axis in ttf["fvar"].axes:
+                    record["axes"].append(dict(tag=axis.axisTag,
+                        minValue=axis.minValue,
+                        defaultValue=axis.defaultValue,
+                        maxValue=axis.maxValue,
+                        flags=axis.flags))
+
+            for tag in ["GSUB", "GPOS"]:
+                if tag in ttf and ttf[tag].table.FeatureList:
+                    records = ttf[tag].table.FeatureList.FeatureRecord
+                    record["features"][tag] = sorted(set(fr.FeatureTag for fr in records))
+
+                    if tag == "GSUB":
+                        for fr in records:
+                            params = fr.Feature.FeatureParams
+                            if fr.FeatureTag.startswith("ss") and params and hasattr(params, "UINameID"):
+                                ss_name = name.getDebugName(params.UINameID)
+                                if ss_name:
+                                    record["ss_names"][fr.FeatureTag] = ss_name
+
+            record["mesh"] = "MESH" in ttf
+            record["colr"] = "COLR" in ttf
+    except Exception as e:
+        print(">>> could not index font", path, e)
+
+    return record
+
+
+def _upsert(conn, path, modified, library):
+    """(Re)index a font; `modified` is its (mtime_ns, size), as util.modified reads it"""
+    record = read_metadata(path)
+    conn.execute("""
+        INSERT INTO fonts (path, directory, filename, mtime_ns, size, library, family, style, axes, features, ss_names, mesh, colr)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            mtime_ns=excluded.mtime_ns,
+            size=excluded.size,
+            library=MAX(library, excluded.library),
+            family=excluded.family,
+            style=excluded.style,
+            axes=excluded.axes,
+            features=excluded.features,
+            ss_names=excluded.ss_names,
+            mesh=excluded.mesh,
+            colr=excluded.colr
+        """, (str(path), str(path.parent), path.name, *modified, int(library),
+            record["family"], record["style"],
+            json.dumps(record["axes"]), json.dumps(record["features"]), json.dumps(record["ss_names"]),
+            int(record["mesh"]), int(record["colr"])))
+
+
+# library scanning (in the background, incremental)
+
+_generation = 0
+_scan_thread = None
+_scanned = False
+
+
+def _scan_library(db_path, roots):
+    global _generation, _scanned
+
+    conn = _connect(db_path)
+    known = {row[0]: (row[1], row[2]) for row in
+        conn.execute("SELECT path, mtime_ns, size FROM fonts WHERE library = 1")}
+    seen = set()
+    pending = 0
+
+    for root in roots:
+        if not root.exists():
+            continue
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                if path.suffix.lower() not in LIBRARY_SUFFIXES or filename.startswith("."):
+                    continue
+
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+
+                seen.add(str(path))
+                if known.get(str(path)) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+
+                _upsert(conn, path, (stat.st_mtime_ns, stat.st_size), library=True)
+                pending += 1
+                if pending >= BATCH_SIZE:
+                    conn.commit()
+                    _generation += 1
+                    pending = 0
+
+    for path in known.keys():
+        if path not in seen:
+            conn.execute("DELETE FROM fonts WHERE path = ?", (path,))
+
+    conn.commit()
+    conn.close()
+    _generation += 1
+    _scanned = True
+
+
+def ensure_library_scan():
+    global _scan_thread
+    if _scanned or (_scan_thread and _scan_thread.is_alive()):
+        return
+
+    _scan_thread = threading.Thread(target=_scan_library, args=(database_path(), library_directories()), daemon=True)
+    _scan_thread.start()
+
+
+def scanning():
+    return bool(_scan_thread and _scan_thread.is_alive())
+
+
+# queries
+
+_items = []
+_item_paths = {} # identifier -> path
+_items_generation = -1
+
+
+def item_identifier(path):
+    """A stable enum identifier for a font (rowids get reused when fonts are removed & others added)"""
+    return hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+
+
+def search_items():
+    """EnumProperty items for the search popup (kept referenced at module-level, as Blender requires)"""
+    global _items, _item_paths, _items_generation
+
+    ensure_library_scan()
+
+    if _items_generation != _generation:
+        _items_generation = _generation
+        rows = connect().execute("SELECT path, family, style, filename FROM fonts WHERE library = 1 ORDER BY family, style, filename")
+        _items = [(item_identifier(path), f"{family} {style} ({filename})", path) for path, family, style, filename in rows]
+        _item_paths = {identifier: path for identifier, _, path in _items}
+
+    return _items
+
+
+def path_for_item(identifier):
+    return _item_paths.get(identifier)
+
+
+def directory_fonts(directory):
+    """Sorted font files in a directory, re-listing the directory only when its mtime changes"""
+    directory = Path(directory)
+    conn = connect()
+    mtime = directory.stat().st_mtime_ns
+
+    row = conn.execute("SELECT mtime_ns FROM directories WHERE path = ?", (str(directory),)).fetchone()
+    if row is None or row[0] != mtime:
+        current = set()
+        for file in directory.iterdir():
+            if file.suffix in CYCLE_SUFFIXES:
+                current.add(str(file))
+                modified = util.modified(file, recursive=False)
+                known = conn.execute("SELECT mtime_ns, size FROM fonts WHERE path = ?", (str(file),)).fetchone()
+                if known != modified:
+                    _upsert(conn, file, modified, library=False)
+
+        for (path,) in conn.execute("SELECT path FROM fonts WHERE directory = ?", (str(directory),)).fetchall():
+            if path not in current and not Path(path).exists():
+                conn.execute("DELETE FROM fonts WHERE path = ?", (path,))
+
+        conn.execute("INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, ?)", (str(directory), mtime))
+        conn.commit()
+
+    rows = conn.execute("SELECT path FROM fonts WHERE directory = ? ORDER BY filename", (str(directory),))
+    return [Path(path) for (path,) in rows if Path(path).suffix in CYCLE_SUFFIXES]
+
+
+def describe(font_path):
+    """The indexed record for a font, (re)indexing it if it's new or has changed on disk"""
+    path = Path(util.normalize(font_path))
+    modified = util.modified(path, recursive=False)
+    conn = connect()
+
+    query = "SELECT mtime_ns, size, family, style, axes, features, ss_names, mesh, colr FROM fonts WHERE path = ?"
+    row = conn.execute(query, (str(path),)).fetchone()
+    if row is None or (row[0], row[1]) != modified:
+        _upsert(conn, path, modified, library=False)
+        conn.commit()
+        row = conn.execute(query, (str(path),)).fetchone()
+
+    _, _, family, style, axes, features, ss_names, mesh, colr = row
+    return dict(family=family, style=style,
+        axes=json.loads(axes),
+        features=json.loads(features),
+        ss_names=json.loads(ss_names),
+        mesh=bool(mesh), colr=bool(colr))
+
+
+class FontMetadata():
+    """Everything the panels & property helpers need to know about a font, so UI redraws never touch fontTools objects"""
+
+    def __init__(self, path, record):
+        self.path = path
+        self.family = record["family"]
+        self.style = record["style"]
+        self.display_name = f"{self.family} {self.style}".strip()
+
+        self.variation_axes = {a["tag"]: a for a in record["axes"]}
+        self.visible_axes = {k: a for k, a in self.variation_axes.items() if not a["flags"] & 0x0001}
+
+        self.features_gsub = record["features"]["GSUB"]
+        self.features_gpos = record["features"]["GPOS"]
+        self.stylistic_sets = [fea for fea in self.features_gsub if fea.startswith("ss")]
+        self.stylistic_set_names = record["ss_names"]
+
+        self.mesh = record["mesh"]
+        self.colr = record["colr"]
+
+    def stylistic_set_name(self, style):
+        return self.stylistic_set_names.get(style) or "Stylistic Set " + str(int(style[2:]))
+
+
+def _record_from_font(font_path):
+    """Sources (.ufo, .designspace) aren't indexed, so read the same record off the compiled font"""
+    from ST2 import fontcache
+
+    font = fontcache.load(font_path)
+    return dict(family=Path(font_path).stem, style="",
+        axes=[dict(v, tag=k) for k, v in font.variations().items()],
+        features={"GSUB": sorted(font.font.featuresGSUB), "GPOS": sorted(font.font.featuresGPOS)},
+        ss_names=dict(font.font.stylisticSetNames),
+        mesh="MESH" in font.font.ttFont,
+        colr=bool(font._colr))
+
+
+_metadata = {} # path -> ((mtime_ns, size), FontMetadata)
+
+
+def metadata(font_path):
+    """The font's FontMetadata, memoized until the file changes on disk (for a .ufo, until one of the files directly in it does: fontinfo.plist, features.fea, etc., not the glyphs, which metadata doesn't depend on)"""
+    path = util.normalize(font_path)
+    key = util.modified(path, recursive=False)
+
+    cached = _metadata.get(path)
+    if cached is None or cached[0] != key:
+        if Path(path).suffix.lower() in LIBRARY_SUFFIXES:
+            record = describe(path)
+        else:
+            record = _record_from_font(path)
+        cached = (key, FontMetadata(path, record))
+        _metadata[path] = cached
+    return cached[1]
+
+
+def forget(font_path=None):
+    if font_path is None:
+        _metadata.clear()
+    else:
+        _metadata.pop(util.normalize(font_path), None)
+
+
+def display_name(font_path):
+    """For panel labels; memoized per path & modification, via metadata()"""
+    try:
+        return metadata(font_path).display_name
+    except OSError:
+        return Path(font_path).stem
+
+
+def close():
+    global _connections_generation
+
+    with _connections_lock:
+        for conn in _connections.values():
+            _close(conn)
+        _connections.clear()
+        _connections_generation += 1
+
+
+classes = []
+panels = []
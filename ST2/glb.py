@@ -0,0 +1,340 @@
+# Minimal binary glTF (.glb) reader for the meshes stored in a font's MESH table.
+# Deliberately free of bpy, so it can also be used outside of Blender.
+
+import json, struct
+import numpy as np
+
+
+GLB_MAGIC = 0x46546C67 # "glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+TRIANGLES = 4
+
+COMPONENT_TYPES = {
+    5120: np.dtype("i1"),
+    5121: np.dtype("u1"),
+    5122: np.dtype("<i2"),
+    5123: np.dtype("<u2"),
+    5125: np.dtype("<u4"),
+    5126: np.dtype("<f4"),
+}
+
+TYPE_SIZES = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+
+SUPPORTED_EXTENSIONS = ["KHR_mesh_quantization"]
+
+
+class UnsupportedGLB(Exception):
+    """Valid glTF this reader doesn't handle (textures, sparse accessors, non-triangle primitives...); use a full importer instead"""
+    pass
+
+
+class Mesh():
+    """All of a GLB's triangles, merged into one mesh, still in glTF (Y-up) space"""
+
+    def __init__(self, positions, normals, uvs, indices, material_indices, materials):
+        self.positions = positions # (n, 3) float32
+        self.normals = normals # (n, 3) float32 or None
+        self.uvs = uvs # (n, 2) float32 or None
+        self.indices = indices # (3 * triangles,) uint32
+        self.material_indices = material_indices # (triangles,) int32
+        self.materials = materials # [dict(name, baseColorFactor, metallicFactor, roughnessFactor)]
+
+
+def read_chunks(data):
+    data = memoryview(data)
+    magic, version, length = struct.unpack_from("<3L", data, 0)
+    if magic != GLB_MAGIC:
+        raise ValueError("Not a binary glTF file")
+    if version != 2:
+        raise UnsupportedGLB(f"glTF version {version}")
+
+    gltf, binary = None, None
+    offset = 12
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from("<2L", data, offset)
+        chunk = data[offset+8:offset+8+chunk_length]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(bytes(chunk).decode("utf-8"))
+        elif chunk_type == CHUNK_BIN and binary is None:
+            binary = chunk
+        offset += 8 + chunk_length
+
+    if gltf is None:
+        raise ValueError("glTF file has no JSON chunk")
+    return gltf, binary
+
+
+def read_accessor(gltf, binary, index):
+    accessor = gltf["accessors"][index]
+    if "sparse" in accessor or "bufferView" not in accessor:
+        raise UnsupportedGLB("sparse accessor")
+
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    if view.get("buffer", 0) != 0 or binary is None:
+        raise UnsupportedGLB("external buffer")
+
+    dtype = COMPONENT_TYPES[accessor["componentType"]]
+    width = TYPE_SIZES[accessor["type"]]
+    count = accessor["count"]
+    offset = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+    stride = view.get("byteStride") or dtype.itemsize * width
+
+    values = np.ndarray((count, width), dtype=dtype, buffer=binary, offset=offset, strides=(stride, dtype.itemsize))
+
+    if width == 1 and dtype.kind == "u" and not accessor.get("normalized"):
+        return values.ravel().astype(np.uint32) # indices
+
+    if accessor.get("normalized"):
+        if dtype.kind == "u":
+            values = values / np.iinfo(dtype).max
+        else:
+            values = np.maximum(values / np.iinfo(dtype).max, -1.0)
+
+    return values.astype(np.float32)
+
+
+def node_matrix(node):
+    if "matrix" in node:
+        return np.array(node["matrix"], dtype=np.float64).reshape(4, 4).T # column-major
+
+    tx, ty, tz = node.get("translation", [0, 0, 0])
+    x, y, z, w = node.get("rotation", [0, 0, 0, 1])
+    sx, sy, sz = node.get("scale", [1, 1, 1])
+
+    rotation = np.array([
+        [1-2*(y*y+z*z), 2*(x*y-z*w), 2*(x*z+y*w)],
+        [2*(x*y+z*w), 1-2*(x*x+z*z), 2*(y*z-x*w)],
+        [2*(x*z-y*w), 2*(y*z+x*w), 1-2*(x*x+y*y)]])
+
+    m = np.identity(4)
+    m[:3, :3] = rotation * np.array([sx, sy, sz])
+    m[:3, 3] = [tx, ty, tz]
+    return m
+
+
+def mesh_instances(gltf):
+    """(mesh index, world matrix) for every mesh in the default scene"""
+    scene = gltf.get("scene", 0)
+    if "scenes" in gltf:
+        roots = gltf["scenes"][scene].get("nodes", [])
+    else:
+        roots = list(range(len(gltf.get("nodes", []))))
+
+    def walk(idx, parent):
+        node = gltf["nodes"][idx]
+        matrix = parent @ node_matrix(node)
+        if "mesh" in node:
+            yield node["mesh"], matrix
+        for child in node.get("children", []):
+            yield from walk(child, matrix)
+
+    for root in roots:
+        yield from walk(root, np.identity(4))
+
+
+def material_description(gltf, index):
+    if index is None:
+        return dict(name="ST2.Mesh", baseColorFactor=[0.8, 0.8, 0.8, 1.0], metallicFactor=0.0, roughnessFactor=0.5)
+
+    material = gltf["materials"][index]
+    pbr = material.get("pbrMetallicRoughness", {})
+    if "baseColorTexture" in pbr or "metallicRoughnessTexture" in pbr or "normalTexture" in material or "emissiveTexture" in material:
+        raise UnsupportedGLB("textured material")
+
+    return dict(name=material.get("name", f"ST2.Material.{index}"),
+        baseColorFactor=pbr.get("baseColorFactor", [1.0, 1.0, 1.0, 1.0]),
+        metallicFactor=pbr.get("metallicFactor", 1.0),
+        roughnessFactor=pbr.get("roughnessFactor", 1.0))
+
+
+def decode(data):
+    """Read every triangle primitive in a GLB into a single Mesh (applying node transforms), or raise UnsupportedGLB"""
+    gltf, binary = read_chunks(data)
+
+    unsupported = [e for e in gltf.get("extensionsRequired", []) if e not in SUPPORTED_EXTENSIONS]
+    if unsupported:
+        raise UnsupportedGLB(", ".join(unsupported))
+
+    positions, normals, uvs, indices, material_indices = [], [], [], [], []
+    materials, material_slots = [], {}
+    vertex_count = 0
+
+    for mesh_index, matrix in mesh_instances(gltf):
+        normal_matrix = np.linalg.inv(matrix[:3, :3]).T
+
+        for primitive in gltf["meshes"][mesh_index]["primitives"]:
+            if primitive.get("mode", TRIANGLES) != TRIANGLES:
+                raise UnsupportedGLB("non-triangle primitive")
+
+            attributes = primitive["attributes"]
+            pos = read_accessor(gltf, binary, attributes["POSITION"])
+            positions.append((pos @ matrix[:3, :3].T + matrix[:3, 3]).astype(np.float32))
+
+            if "NORMAL" in attributes:
+                nrm = read_accessor(gltf, binary, attributes["NORMAL"]) @ normal_matrix.T
+                nrm /= np.maximum(np.linalg.norm(nrm, axis=1, keepdims=True), 1e-12)
+                normals.append(nrm.astype(np.float32))
+            else:
+                normals.append(None)
+
+            if "TEXCOORD_0" in attributes:
+                uvs.append(read_accessor(gltf, binary, attributes["TEXCOORD_0"]).astype(np.float32))
+            else:
+                uvs.append(None)
+
+            if "indices" in primitive:
+                idx = read_accessor(gltf, binary, primitive["indices"])
+            else:
+                idx = np.arange(len(pos), dtype=np.uint32)
+            indices.append(idx + vertex_count)
+            vertex_count += len(pos)
+
+            material = primitive.get("material")
+            if material not in material_slots:
+                material_slots[material] = len(materials)
+                materials.append(material_description(gltf, material))
+            material_indices.append(np.full(len(idx) // 3, material_slots[material], dtype=np.int32))
+
+    if not positions:
+        raise UnsupportedGLB("no meshes")
+
+    def merged(parts, width):
+        if all(p is None for p in parts):
+            return None
+        return np.concatenate([p if p is not None else np.zeros((len(pos), width), dtype=np.float32)
+            for p, pos in zip(parts, positions)])
+
+    return Mesh(np.concatenate(positions),
+        merged(normals, 3),
+        merged(uvs, 2),
+        np.concatenate(indices),
+        np.concatenate(material_indices),
+        materials)
+
+
+def yup_to_zup(vectors):
+    """glTF's +Y up to Blender's +Z up, the same conversion Blender's glTF importer makes: (x, y, z) -> (x, -z, y)"""
+    return np.stack([vectors[:, 0], -vectors[:, 2], vectors[:, 1]], axis=1)
+
+
+def zup_to_yup(vectors):
+    """Blender's +Z up to glTF's +Y up, the inverse of yup_to_zup: (x, y, z) -> (x, z, -y)"""
+    return np.stack([vectors[:, 0], vectors[:, 2], -vectors[:, 1]], axis=1)
+
+
+def is_quantized(data):
+    gltf, _ = read_chunks(data)
+    return "KHR_mesh_quantization" in gltf.get("extensionsUsed", [])
+
+
+def encode(mesh, quantize=False):
+    """Write a Mesh as a GLB; with `quantize`, positions become int16 & normals int8 (KHR_mesh_quantization), dequantized by the node's transform"""
+    binary = bytearray()
+    views, accessors = [], []
+
+    def add(array, component_type, kind, count, stride=None, normalized=False, target=None, minmax=False):
+        while len(binary) % 4:
+            binary.append(0)
+        view = dict(buffer=0, byteOffset=len(binary), byteLength=array.nbytes)
+        if stride:
+            view["byteStride"] = stride
+        if target:
+            view["target"] = target
+        views.append(view)
+        binary.extend(array.tobytes())
+
+        accessor = dict(bufferView=len(views)-1, componentType=component_type, count=count, type=kind)
+        if normalized:
+            accessor["normalized"] = True
+        if minmax:
+            values = array[:, :3] if array.ndim > 1 else array
+            accessor["min"] = values.min(axis=0).tolist()
+            accessor["max"] = values.max(axis=0).tolist()
+        accessors.append(accessor)
+        return len(accessors) - 1
+
+    count = len(mesh.positions)
+    node = dict(mesh=0)
+    attributes = {}
+
+    if quantize:
+        lo, hi = mesh.positions.min(axis=0), mesh.positions.max(axis=0)
+        # one step for all axes: under a non-uniform scale, normals would have to be stored pre-scaled
+        # by it, & decoding would magnify their int8 rounding by the mesh's aspect ratio (a glyph is
+        # much wider than it's deep)
+        extent = float((hi - lo).max())
+        step = np.full(3, extent / 65534 if extent > 0 else 1.0)
+        q = np.zeros((count, 4), dtype="<i2") # padded to keep every vertex 4-byte aligned
+        q[:, :3] = np.round((mesh.positions - lo) / step) - 32767
+        attributes["POSITION"] = add(q, 5122, "VEC3", count, stride=8, target=34962, minmax=True)
+        node["translation"] = (lo + 32767 * step).tolist()
+        node["scale"] = step.tolist()
+    else:
+        attributes["POSITION"] = add(mesh.positions.astype("<f4"), 5126, "VEC3", count, target=34962, minmax=True)
+
+    if mesh.normals is not None:
+        if quantize:
+            # the node's (uniform) scale applies to normals too, but they're renormalized after it
+            normals = mesh.normals / np.maximum(np.linalg.norm(mesh.normals, axis=1, keepdims=True), 1e-12)
+            n = np.zeros((count, 4), dtype="i1")
+            n[:, :3] = np.round(normals * 127)
+            attributes["NORMAL"] = add(n, 5120, "VEC3", count, stride=4, normalized=True, target=34962)
+        else:
+            attributes["NORMAL"] = add(mesh.normals.astype("<f4"), 5126, "VEC3", count, target=34962)
+
+    if mesh.uvs is not None:
+        if quantize and mesh.uvs.min() >= 0 and mesh.uvs.max() <= 1:
+            attributes["TEXCOORD_0"] = add(np.round(mesh.uvs * 65535).astype("<u2"), 5123, "VEC2", count, normalized=True, target=34962)
+        else:
+            attributes["TEXCOORD_0"] = add(mesh.uvs.astype("<f4"), 5126, "VEC2", count, target=34962)
+
+    index_type, index_component = ("<u2", 5123) if count < 65536 else ("<u4", 5125)
+    triangles = mesh.indices.reshape(-1, 3)
+    primitives = []
+    for slot in range(max(len(mesh.materials), 1)):
+        selected = triangles[mesh.material_indices == slot].ravel()
+        if len(selected) == 0:
+            continue
+        primitive = dict(attributes=attributes, indices=add(selected.astype(index_type), index_component, "SCALAR", len(selected), target=34963))
+        if mesh.materials:
+            primitive["material"] = slot
+        primitives.append(primitive)
+
+    gltf = dict(asset=dict(version="2.0", generator="ST2"),
+        scene=0,
+        scenes=[dict(nodes=[0])],
+        nodes=[node],
+        meshes=[dict(primitives=primitives)],
+        accessors=accessors,
+        bufferViews=views,
+        buffers=[dict(byteLength=len(binary))])
+
+    if mesh.materials:
+        gltf["materials"] = [dict(name=m["name"], pbrMetallicRoughness=dict(
+            baseColorFactor=list(m["baseColorFactor"]),
+            metallicFactor=m["metallicFactor"],
+            roughnessFactor=m["roughnessFactor"])) for m in mesh.materials]
+
+    if quantize:
+        gltf["extensionsUsed"] = ["KHR_mesh_quantization"]
+        gltf["extensionsRequired"] = ["KHR_mesh_quantization"]
+
+    while len(binary) % 4:
+        binary.append(0)
+    js = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    js += b" " * (-len(js) % 4)
+
+    length = 12 + 8 + len(js) + 8 + len(binary)
+    return b"".join([
+        struct.pack("<3L", GLB_MAGIC, 2, length),
+        struct.pack("<2L", len(js), CHUNK_JSON), js,
+        struct.pack("<2L", len(binary), CHUNK_BIN), bytes(binary)])
+
+
+def quantize(data):
+    """A quantized copy of a GLB (unchanged if it already is); raises UnsupportedGLB for anything decode can't read"""
+    if is_quantized(data):
+        return bytes(data)
+    return encode(decode(data), quantize=True)
@@ -0,0 +1,211 @@
+import bpy
+import numpy as np
+
+from ST2 import tessellate
+
+
+INSTANCE_COLLECTION = "ST2.Instances"
+NODE_GROUP = "ST2.Instancer"
+MODIFIER = "ST2 Instances"
+
+KEY_PROPERTY = "st2_outline_key"
+KEYS_PROPERTY = "st2_outline_keys"
+OUTLINE_ATTRIBUTE = "st2_outline" # per point, an index into the object's KEYS_PROPERTY
+
+MAX_PROTOTYPES = 4096 # unused prototypes are pruned beyond this
+
+
+def collection():
+    """Every prototype outline mesh, shared by all instancing text objects (never linked into a scene; Collection Info evaluates it anyway)"""
+    coll = bpy.data.collections.get(INSTANCE_COLLECTION)
+    if coll is None:
+        coll = bpy.data.collections.new(INSTANCE_COLLECTION)
+        coll.use_fake_user = True
+    return coll
+
+
+def _enabled_output(node):
+    # named-attribute nodes have one output per data type, only the current one enabled
+    return [s for s in node.outputs if s.enabled][0]
+
+
+def node_group():
+    group = bpy.data.node_groups.get(NODE_GROUP)
+    if group is not None:
+        return group
+
+    group = bpy.data.node_groups.new(NODE_GROUP, "GeometryNodeTree")
+    if hasattr(group, "interface"):
+        group.interface.new_socket("Geometry", in_out="INPUT", socket_type="NodeSocketGeometry")
+        group.interface.new_socket("Geometry", in_out="OUTPUT", socket_type="NodeSocketGeometry")
+    else:
+        group.inputs.new("NodeSocketGeometry", "Geometry")
+        group.outputs.new("NodeSocketGeometry", "Geometry")
+
+    nodes, links = group.nodes, group.links
+    group_input = nodes.new("NodeGroupInput")
+    group_output = nodes.new("NodeGroupOutput")
+
+    info = nodes.new("GeometryNodeCollectionInfo")
+    info.inputs["Collection"].default_value = collection()
+    info.inputs["Separate Children"].default_value = True
+    info.inputs["Reset Children"].default_value = True
+
+    glyph_id = nodes.new("GeometryNodeInputNamedAttribute")
+    glyph_id.data_type = "INT"
+    glyph_id.inputs["Name"].default_value = "glyph_id"
+
+    instance = nodes.new("GeometryNodeInstanceOnPoints")
+    instance.inputs["Pick Instance"].default_value = True
+
+    links.new(group_input.outputs[0], instance.inputs["Points"])
+    links.new(info.outputs[0], instance.inputs["Instance"])
+    links.new(_enabled_output(glyph_id), instance.inputs["Instance Index"])
+    links.new(instance.outputs[0], group_output.inputs[0])
+
+    group_input.location = (-400, 0)
+    info.location = (-400, -150)
+    glyph_id.location = (-400, -400)
+    group_output.location = (300, 0)
+    return group
+
+
+def is_instancer(obj):
+    return obj.type == "MESH" and MODIFIER in obj.modifiers
+
+
+def instancers():
+    return [o for o in bpy.data.objects if is_instancer(o)]
+
+
+def add_modifier(obj):
+    modifier = obj.modifiers.new(MODIFIER, "NODES")
+    modifier.node_group = node_group()
+    return modifier
+
+
+def prototypes():
+    """key -> prototype object"""
+    return {o[KEY_PROPERTY]: o for o in collection().objects if KEY_PROPERTY in o}
+
+
+def prototype_ids():
+    """key -> the index Collection Info's "Separate Children" gives each prototype (its position by name)"""
+    objs = sorted(collection().objects, key=lambda o: o.name)
+    return {o[KEY_PROPERTY]: idx for idx, o in enumerate(objs) if KEY_PROPERTY in o}
+
+
+def add_prototype(key, recording, origin, data, materials):
+    from ST2.typesetter import outlines_mesh
+
+    coll = collection()
+    number = coll.get("st2_next", 0)
+    coll["st2_next"] = number + 1
+    # zero-padded, so sorting by name (which Collection Info does) keeps creation
+    # order & a new prototype never shifts the ids of existing ones
+    name = f"ST2.Glyph.{number:06d}"
+
+    # 3*scale b/c of the 3pt fontSize hardcoded in base_style_kwargs
+    tolerance = data.mesh_tolerance * 3 * data.scale
+    normalized = tessellate.translate_recording(recording, -origin[0], -origin[1])
+    outline = tessellate.Outline(tessellate.flatten_recording(normalized, tolerance))
+    mesh = outlines_mesh(bpy.data.meshes.new(name), [outline], data.mesh_extrude, data.mesh_bevel_depth)
+    for material in materials:
+        mesh.materials.append(material)
+
+    obj = bpy.data.objects.new(name, mesh)
+    obj[KEY_PROPERTY] = key
+    coll.objects.link(obj)
+    return obj
+
+
+def remap(obj):
+    """Rewrite an instancer's glyph_id attribute from its per-point outline keys, after prototypes were added or removed"""
+    mesh = obj.data
+    keys = list(obj.get(KEYS_PROPERTY, []))
+    if OUTLINE_ATTRIBUTE not in mesh.attributes or "glyph_id" not in mesh.attributes:
+        return
+
+    outlines = np.zeros(len(mesh.vertices), dtype=np.int32)
+    mesh.attributes[OUTLINE_ATTRIBUTE].data.foreach_get("value", outlines)
+    ids = prototype_ids()
+    table = np.array([ids.get(k, -1) for k in keys] or [-1], dtype=np.int32)
+    mesh.attributes["glyph_id"].data.foreach_set("value", table[outlines])
+    mesh.update()
+
+
+def prune():
+    """Drop prototypes no instancer uses, once there are too many of them"""
+    coll = collection()
+    if len(coll.objects) <= MAX_PROTOTYPES:
+        return
+
+    used = set()
+    objs = instancers()
+    for obj in objs:
+        used.update(obj.get(KEYS_PROPERTY, []))
+
+    for key, proto in prototypes().items():
+        if key not in used:
+            mesh = proto.data
+            bpy.data.objects.remove(proto, do_unlink=True)
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+
+    for obj in objs:
+        remap(obj)
+
+
+def write_points(obj, p, data):
+    """Point `obj`'s mesh at each glyph of `p` (one vertex per glyph, at the corner of its outline), creating prototypes for outlines not seen before; only the points & their attributes change when the text does"""
+    from ST2.typesetter import pen_leaves, set_attribute, glyph_attributes
+
+    existing = prototypes()
+    # prototypes carry the materials (instances render with their prototype's), so instancers with different ones can't share them
+    materials = tuple(m.name_full if m else "" for m in obj.data.materials)
+    settings = ("instance", round(data.mesh_tolerance * 3 * data.scale, 6), round(data.mesh_extrude, 5), round(data.mesh_bevel_depth, 5), materials)
+
+    keys = {} # key -> index into this object's KEYS_PROPERTY
+    positions, outlines, advance, leaves = [], [], [], []
+    added = False
+
+    for leaf in pen_leaves(p):
+        recording = leaf.v.value
+        if not recording:
+            continue
+
+        key, origin = tessellate.outline_key([recording], *settings)
+        if key not in existing:
+            existing[key] = add_prototype(key, recording, origin, data, obj.data.materials)
+            added = True
+
+        positions.append((origin[0], origin[1], 0))
+        outlines.append(keys.setdefault(key, len(keys)))
+        advance.append(leaf.data("advance", 0))
+        leaves.append(leaf)
+
+    obj[KEYS_PROPERTY] = list(keys.keys())
+
+    mesh = obj.data
+    mesh.clear_geometry()
+    mesh.vertices.add(len(positions))
+    if positions:
+        mesh.vertices.foreach_set("co", np.array(positions, dtype=np.float32).ravel())
+
+    ids = prototype_ids()
+    table = np.array([ids[k] for k in keys] or [0], dtype=np.int32)
+    outlines = np.array(outlines, dtype=np.int32)
+
+    set_attribute(mesh, OUTLINE_ATTRIBUTE, "INT", "POINT", outlines)
+    set_attribute(mesh, "glyph_id", "INT", "POINT", table[outlines] if len(outlines) else outlines)
+    set_attribute(mesh, "advance", "FLOAT", "POINT", np.array(advance, dtype=np.float32))
+    for name, (data_type, values) in glyph_attributes(leaves).items():
+        set_attribute(mesh, name, data_type, "POINT", values)
+    mesh.update()
+
+    if added:
+        prune()
+
+
+classes = []
+panels = []
@@ -19,8 +19,7 @@ class ST2_OT_InterpolateStrings(bpy.types.Operator):
         b = editables[1]
         collection = a.users_collection[0]
 
-        font = a.st2.font()
-        fvars = a.st2.visible_variation_axes(font)
+        fvars = a.st2.visible_variation_axes()
 
         from coldtype.timing.easing import ease
         from coldtype.interpolation import norm
@@ -0,0 +1,142 @@
+# Builds a MESH table (see meshtable.py) from a font's own outlines: every glyph is
+# flattened, triangulated & extruded in a process pool and stored as a GLB.
+# Free of bpy, so it runs headless, e.g. as part of a font build:
+#
+#   python ST2/meshbuilder.py MyFont.ttf -o MyFont-mesh.ttf --extrude 40 --bevel 8 --ppem 1000 --ppem 200
+
+import argparse, os, sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from fontTools.ttLib import TTFont
+from fontTools.ttLib.ttFont import registerCustomTableClass
+from fontTools.pens.recordingPen import DecomposingRecordingPen
+
+if __package__:
+    from . import glb, meshtable, tessellate
+else:
+    import glb, meshtable, tessellate
+
+
+DEFAULT_PPEM = 1000
+DEFAULT_TOLERANCE = 0.5 # pixels, at the strike's ppem
+
+# the typesetter draws at a 3pt fontSize & scales instances by 0.3, so an em is
+# 10 mesh units; origin offsets are multiplied by 0.003, i.e. they're per-1000-em
+MESH_UNITS_PER_EM = 10
+OFFSET_UNITS_PER_EM = 1000
+
+
+def register():
+    registerCustomTableClass("MESH", meshtable.__name__, "table__M_E_S_H")
+
+
+def build_glyph(recording, upem, extrude, bevel, tolerance, compress):
+    """(GLB bytes, originOffsetX, originOffsetY) for one glyph's outline recording (all in font units), or None if it has no filled area"""
+    outline = tessellate.Outline(tessellate.flatten_recording(recording, tolerance))
+    positions, triangles = tessellate.extrude(outline, extrude, bevel)
+    if len(triangles) == 0:
+        return None
+
+    # meshes are stored relative to their lower-left corner, which keeps
+    # their coordinates (and so their quantization error) small
+    origin = np.round(positions[:, :2].min(axis=0) * OFFSET_UNITS_PER_EM / upem)
+    local = positions.astype(np.float64)
+    local[:, :2] -= origin * upem / OFFSET_UNITS_PER_EM
+    local *= MESH_UNITS_PER_EM / upem
+
+    mesh = glb.Mesh(local.astype(np.float32), None, None,
+        triangles.ravel().astype(np.uint32),
+        np.zeros(len(triangles), dtype=np.int32),
+        [])
+    return glb.encode(mesh, quantize=compress), int(origin[0]), int(origin[1])
+
+
+def glyph_recordings(font, glyph_names):
+    glyphSet = font.getGlyphSet()
+    for glyph_name in glyph_names:
+        pen = DecomposingRecordingPen(glyphSet)
+        glyphSet[glyph_name].draw(pen)
+        yield glyph_name, pen.value
+
+
+def build_strike(font, recordings, executor, ppem, extrude, bevel, tolerance, compress):
+    """A meshtable.Strike for `ppem`; `tolerance` is in pixels at that size"""
+    upem = font["head"].unitsPerEm
+    tolerance_units = tolerance * upem / ppem
+    graphicType = meshtable.COMPRESSED_GRAPHIC_TYPE if compress else "glb "
+
+    # glyphs with identical outlines are only built once (and their records
+    # become "dupe"s when the strike compiles)
+    jobs = {}
+    for glyph_name, recording in recordings.items():
+        key = repr(recording)
+        if key not in jobs:
+            jobs[key] = executor.submit(build_glyph, recording, upem, extrude, bevel, tolerance_units, compress)
+
+    strike = meshtable.Strike(ppem=ppem)
+    for glyph_name, recording in recordings.items():
+        result = jobs[repr(recording)].result()
+        if result is None:
+            continue
+        meshData, originOffsetX, originOffsetY = result
+        strike.glyphs[glyph_name] = meshtable.Glyph(glyphName=glyph_name,
+            originOffsetX=originOffsetX,
+            originOffsetY=originOffsetY,
+            graphicType=graphicType,
+            meshData=meshData)
+
+    print(f"strike {ppem}: {len(strike.glyphs)} glyphs, {len(jobs)} unique outlines")
+    return strike
+
+
+def build(font_path, output_path, extrude=0, bevel=0, tolerance=DEFAULT_TOLERANCE, ppems=(DEFAULT_PPEM,), glyph_names=None, compress=False, workers=None):
+    register()
+    font = TTFont(font_path)
+    if glyph_names is None:
+        glyph_names = font.getGlyphOrder()
+
+    missing = [g for g in glyph_names if g not in font.getGlyphSet()]
+    if missing:
+        raise ValueError(f"glyphs not in {font_path}: {', '.join(missing)}")
+
+    recordings = dict(glyph_recordings(font, glyph_names))
+
+    table = meshtable.table__M_E_S_H("MESH")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for ppem in sorted(set(ppems)):
+            table.strikes[ppem] = build_strike(font, recordings, executor, ppem, extrude, bevel, tolerance, compress)
+
+    font["MESH"] = table
+    font.save(output_path)
+    print("saved", output_path, f"({os.path.getsize(output_path)} bytes)")
+    return output_path
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog="meshbuilder", description="Add a MESH table of extruded glyph outlines to a font")
+    parser.add_argument("font", type=Path)
+    parser.add_argument("-o", "--output", type=Path, help="defaults to <font>-mesh.<ext>, next to the input")
+    parser.add_argument("--extrude", type=float, default=0, help="extrusion either side of the glyph plane, in font units (like a curve's Extrude)")
+    parser.add_argument("--bevel", type=float, default=0, help="chamfer size, in font units (like a curve's Bevel Depth)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="max distance between curves & their flattened polylines, in pixels at each strike's ppem")
+    parser.add_argument("--ppem", type=int, action="append", help=f"a strike (level of detail) to build; repeat for several (default {DEFAULT_PPEM})")
+    parser.add_argument("--glyphs", help="comma-separated glyph names (default: all)")
+    parser.add_argument("--compress", action="store_true", help="store quantized, zlib-compressed (glbz) meshes")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(args)
+
+    output = args.output or args.font.with_name(f"{args.font.stem}-mesh{args.font.suffix}")
+    build(args.font, output,
+        extrude=args.extrude,
+        bevel=args.bevel,
+        tolerance=args.tolerance,
+        ppems=args.ppem or [DEFAULT_PPEM],
+        glyph_names=args.glyphs.split(",") if args.glyphs else None,
+        compress=args.compress,
+        workers=args.workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import bpy, hashlib
+from collections import OrderedDict
+
+from ST2 import util
+
+
+MESH_CACHE_COLLECTION = "ST2.MeshCache"
+TRIM_INTERVAL = 10 # seconds
+
+_usage = OrderedDict() # prototype object name -> None, least-recently-used first
+_sizes = {} # mesh name -> estimated bytes
+_retired = set() # names of meshes from an older version of a font, still linked by glyph instances
+
+
+def collection():
+    if MESH_CACHE_COLLECTION not in bpy.data.collections:
+        coll = bpy.data.collections.new(MESH_CACHE_COLLECTION)
+        bpy.context.scene.collection.children.link(coll)
+    
+    mcc = bpy.data.collections[MESH_CACHE_COLLECTION]
+    mcc.hide_select = True
+    mcc.hide_viewport = True
+    mcc.hide_render = True
+    return mcc
+
+
+def font_key(font_path):
+    """Identifies a font in prototype names: a hash of its normalized path, so fonts with the same name in different folders (or one name extending another, like Font & Font.Italic) never share prototypes"""
+    return hashlib.sha1(util.normalize(font_path).encode("utf-8")).hexdigest()[:16]
+
+
+def prototype_key(font_path, ppem, glyphName):
+    return f"{font_key(font_path)}.{ppem}.{glyphName}"
+
+
+def font_version(font_path):
+    """Identifies what's on disk for a font, stamped on the prototypes imported from it"""
+    return repr(util.modified(font_path))
+
+
+def stamp(obj, version):
+    obj["st2_font_version"] = version
+
+
+def clear_stale(font_path, version):
+    """Drop the font's prototypes imported from another version of it (e.g. it changed on disk while the .blend was closed)"""
+    prefix = f"{font_key(font_path)}."
+    stale = [o for o in prototypes() if o.name.startswith(prefix) and o.get("st2_font_version") != version]
+    if stale:
+        clear(font_path)
+
+
+def estimate(mesh):
+    """Rough bytes held by a mesh datablock (coordinates, topology & per-corner data)"""
+    if mesh.name not in _sizes:
+        _sizes[mesh.name] = len(mesh.vertices)*32 + len(mesh.edges)*16 + len(mesh.loops)*24 + len(mesh.polygons)*24
+    return _sizes[mesh.name]
+
+
+def touch(names):
+    """Record that these prototypes were just used by a build"""
+    for name in names:
+        _usage[name] = None
+        _usage.move_to_end(name)
+
+
+def prototypes():
+    if MESH_CACHE_COLLECTION not in bpy.data.collections:
+        return []
+    return list(bpy.data.collections[MESH_CACHE_COLLECTION].objects)
+
+
+def instance_users(protos):
+    """mesh name -> how many users a mesh has beyond the cached prototypes themselves, i.e. live glyph instances"""
+    prototype_users = {}
+    for o in protos:
+        prototype_users[o.data.name] = prototype_users.get(o.data.name, 0) + 1
+    return {o.data.name: o.data.users - prototype_users[o.data.name] for o in protos}
+
+
+def total():
+    meshes = {o.data.name: o.data for o in prototypes() if o.data}
+    return sum(estimate(m) for m in meshes.values())
+
+
+def count():
+    return len(prototypes())
+
+
+def remove(obj):
+    mesh = obj.data
+    _usage.pop(obj.name, None)
+    bpy.data.objects.remove(obj, do_unlink=True)
+    if mesh and mesh.users == 0:
+        _sizes.pop(mesh.name, None)
+        bpy.data.meshes.remove(mesh)
+
+
+def retire(mesh):
+    """Rename a mesh out of the prototype names, so imports don't find it by name; build_mesh relinks its instances to the new prototype & trim() frees it once they have"""
+    _sizes.pop(mesh.name, None)
+    mesh.name = "ST2.retired"
+    _retired.add(mesh.name)
+
+
+def free_retired():
+    for name in list(_retired):
+        mesh = bpy.data.meshes.get(name)
+        if mesh is None or mesh.users == 0:
+            _retired.discard(name)
+            if mesh is not None:
+                bpy.data.meshes.remove(mesh)
+
+
+def trim(scene, budget=None):
+    """Evict least-recently-used prototypes that no glyph instance links any more, until the cache fits its budget"""
+    free_retired()
+
+    if budget is None:
+        if scene is None:
+            return
+        budget = scene.st2.mesh_cache_budget * 1024 * 1024
+
+    protos = [o for o in prototypes() if o.data]
+    users = instance_users(protos)
+    by_name = {o.name: o for o in protos}
+    # prototypes from before this session have no recorded use, so go first
+    order = [n for n in by_name.keys() if n not in _usage] + [n for n in _usage.keys() if n in by_name]
+
+    size = total()
+    for name in order:
+        if size <= budget:
+            break
+        
+        obj = by_name[name]
+        if users[obj.data.name] > 0:
+            continue
+        
+        # "dupe" glyphs' prototypes share a mesh, which is only freed along with the last of them
+        shared = sum(1 for o in protos if o.data == obj.data)
+        freed = estimate(obj.data) if shared == 1 else 0
+
+        protos.remove(obj)
+        remove(obj)
+        size -= freed
+
+
+def _trim_periodically():
+    # builds trim after themselves, but deleting a text object (or switching it to another font) drops its instances without one
+    if hasattr(bpy.app, "is_job_running") and bpy.app.is_job_running("RENDER"):
+        return TRIM_INTERVAL
+    try:
+        trim(bpy.context.scene)
+    except AttributeError: # no scene yet
+        pass
+    return TRIM_INTERVAL
+
+
+def start():
+    if not bpy.app.timers.is_registered(_trim_periodically):
+        bpy.app.timers.register(_trim_periodically, first_interval=TRIM_INTERVAL, persistent=True)
+
+
+def shutdown():
+    if bpy.app.timers.is_registered(_trim_periodically):
+        bpy.app.timers.unregister(_trim_periodically)
+
+
+def clear(font_path=None):
+    if MESH_CACHE_COLLECTION not in bpy.data.collections:
+        return
+    
+    prefix = f"{font_key(font_path)}." if font_path else ""
+    meshes = set()
+    for o in prototypes():
+        if o.name.startswith(prefix):
+            if o.data:
+                meshes.add(o.data.name)
+            remove(o)
+    
+    # the font's changed, so meshes glyph instances still link are out of date
+    for name in meshes:
+        mesh = bpy.data.meshes.get(name)
+        if mesh is not None:
+            retire(mesh)
+
+
+classes = []
+panels = []
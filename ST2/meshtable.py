@@ -8,7 +8,8 @@ import struct
 
 from fontTools.misc import sstruct
 from fontTools.misc.textTools import readHex, safeEval
-import struct
+from collections.abc import MutableMapping
+import hashlib, io, struct, zlib
 
 
 meshGlyphHeaderFormat = """
@@ -26,6 +27,29 @@ meshGlyphHeaderFormat = """
 
 meshGlyphHeaderFormatSize = sstruct.calcsize(meshGlyphHeaderFormat)
 
+# "glb " records hold a binary glTF as-is; "glbz" records hold one with quantized
+# positions & normals (KHR_mesh_quantization), zlib-compressed. Either way a
+# decompiled Glyph's meshData is plain GLB, so readers never need to care which.
+COMPRESSED_GRAPHIC_TYPE = "glbz"
+COMPRESSION_LEVEL = 9
+
+
+def _glb():
+    if __package__:
+        from . import glb
+    else:
+        import glb
+    return glb
+
+
+def compressMeshData(meshData):
+    """Quantize (where the GLB is simple enough to) & compress a GLB for a "glbz" record"""
+    try:
+        meshData = _glb().quantize(meshData)
+    except Exception:
+        pass # compressed but not quantized is still valid
+    return zlib.compress(meshData, COMPRESSION_LEVEL)
+
 
 class Glyph(object):
     def __init__(self, glyphName=None, referenceGlyphName=None, originOffsetX=0, originOffsetY=0, graphicType=None, meshData=None, rawdata=None, gid=0):
@@ -67,6 +91,9 @@ class Glyph(object):
                 # this glyph is a reference to another glyph's image data
                 gid, = struct.unpack(">H", self.rawdata[meshGlyphHeaderFormatSize:])
                 self.referenceGlyphName = ttFont.getGlyphName(gid)
+            elif self.graphicType == COMPRESSED_GRAPHIC_TYPE:
+                self.meshData = zlib.decompress(self.rawdata[meshGlyphHeaderFormatSize:])
+                self.referenceGlyphName = None
             else:
                 self.meshData = self.rawdata[meshGlyphHeaderFormatSize:]
                 self.referenceGlyphName = None
@@ -84,7 +111,15 @@ class Glyph(object):
         if self.graphicType is None:
             self.rawdata = b""
         else:
-            self.rawdata = sstruct.pack(meshGlyphHeaderFormat, self) + self.meshData
+            self.rawdata = sstruct.pack(meshGlyphHeaderFormat, self) + self.payload(ttFont)
+
+    def payload(self, ttFont):
+        """The record's data after its header: the mesh itself, or for a "dupe", the referenced glyph id"""
+        if self.graphicType == "dupe" and self.referenceGlyphName is not None:
+            return struct.pack(">H", ttFont.getGlyphID(self.referenceGlyphName))
+        if self.graphicType == COMPRESSED_GRAPHIC_TYPE:
+            return compressMeshData(self.meshData)
+        return self.meshData
 
     def toXML(self, xmlWriter, ttFont):
         if self.graphicType == None:
@@ -118,7 +153,8 @@ class Glyph(object):
             # glyph is a "dupe", i.e. a reference to another glyph's image data.
             # in this case meshData contains the glyph id of the reference glyph
             # get glyph id from glyphname
-            self.meshData = struct.pack(">H", ttFont.getGlyphID(safeEval("'''" + attrs["glyphname"] + "'''")))
+            self.referenceGlyphName = safeEval("'''" + attrs["glyphname"] + "'''")
+            self.meshData = struct.pack(">H", ttFont.getGlyphID(self.referenceGlyphName))
         elif name == "hexdata":
             self.meshData = readHex(content)
         else:
@@ -144,6 +180,48 @@ meshStrikeHeaderFormatSize = sstruct.calcsize(meshStrikeHeaderFormat)
 meshGlyphDataOffsetFormatSize = sstruct.calcsize(meshGlyphDataOffsetFormat)
 
 
+class LazyGlyphs(MutableMapping):
+    """glyphName -> Glyph for a decompiled strike, where each Glyph is only
+    decompiled when it's first looked up, and its meshData is a memoryview
+    into the table data rather than a copy"""
+
+    def __init__(self, data, glyphDataOffsets, ttFont):
+        self.data = data
+        self.glyphDataOffsets = glyphDataOffsets
+        self.ttFont = ttFont
+        self.glyphs = {}
+        glyphOrder = ttFont.getGlyphOrder()
+        self.pending = {glyphOrder[gid]: gid for gid in range(min(len(glyphDataOffsets)-1, len(glyphOrder)))}
+
+    def __getitem__(self, glyphName):
+        if glyphName not in self.glyphs:
+            gid = self.pending.pop(glyphName) # KeyError if there's no record
+            glyph = Glyph(rawdata=self.data[self.glyphDataOffsets[gid]:self.glyphDataOffsets[gid+1]], gid=gid)
+            glyph.decompile(self.ttFont)
+            self.glyphs[glyphName] = glyph
+        return self.glyphs[glyphName]
+
+    def __setitem__(self, glyphName, glyph):
+        self.pending.pop(glyphName, None)
+        self.glyphs[glyphName] = glyph
+
+    def __delitem__(self, glyphName):
+        if glyphName in self.pending:
+            del self.pending[glyphName]
+        else:
+            del self.glyphs[glyphName]
+
+    def __contains__(self, glyphName):
+        return glyphName in self.glyphs or glyphName in self.pending
+
+    def __iter__(self):
+        yield from list(self.glyphs.keys())
+        yield from list(self.pending.keys())
+
+    def __len__(self):
+        return len(self.glyphs) + len(self.pending)
+
+
 class Strike(object):
     def __init__(self, rawdata=None, ppem=0, resolution=72):
         self.data = rawdata
@@ -157,64 +235,84 @@ class Strike(object):
             raise ttLib.TTLibError
         if len(self.data) < meshStrikeHeaderFormatSize:
             from fontTools import ttLib
-            raise(ttLib.TTLibError, "Strike header too short: Expected %x, got %x.") \
-                % (meshStrikeHeaderFormatSize, len(self.data))
+            raise ttLib.TTLibError("Strike header too short: Expected %x, got %x." \
+                % (meshStrikeHeaderFormatSize, len(self.data)))
 
         # read Strike header from raw data
         sstruct.unpack(meshStrikeHeaderFormat, self.data[:meshStrikeHeaderFormatSize], self)
 
         # calculate number of glyphs
-        firstGlyphDataOffset, = struct.unpack(">L", \
-            self.data[meshStrikeHeaderFormatSize:meshStrikeHeaderFormatSize + meshGlyphDataOffsetFormatSize])
-        self.numGlyphs = (firstGlyphDataOffset - meshStrikeHeaderFormatSize) // meshGlyphDataOffsetFormatSize - 1
+        firstGlyphDataOffset, = struct.unpack_from(">L", self.data, meshStrikeHeaderFormatSize)
+        numGlyphs = (firstGlyphDataOffset - meshStrikeHeaderFormatSize) // meshGlyphDataOffsetFormatSize - 1
         # ^ -1 because there's one more offset than glyphs
 
-        # build offset list for single glyph data offsets
-        self.glyphDataOffsets = []
-        for i in range(self.numGlyphs + 1): # + 1 because there's one more offset than glyphs
-            start = i * meshGlyphDataOffsetFormatSize + meshStrikeHeaderFormatSize
-            current_offset, = struct.unpack(">L", self.data[start:start + meshGlyphDataOffsetFormatSize])
-            self.glyphDataOffsets.append(current_offset)
-
-        # iterate through offset list and slice raw data into glyph data records
-        for i in range(self.numGlyphs):
-            current_glyph = Glyph(rawdata=self.data[self.glyphDataOffsets[i]:self.glyphDataOffsets[i+1]], gid=i)
-            current_glyph.decompile(ttFont)
-            self.glyphs[current_glyph.glyphName] = current_glyph
-        del self.glyphDataOffsets
-        del self.numGlyphs
+        # read the whole offset array at once; the glyph data records themselves
+        # are only sliced out (and decompiled) when a glyph is looked up
+        glyphDataOffsets = struct.unpack_from(">%dL" % (numGlyphs + 1), self.data, meshStrikeHeaderFormatSize)
+        self.glyphs = LazyGlyphs(self.data, glyphDataOffsets, ttFont)
         del self.data
 
-    def compile(self, ttFont):
-        self.glyphDataOffsets = b""
-        self.bitmapData = b""
+    def resolve(self, glyphName):
+        """The Glyph that actually holds a glyph's mesh, following "dupe" references"""
+        glyph = self.glyphs[glyphName]
+        seen = set()
+        while glyph.graphicType == "dupe":
+            if glyph.glyphName in seen:
+                from fontTools import ttLib
+                raise ttLib.TTLibError("Circular 'dupe' reference at glyph %s" % glyphName)
+            seen.add(glyph.glyphName)
+            glyph = self.glyphs[glyph.referenceGlyphName]
+        return glyph
+
+    def meshData(self, glyphName):
+        """The mesh payload for a glyph, following "dupe" references to the glyph that actually holds it"""
+        return self.resolve(glyphName).meshData
 
+    def compile(self, ttFont):
         glyphOrder = ttFont.getGlyphOrder()
 
-        # first glyph starts right after the header
-        currentGlyphDataOffset = meshStrikeHeaderFormatSize + meshGlyphDataOffsetFormatSize * (len(glyphOrder) + 1)
-        for glyphName in glyphOrder:
-            if glyphName in self.glyphs:
-                # we have glyph data for this glyph
-                current_glyph = self.glyphs[glyphName]
-            else:
+        # first pass: work out each glyph's record (header + payload), replacing any
+        # payload that's byte-identical to an earlier glyph's with a "dupe" reference
+        records = []
+        seen = {} # (graphicType, digest) -> (glyph id, payload)
+        for gid, glyphName in enumerate(glyphOrder):
+            current_glyph = self.glyphs.get(glyphName)
+            if current_glyph is None or current_glyph.graphicType is None:
                 # must add empty glyph data record for this glyph
-                current_glyph = Glyph(glyphName=glyphName)
-            current_glyph.compile(ttFont)
-            current_glyph.glyphDataOffset = currentGlyphDataOffset
-            self.bitmapData += current_glyph.rawdata
-            currentGlyphDataOffset += len(current_glyph.rawdata)
-            self.glyphDataOffsets += sstruct.pack(meshGlyphDataOffsetFormat, current_glyph)
-
-        # add last "offset", really the end address of the last glyph data record
-        dummy = Glyph()
-        dummy.glyphDataOffset = currentGlyphDataOffset
-        self.glyphDataOffsets += sstruct.pack(meshGlyphDataOffsetFormat, dummy)
-
-        # pack header
-        self.data = sstruct.pack(meshStrikeHeaderFormat, self)
-        # add offsets and image data after header
-        self.data += self.glyphDataOffsets + self.bitmapData
+                records.append((b"", b""))
+                continue
+            
+            payload = current_glyph.payload(ttFont)
+            graphicType = current_glyph.graphicType
+
+            if graphicType != "dupe":
+                key = (graphicType, hashlib.sha1(payload).digest())
+                if key in seen and seen[key][1] == payload:
+                    graphicType = "dupe"
+                    payload = struct.pack(">H", seen[key][0])
+                else:
+                    seen.setdefault(key, (gid, payload))
+
+            header = sstruct.pack(meshGlyphHeaderFormat, dict(
+                originOffsetX=current_glyph.originOffsetX,
+                originOffsetY=current_glyph.originOffsetY,
+                graphicType=graphicType))
+            records.append((header, payload))
+
+        # first glyph starts right after the header
+        glyphDataOffsets = [meshStrikeHeaderFormatSize + meshGlyphDataOffsetFormatSize * (len(glyphOrder) + 1)]
+        for header, payload in records:
+            glyphDataOffsets.append(glyphDataOffsets[-1] + len(header) + len(payload))
+        # ^ the last "offset" is really the end address of the last glyph data record
+
+        # second pass: stream header, offsets & records out in one go
+        data = io.BytesIO()
+        data.write(sstruct.pack(meshStrikeHeaderFormat, self))
+        data.write(struct.pack(">%dL" % len(glyphDataOffsets), *glyphDataOffsets))
+        for header, payload in records:
+            data.write(header)
+            data.write(payload)
+        self.data = data.getvalue()
 
     def toXML(self, xmlWriter, ttFont):
         xmlWriter.begintag("strike")
@@ -264,7 +362,6 @@ class Strike(object):
                 if isinstance(element, tuple):
                     name, attrs, content = element
                     current_glyph.fromXML(name, attrs, content, ttFont)
-                    current_glyph.compile(ttFont)
             self.glyphs[current_glyph.glyphName] = current_glyph
         else:
             from fontTools import ttLib
@@ -306,21 +403,19 @@ class table__M_E_S_H(DefaultTable.DefaultTable):
         self.strikeOffsets = []
 
     def decompile(self, data, ttFont):
+        # slices of a memoryview share the table data instead of copying it
+        data = memoryview(data)
+
         # read table header
         sstruct.unpack(meshHeaderFormat, data[ : meshHeaderFormatSize], self)
         # collect offsets to individual strikes in self.strikeOffsets
-        for i in range(self.numStrikes):
-            current_offset = meshHeaderFormatSize + i * meshStrikeOffsetFormatSize
-            offset_entry = meshStrikeOffset()
-            sstruct.unpack(meshStrikeOffsetFormat, \
-                data[current_offset:current_offset+meshStrikeOffsetFormatSize], \
-                offset_entry)
-            self.strikeOffsets.append(offset_entry.strikeOffset)
+        self.strikeOffsets = list(struct.unpack_from(">%dL" % self.numStrikes, data, meshHeaderFormatSize))
 
         # decompile Strikes
+        end = len(data)
         for i in range(self.numStrikes-1, -1, -1):
-            current_strike = Strike(rawdata=data[self.strikeOffsets[i]:])
-            data = data[:self.strikeOffsets[i]]
+            current_strike = Strike(rawdata=data[self.strikeOffsets[i]:end])
+            end = self.strikeOffsets[i]
             current_strike.decompile(ttFont)
             #print "  Strike length: %xh" % len(bitmapSetData)
             #print "Number of Glyph entries:", len(current_strike.glyphs)
@@ -334,23 +429,34 @@ class table__M_E_S_H(DefaultTable.DefaultTable):
         del self.numStrikes
 
     def compile(self, ttFont):
-        meshData = b""
         self.numStrikes = len(self.strikes)
-        meshHeader = sstruct.pack(meshHeaderFormat, self)
+        strikes = [self.strikes[si] for si in sorted(self.strikes.keys())]
 
         # calculate offset to start of first strike
         setOffset = meshHeaderFormatSize + meshStrikeOffsetFormatSize * self.numStrikes
 
-        for si in sorted(self.strikes.keys()):
-            current_strike = self.strikes[si]
+        strikeOffsets = []
+        for current_strike in strikes:
             current_strike.compile(ttFont)
-            # append offset to this strike to table header
-            current_strike.strikeOffset = setOffset
-            meshHeader += sstruct.pack(meshStrikeOffsetFormat, current_strike)
+            strikeOffsets.append(setOffset)
             setOffset += len(current_strike.data)
-            meshData += current_strike.data
 
-        return meshHeader + meshData
+        data = io.BytesIO()
+        data.write(sstruct.pack(meshHeaderFormat, self))
+        data.write(struct.pack(">%dL" % self.numStrikes, *strikeOffsets))
+        for current_strike in strikes:
+            data.write(current_strike.data)
+            del current_strike.data
+        return data.getvalue()
+
+    def strikeForPpem(self, ppem=None):
+        """The strike to draw at `ppem`: the smallest one at least that big, else the biggest there is (also the biggest when ppem is None)"""
+        sizes = sorted(self.strikes.keys())
+        if ppem is not None:
+            for size in sizes:
+                if size >= ppem:
+                    return self.strikes[size]
+        return self.strikes[sizes[-1]]
 
     def toXML(self, xmlWriter, ttFont):
         xmlWriter.simpletag("version", value=self.version)
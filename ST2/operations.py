@@ -2,13 +2,10 @@ import bpy
 from pathlib import Path
 from bpy_extras.io_utils import ImportHelper
 
-from ST2 import search, typesetter, util, importer
+from ST2 import search, typesetter, util, importer, watching, dependencies, fontindex, prefetch, fontcache
 
 def item_cb(self, context):
-    from ST2.importer import ct
-    all_fonts = [f for f in ct.Font.LibraryList(".*") if not f.startswith(".")]
-    all_fonts = sorted(all_fonts, key=lambda x: x)
-    return [(str(f), str(f), "") for i, f in enumerate(all_fonts)]
+    return fontindex.search_items()
 
 
 class ST2_OT_SearchFont(bpy.types.Operator):
@@ -20,14 +17,13 @@ class ST2_OT_SearchFont(bpy.types.Operator):
     available_fonts: bpy.props.EnumProperty(items=item_cb)
 
     def execute(self, context):
-        from ST2.importer import ct
-
-        font_name = self.available_fonts
-        font = ct.Font.LibraryFind(font_name)
+        font_path = fontindex.path_for_item(self.available_fonts)
+        if not font_path:
+            return {'CANCELLED'}
 
         st2, _ = search.find_st2(context)
         st2.enable_font_search = True
-        st2.font_path = str(font.path)
+        st2.font_path = font_path
         return {'FINISHED'}
 
     def invoke(self, context, event):
@@ -86,10 +82,7 @@ class ST2_OT_ShowFont(bpy.types.Operator):
 def cycle_font(context, inc):
     data, obj = search.find_st2(context)
     font_path = Path(data.font_path)
-    fonts = []
-    for file in sorted(font_path.parent.iterdir(), key=lambda x: x.name):
-        if file.suffix in [".otf", ".ttf", ".ufo"]:
-            fonts.append(file)
+    fonts = fontindex.directory_fonts(font_path.parent)
     
     fidx = fonts.index(font_path)
     try:
@@ -101,6 +94,7 @@ def cycle_font(context, inc):
             adj_font = fonts[len(fonts)-1]
     
     data.font_path = str(adj_font)
+    prefetch.schedule(data, fonts, fonts.index(adj_font))
 
 
 class ST2_OT_LoadNextFont(bpy.types.Operator):
@@ -142,27 +136,27 @@ class ST2_OT_ClearFont(bpy.types.Operator):
 
 
 class ST2_OT_RefreshSettings(bpy.types.Operator):
-    """Refresh/resync all live text to specified settings"""
+    """Refresh/resync selected live text (and any text sharing its fonts, files & scripts) to specified settings"""
 
     bl_label = "ST2 Refresh Settings"
     bl_idname = "st2.refresh_settings"
+
+    full: bpy.props.BoolProperty(name="Full Rebuild", default=False, description="Drop all cached fonts, meshes, texts & scripts and re-typeset every live text object in the scene")
     
     def execute(self, context):
-        from coldtype.text.font import FontCache
-
-        if typesetter.MESH_CACHE_COLLECTION in bpy.data.collections:
-            mcc = bpy.data.collections[typesetter.MESH_CACHE_COLLECTION]
-            for o in mcc.objects:
-                bpy.data.objects.remove(o, do_unlink=True)
-
+        if self.full:
+            dependencies.refresh_all(context)
+            return {"FINISHED"}
+        
+        graph = dependencies.Graph(context.scene)
+        
         editables = search.find_st2_editables(context)
+
+        keys = set()
         for e in editables:
-            for k in [kp:=e.st2.font_path, str(kp)]:
-                if k in FontCache:
-                    del FontCache[k]
-            
-            t = typesetter.T(e.st2, e, context.scene)
-            t.update_live_text_obj(t.two_dimensional())
+            keys.update(graph.dependencies.get(e.name, set()))
+        
+        dependencies.refresh(context, keys, graph, editables)
         return {"FINISHED"}
 
 
@@ -216,8 +210,12 @@ class WM_OT_ST2ChooseFont(bpy.types.Operator, ImportHelper):
         if not ob:
             ob = context.scene
         
-        font = ct.Font.Cacheable(path)
-        ob.st2.font_path = str(font.path)
+        if fontcache.is_large(path, context.scene):
+            fontindex.metadata(path) # only parsed (as a subset) once it's typeset
+        else:
+            fontcache.load(path)
+        # the source itself (not its compiled binary), so edits to it can be picked up
+        ob.st2.font_path = str(path)
         ob.st2.enable_font_search = False
         
         return {'FINISHED'}
@@ -287,7 +285,7 @@ class ST2SourceWatcher(bpy.types.Operator):
     _timer = None
     _force = False
 
-    _sources = {}
+    _watcher = None
 
     def modal(self, context, event):
         st2 = context.scene.st2
@@ -305,23 +303,21 @@ class ST2SourceWatcher(bpy.types.Operator):
             return cancel(force=True)
 
         if event.type == 'TIMER':
-            for obj in search.find_st2_editables(context):
-                data = obj.st2
-                if data.script_file and data.script_enabled:
-                    if data.script_file not in self._sources:
-                        stat = Path(data.script_file).stat()
-                        self._sources[data.script_file] = stat.st_mtime
-            
-            for src, last_mtime in self._sources.items():
-                stat = Path(src).stat()
-                if stat.st_mtime > last_mtime:
-                    self._sources[src] = stat.st_mtime
+            graph = dependencies.Graph(context.scene)
+            self._watcher.watch(graph.files())
+            changed = self._watcher.changed()
+
+            if changed:
+                for src in changed:
                     print("save detected:", src)
-                    bpy.ops.st2.refresh_settings()
+                
+                dependencies.refresh(context, graph.keys_for_files(changed), graph)
 
         return {'PASS_THROUGH'}
 
     def execute(self, context):
+        self._watcher = watching.create_watcher()
+
         wm = context.window_manager
         self._timer = wm.event_timer_add(0.25, window=context.window)
         wm.modal_handler_add(self)
@@ -331,6 +327,7 @@ class ST2SourceWatcher(bpy.types.Operator):
     def cancel(self, context):
         wm = context.window_manager
         wm.event_timer_remove(self._timer)
+        self._watcher.close()
         self._force = False
         print('timer removed')
 
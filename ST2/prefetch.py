@@ -0,0 +1,89 @@
+import bpy
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+WINDOW = 1 # fonts on either side of the current one
+MAX_ENTRIES = 4
+
+_executor = None
+_entries = OrderedDict() # key -> Future of a shaped (unaligned) P
+
+
+def style_key(font_path, text, kwargs):
+    return (str(font_path), text, repr(sorted((k, v) for k, v in kwargs.items() if k != "font")))
+
+
+def _shape(font_path, text, kwargs):
+    from ST2.importer import ct
+    from ST2 import fontcache
+    with fontcache.shaping():
+        font = fontcache.load(font_path)
+        return ct.StSt(text, font=font, **kwargs)
+
+
+def schedule(st2, fonts, current_index):
+    """Load & pre-shape the current text in the fonts neighbouring `fonts[current_index]`"""
+    global _executor
+    from ST2 import fontindex, fontcache, typesetter
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="st2-prefetch")
+
+    t = typesetter.T(st2, None, bpy.context.scene)
+
+    for offset in range(1, WINDOW+1):
+        for idx in [current_index+offset, current_index-offset]:
+            font_path = fonts[idx % len(fonts)]
+            if font_path.suffix not in [".otf", ".ttf"]:
+                continue
+            if fontcache.is_large(font_path, bpy.context.scene):
+                continue
+
+            try:
+                meta = fontindex.metadata(font_path)
+            except OSError:
+                continue
+
+            kwargs = t.single_style_kwargs(meta)
+            del kwargs["font"] # the current font; _shape loads the neighbour
+            key = style_key(font_path, t.text, kwargs)
+            if key in _entries:
+                _entries.move_to_end(key)
+                continue
+
+            _entries[key] = _executor.submit(_shape, str(font_path), t.text, kwargs)
+            while len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+
+
+def take(font_path, text, kwargs):
+    """A prefetched P for exactly these inputs, or None if there isn't one or it's still being shaped (typesetting it synchronously is no slower than waiting)"""
+    future = _entries.pop(style_key(font_path, text, kwargs), None)
+    if future is None:
+        return None
+    if not future.done():
+        future.cancel()
+        return None
+
+    try:
+        return future.result()
+    except Exception as e:
+        print(">>> prefetch failed", e)
+        return None
+
+
+def clear():
+    _entries.clear()
+
+
+def shutdown():
+    global _executor
+    clear()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+classes = []
+panels = []
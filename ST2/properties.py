@@ -1,7 +1,6 @@
 import bpy
-from pathlib import Path
 
-from ST2 import typesetter
+from ST2 import typesetter, sources, fontcache, fontindex, meshcache
 
 
 def _update_type(props, context):
@@ -48,11 +47,27 @@ def update_type_frame_change(scene, depsgraph):
     elif lu == "RENDERSTATIC" and rendered_view and playing:
         return
 
+    ts = []
     for obj in scene.objects:
         data = obj.st2
         if data.updatable and not data.baked and obj.hide_render == False and data.has_keyframes(obj):
-            t = typesetter.T(data, obj, scene)
-            t.update_live_text_obj(t.two_dimensional())
+            ts.append(typesetter.T(data, obj, scene).prepare())
+    
+    for t in ts:
+        t.update_live_text_obj(t.two_dimensional())
+
+
+def update_output_mode(props, context):
+    """When switching a curve to mesh or instance output, start from the curve's own extrude & bevel"""
+    if props.output_mode in ["MESH", "INSTANCES"]:
+        for obj in context.scene.objects:
+            if obj.st2 == props and obj.type == "CURVE":
+                frozen = props.frozen
+                props.frozen = True
+                props.mesh_extrude = obj.data.extrude
+                props.mesh_bevel_depth = obj.data.bevel_depth
+                props.frozen = frozen
+    update_type(props, context)
 
 
 def feaprop(prop, default=False):
@@ -111,6 +126,10 @@ class ST2PropertiesGroup(bpy.types.PropertyGroup):
     script_watch: bpy.props.BoolProperty(name="Script Watch", default=False)
 
     script_kwargs: bpy.props.StringProperty(name="Script Args", default="", update=lambda p, c: update_type_and_copy("script_kwargs", p, c))
+
+    script_sandboxed: bpy.props.BoolProperty(name="Script Sandboxed", default=False, description="Run the script's modify function in a separate worker process, so a slow or looping script can't freeze Blender", update=lambda p, c: update_type_and_copy("script_sandboxed", p, c))
+
+    script_timeout: bpy.props.FloatProperty(name="Script Timeout", default=5, min=0.1, max=600, unit="TIME_ABSOLUTE", description="Seconds a sandboxed script may run before it is stopped", update=lambda p, c: update_type_and_copy("script_timeout", p, c))
     
     font_path: bpy.props.StringProperty(name="Font", default="", update=lambda p, c: update_type_and_copy("font_path", p, c))
 
@@ -120,6 +139,12 @@ class ST2PropertiesGroup(bpy.types.PropertyGroup):
 
     default_extrude: bpy.props.FloatProperty(name="Default Extrude Depth", default=0.1)
 
+    font_cache_budget: bpy.props.IntProperty(name="Font Cache Budget", default=512, min=16, max=64*1024, description="Megabytes of parsed fonts to keep loaded; least-recently-used fonts not used in the scene are evicted beyond this", update=lambda p, c: fontcache.trim(c.scene))
+
+    mesh_cache_budget: bpy.props.IntProperty(name="Mesh Cache Budget", default=256, min=1, max=64*1024, description="Megabytes of imported mesh-font glyphs to keep in ST2.MeshCache; least-recently-used glyphs no text object uses are evicted beyond this", update=lambda p, c: meshcache.trim(c.scene))
+
+    large_font_size: bpy.props.IntProperty(name="Large Font Size", default=16, min=1, max=1024, description="Fonts bigger than this many megabytes (e.g. CJK) are only indexed (not parsed or pre-shaped) when warming up and prefetching, and are typeset from a subset holding just the glyphs the scene's text uses")
+
     #stagger: bpy.props.StringProperty(name="Stagger", default="")
     #bounce: bpy.props.StringProperty(name="Bounce", default="")
     
@@ -141,6 +166,23 @@ class ST2PropertiesGroup(bpy.types.PropertyGroup):
     meshOffsetY: bpy.props.IntProperty(name="Mesh Offset Y", default=0)
 
     use_mesh: bpy.props.BoolProperty(name="Use Mesh", default=True)
+
+    mesh_lod: bpy.props.EnumProperty(name="Mesh Detail", items=[
+        ("CAMERA", "Camera", "Use the MESH strike matching the text's projected size in the active camera"),
+        ("FULL", "Full", "Always use the most detailed MESH strike"),
+    ], default="CAMERA")
+    mesh_lod_render_full: bpy.props.BoolProperty(name="Full Detail in Render", default=True, description="Always render with the most detailed MESH strike, whatever the viewport uses")
+
+    # output
+
+    output_mode: bpy.props.EnumProperty(name="Output", items=[
+        ("CURVE", "Curve", "A text curve, which Blender fills, extrudes & bevels itself on every update"),
+        ("MESH", "Mesh", "A static mesh, which ST2 tessellates & extrudes itself; much cheaper for Blender to redraw"),
+        ("INSTANCES", "Instances", "Each unique glyph outline is meshed once & instanced onto a point per glyph by Geometry Nodes; edits only rewrite the points"),
+    ], default="CURVE", update=update_output_mode)
+    mesh_extrude: bpy.props.FloatProperty(name="Extrude", default=0, min=0, update=update_type, description="Depth either side of the text (like a curve's Extrude)")
+    mesh_bevel_depth: bpy.props.FloatProperty(name="Bevel", default=0, min=0, update=update_type, description="Size of the chamfer around the front & back faces (like a curve's Bevel Depth)")
+    mesh_tolerance: bpy.props.FloatProperty(name="Tolerance", default=0.001, min=0.0001, max=0.05, precision=4, update=update_type, description="Max distance between the outlines' curves & the mesh's flat edges, as a fraction of the em")
     
     # ui-state
     
@@ -168,6 +210,14 @@ class ST2PropertiesGroup(bpy.types.PropertyGroup):
     # exporting
 
     export_meshes: bpy.props.BoolProperty(name="Export as Meshes", default=True)
+
+    export_budgeted: bpy.props.BoolProperty(name="Budgeted Meshes", default=False, description="Tessellate exported meshes with a tolerance scaled to each glyph's size (and an optional triangle cap), instead of at the curve's fixed resolution")
+    export_tolerance: bpy.props.FloatProperty(name="Tolerance", default=0.002, min=0.0001, max=0.1, precision=4, description="Max distance between the outlines' curves & the mesh's flat edges, as a fraction of each glyph's size")
+    export_max_triangles: bpy.props.IntProperty(name="Max Triangles", default=0, min=0, description="Coarsen the tessellation until the mesh has at most this many triangles (0 for no cap)")
+    export_budget_scope: bpy.props.EnumProperty(name="Budget Scope", items=[
+        ("GLYPH", "Per Glyph", "The triangle cap applies to each glyph"),
+        ("SLUG", "Per Slug", "The triangle cap applies to each exported object, however many glyphs it holds"),
+    ], default="GLYPH")
     
     #export_geometric_origins: bpy.props.BoolProperty(name="Export with Geometric Origins", default=True)
 
@@ -193,6 +243,7 @@ class ST2PropertiesGroup(bpy.types.PropertyGroup):
 
     export_apply_transforms: bpy.props.BoolProperty(name="Export with Applied Transforms", default=True)
     export_rigidbody_active: bpy.props.BoolProperty(name="Export with Active Rigid Body", default=False)
+    export_rigidbody_parts: bpy.props.IntProperty(name="Collision Parts", default=8, min=1, max=32, description="Most convex pieces in each glyph's collision shape (1 for a single convex hull); shapes are cached, so repeated glyphs share them")
     export_every_x_frame: bpy.props.IntProperty(name="Export Every X Frame", default=1, min=1, max=50)
 
     export_stagger_y: bpy.props.FloatProperty(name="Export Stagger Y", default=0)
@@ -238,7 +289,7 @@ class ST2PropertiesGroup(bpy.types.PropertyGroup):
 
     remove_overlap: bpy.props.BoolProperty(name="Remove Overlap", default=1, update=update_type)
 
-    combine_glyphs: bpy.props.BoolProperty(name="Combine Glyphs", default=1, update=update_type)
+    combine_glyphs: bpy.props.BoolProperty(name="Combine Glyphs", default=1, description="Merge all the glyphs of a text curve into a single outline; Mesh & Instances output always tessellate glyph by glyph, so each keeps its own attributes (line, char_index, glyph_index, position)", update=update_type)
 
     block: bpy.props.BoolProperty(name="Set on Blocks", default=0, update=update_type)
     block_inset_x: bpy.props.FloatProperty(name="Block Inset X", default=0, update=update_type)
@@ -396,13 +447,16 @@ class ST2PropertiesGroup(bpy.types.PropertyGroup):
         self.frozen = False
         other.frozen = False
 
+    def snapshot(self):
+        return tuple((k, getattr(self, k)) for k in self.__annotations__.keys())
+
     def font(self, none_ok=False):
         from ST2.importer import ct
 
         font = None
         if self.font_path:
             try:
-                font = ct.Font.Cacheable(self.font_path)
+                font = fontcache.load(self.font_path, self.large_font_text())
             except Exception as e:
                 print(">>>", e)
         
@@ -414,24 +468,37 @@ class ST2PropertiesGroup(bpy.types.PropertyGroup):
             else:
                 return ct.Font.RecursiveMono()
     
-    def visible_variation_axes(self, font):
-        variations = {}
-        for idx, (k, v) in enumerate(font.variations().items()):
-            hidden = bool(v["flags"] & 0x0001)
-            if not hidden:
-                variations[k] = v
-        return variations
+    def large_font_text(self):
+        """For a large font (fontcache.is_large), the text it's typesetting, so only a subset covering it is parsed; None otherwise, and for MESH fonts, whose table is keyed on the full glyph set"""
+        if not fontcache.is_large(self.font_path, bpy.context.scene):
+            return None
+        if self.font_metadata().mesh:
+            return None
+        return self.build_text()
+    
+    def font_metadata(self):
+        """Cached fontindex.FontMetadata for the font (or the fallback font); what panels should read, rather than the parsed font"""
+        if self.font_path:
+            try:
+                return fontindex.metadata(self.font_path)
+            except Exception as e:
+                print(">>>", e)
+        
+        return fontindex.metadata(self.font().path)
+    
+    def visible_variation_axes(self):
+        return self.font_metadata().visible_axes
 
-    def variations(self, font):
+    def variations(self, meta=None):
+        """Axis tag -> value; `meta` is another font's fontindex.FontMetadata, to map these settings onto its axes instead"""
+        axes = meta.visible_axes if meta is not None else self.visible_variation_axes()
         variations = {}
-        for idx, (k, _) in enumerate(self.visible_variation_axes(font).items()):
+        for idx, (k, _) in enumerate(axes.items()):
             variations[k] = getattr(self, f"fvar_axis{idx+1}")
         return variations
     
     def update_to_variation_defaults(self):
-        font = self.font()
-
-        for idx, (_, v) in enumerate(self.visible_variation_axes(font).items()):
+        for idx, (_, v) in enumerate(self.visible_variation_axes().items()):
             diff = abs(v["maxValue"]-v["minValue"])
             v = (v["defaultValue"]-v["minValue"])/diff
             setattr(self, f"fvar_axis{idx+1}", v)
@@ -448,27 +515,22 @@ class ST2PropertiesGroup(bpy.types.PropertyGroup):
 
         if self.text_mode == "FILE":
             if self.text_file:
-                text_path = Path(self.text_file).expanduser().absolute()
-                text = text_path.read_text()
+                source = sources.text_file(self.text_file)
                 if self.text_indexed:
-                    lines = text.split("\n\n")
-                    try:
-                        text = lines[self.text_index-1]
-                    except IndexError:
-                        text = lines[-1]
+                    text = source.paragraph(self.text_index)
+                else:
+                    text = source.text
             else:
                 text = "Select file"
             fulltext = text
         elif self.text_mode == "BLOCK":
             if self.text_block:
                 try:
-                    text = bpy.data.texts[self.text_block].as_string()
+                    source = sources.text_block(self.text_block)
                     if self.text_indexed:
-                        lines = text.split("\n\n")
-                        try:
-                            text = lines[self.text_index-1]
-                        except IndexError:
-                            text = lines[-1]
+                        text = source.paragraph(self.text_index)
+                    else:
+                        text = source.text
                 except KeyError:
                     text = "Invalid"
             else:
@@ -500,16 +562,10 @@ class ST2PropertiesGroup(bpy.types.PropertyGroup):
         return text
 
     def mesh(self, override=False):
-        font = self.font()
-        try:
-            mesh = font.font.ttFont["MESH"]
-        except KeyError:
-            mesh = None
-        
-        if mesh and self.use_mesh:
-            return mesh
-        else:
+        if not self.use_mesh or not self.font_metadata().mesh:
             return None
+        
+        return self.font().font.ttFont["MESH"]
 
         # if override is not None:
         #     meshing = mesh and override
@@ -0,0 +1,332 @@
+# Runs script `modify` functions in warm worker processes, so a slow or
+# looping script can be timed out instead of freezing Blender.
+#
+# This file doubles as the worker program (it is launched directly with
+# the Python interpreter), so it must only import from the standard
+# library at the top level.
+
+import os, sys, time, pickle, queue, threading, traceback, subprocess
+from pathlib import Path
+
+
+MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def picklable(value):
+    try:
+        pickle.dumps(value)
+        return True
+    except Exception:
+        return False
+
+
+def pack(p):
+    """Reduce a (possibly nested) P to picklable tuples: its outline plus its data, styling attributes, tag & glyph name (leaving out only values that can't be pickled, like functions)"""
+    state = dict(data={k: v for k, v in getattr(p, "_data", {}).items() if picklable(v)},
+        attrs={k: v for k, v in getattr(p, "_attrs", {}).items() if picklable(v)},
+        tag=getattr(p, "_tag", None),
+        glyphName=getattr(p, "glyphName", None))
+    if len(p) > 0:
+        return ("group", [pack(el) for el in p], state)
+    else:
+        return ("pen", list(p.v.value), state)
+
+
+def unpack(packed, P):
+    kind, value, state = packed
+    if kind == "group":
+        p = P([unpack(el, P) for el in value])
+    else:
+        p = P()
+        for op, pts in value:
+            getattr(p, op)(*pts)
+    if state["data"]:
+        p.data(**state["data"])
+    if state["attrs"]:
+        p._attrs = state["attrs"]
+    if state["tag"] is not None:
+        p.tag(state["tag"])
+    if state["glyphName"] is not None:
+        p.glyphName = state["glyphName"]
+    return p
+
+
+class Snapshot():
+    """What `modify` gets as `st2` in a worker: every setting as an attribute (nested property groups as Snapshots of their own) & the ST2PropertiesGroup methods a script can call, answered from the settings or from values worked out in Blender before the job was sent (see settings_state)"""
+
+    def __init__(self, settings, computed=None):
+        self._computed = computed or {}
+        for k, v in settings.items():
+            setattr(self, k, Snapshot(v) if isinstance(v, dict) else v)
+
+    def _settings(self):
+        return {k: v for k, v in vars(self).items() if not k.startswith("_")}
+
+    def snapshot(self):
+        return tuple((k, v.snapshot() if isinstance(v, Snapshot) else v) for k, v in self._settings().items())
+
+    def build_text(self):
+        return self._computed["text"]
+
+    def visible_variation_axes(self):
+        return self._computed["axes"]
+
+    def variations(self, meta=None):
+        axes = meta.visible_axes if meta is not None else self.visible_variation_axes()
+        return {k: getattr(self, f"fvar_axis{idx+1}") for idx, k in enumerate(axes.keys())}
+
+    def features(self, font=None):
+        return {k[4:]: v for k, v in self._settings().items() if k.startswith("fea_")}
+
+    def font(self, none_ok=False):
+        from coldtype import Font
+
+        if self._computed.get("font_path"):
+            return Font.Cacheable(self._computed["font_path"])
+        if none_ok:
+            return None
+        return Font.RecursiveMono()
+
+
+def settings_state(group):
+    """A property group's settings as plain, picklable values (arrays as tuples, datablocks by name, nested groups as dicts), for a Snapshot"""
+    settings = {}
+    for k in group.__annotations__.keys():
+        v = getattr(group, k)
+        if hasattr(v, "__annotations__") and hasattr(v, "bl_rna"):
+            v = settings_state(v)
+        elif hasattr(v, "name_full"):
+            v = v.name_full
+        elif not isinstance(v, str) and hasattr(v, "__len__"):
+            v = tuple(v)
+        settings[k] = v
+    return settings
+
+
+def snapshot_state(st2):
+    """(settings, computed) for Snapshot: the settings, plus what its methods return that takes Blender (the text from a file or text block, the font's axes) or ST2's font cache (the binary actually typeset, e.g. a .ufo's compiled font)"""
+    font = st2.font(none_ok=True)
+    return settings_state(st2), dict(text=st2.build_text(),
+        axes=dict(st2.visible_variation_axes()),
+        font_path=str(font.path) if font is not None else None)
+
+
+# worker side
+
+def _worker_main():
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr # keep the channel clean of user print()s
+
+    scripts = {}
+
+    while True:
+        try:
+            kind, payload = pickle.load(stdin)
+        except EOFError:
+            return
+
+        if kind == "init":
+            sys.path[:0] = payload
+            continue
+
+        key, filename, source, snapshot, kwargs, packed = payload
+        try:
+            if source is not None:
+                scripts[key] = None
+                namespace = {"__name__": "<run_path>", "__file__": filename}
+                exec(compile(source, filename, "exec"), namespace)
+                scripts[key] = namespace
+
+            namespace = scripts.get(key)
+            if not namespace or "modify" not in namespace:
+                raise RuntimeError("no `modify` function found (or the script failed to load)")
+
+            import inspect
+            fn = namespace["modify"]
+            arg_count = len(inspect.signature(fn).parameters)
+
+            args = [Snapshot(*snapshot)]
+            if arg_count > 1:
+                args.append(kwargs)
+            if arg_count > 2:
+                from coldtype import P
+                args.append(unpack(packed, P))
+
+            res = fn(*args)
+            result = ("ok", pack(res) if res is not None else None)
+        except Exception:
+            result = ("error", traceback.format_exc())
+
+        pickle.dump(result, stdout)
+        stdout.flush()
+
+
+# blender side
+
+class Worker():
+    def __init__(self):
+        self.process = subprocess.Popen([sys.executable, "-u", __file__],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.results = queue.Queue()
+        self.scripts = set()
+
+        threading.Thread(target=self._read, daemon=True).start()
+        self.send(("init", _worker_paths()))
+
+    def _read(self):
+        while True:
+            try:
+                self.results.put(pickle.load(self.process.stdout))
+            except Exception:
+                return
+
+    def send(self, msg):
+        pickle.dump(msg, self.process.stdin)
+        self.process.stdin.flush()
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def kill(self):
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+
+
+def _worker_paths():
+    paths = []
+    try:
+        import coldtype
+        paths.append(str(Path(coldtype.__file__).parent.parent))
+    except ImportError:
+        pass
+    return paths + [p for p in sys.path if p]
+
+
+_idle = []
+_busy = set()
+
+
+def _acquire(force=False):
+    while _idle:
+        worker = _idle.pop()
+        if worker.alive():
+            _busy.add(worker)
+            return worker
+
+    if force or len(_busy) < MAX_WORKERS:
+        worker = Worker()
+        _busy.add(worker)
+        return worker
+
+    return None
+
+
+def _release(worker, healthy=True):
+    _busy.discard(worker)
+    if healthy and worker.alive():
+        _idle.append(worker)
+    else:
+        worker.kill()
+
+
+class Pending():
+    """A `modify` call dispatched to a worker; `result` blocks until it returns or its timeout elapses"""
+
+    def __init__(self, job, p, timeout):
+        self.job = job
+        self.p = p
+        self.timeout = timeout
+        self.worker = None
+        self.deadline = None
+        self.dispatch()
+
+    def dispatch(self, force=False):
+        worker = _acquire(force)
+        if worker is None:
+            return # dispatched from result() once a worker frees up
+
+        key, filename, read_source, *rest = self.job
+        source = None if key in worker.scripts else read_source()
+
+        try:
+            worker.send(("run", (key, filename, source, *rest)))
+        except OSError:
+            _release(worker, healthy=False)
+            return self.dispatch(force)
+
+        worker.scripts.add(key)
+        self.worker = worker
+        self.deadline = time.monotonic() + self.timeout
+
+    def result(self):
+        from ST2.importer import C
+
+        if self.worker is None:
+            self.dispatch(force=True)
+
+        try:
+            status, value = self.worker.results.get(timeout=max(0, self.deadline - time.monotonic()))
+        except queue.Empty:
+            print(f">>> SCRIPT TIMEOUT: modify took longer than {self.timeout}s")
+            _release(self.worker, healthy=False)
+            return self.p
+
+        _release(self.worker)
+
+        if status == "ok":
+            return unpack(value, C.P) if value is not None else None
+        else:
+            print(">>> SCRIPT ERROR (sandboxed)")
+            print(value)
+            return self.p
+
+
+def _script_job(st2):
+    if st2.script_mode == "FILE" and st2.script_file:
+        path = Path(st2.script_file).expanduser().absolute()
+        stat = path.stat()
+        return ("FILE", str(path), stat.st_mtime_ns, stat.st_size), str(path), path.read_text
+    elif st2.script_mode == "BLOCK":
+        import bpy
+        source = bpy.data.texts[st2.script_block].as_string()
+        if source:
+            return ("BLOCK", st2.script_block, hash(source)), st2.script_block, lambda: source
+    return None
+
+
+def submit(st2, p):
+    from ST2 import scripting
+
+    try:
+        script = _script_job(st2)
+    except (OSError, KeyError) as e:
+        print("Could not run script", e)
+        return None
+
+    if script is None:
+        return None
+
+    key, filename, read_source = script
+    job = (key, filename, read_source,
+        snapshot_state(st2),
+        scripting.parse_kwargs(st2.script_kwargs),
+        pack(p))
+
+    return Pending(job, p, st2.script_timeout)
+
+
+def shutdown():
+    for worker in [*_idle, *_busy]:
+        worker.kill()
+    _idle.clear()
+    _busy.clear()
+
+
+classes = []
+panels = []
+
+
+if __name__ == "__main__":
+    _worker_main()
@@ -0,0 +1,123 @@
+import builtins, hashlib, inspect
+from collections import OrderedDict
+from pathlib import Path
+
+
+RESULT_CACHE_SIZE = 32
+
+
+class Script():
+    """A user script compiled & executed once, kept around as a module namespace so only `modify` is called per typeset"""
+
+    def __init__(self, key, namespace):
+        self.key = key
+        self.namespace = namespace
+        self.modify = namespace.get("modify")
+        self.results = OrderedDict()
+
+        if self.modify:
+            self.arg_count = len(inspect.signature(self.modify).parameters)
+        else:
+            self.arg_count = 0
+
+    def run(self, st2, p, frame):
+        args = [st2]
+        if self.arg_count > 1:
+            args.append(parse_kwargs(st2.script_kwargs))
+        if self.arg_count > 2:
+            args.append(p)
+
+        cache_key = (st2.snapshot(), frame, digest(st2.build_text(), p))
+        if cache_key in self.results:
+            self.results.move_to_end(cache_key)
+        else:
+            self.results[cache_key] = self.modify(*args)
+            if len(self.results) > RESULT_CACHE_SIZE:
+                self.results.popitem(last=False)
+
+        res = self.results[cache_key]
+        # downstream steps (removeOverlap, outline) modify in-place
+        return res.copy() if res is not None else None
+
+
+def digest(text, p):
+    """A hash of what `modify` sees beyond the settings: the text (which isn't a setting in FILE & BLOCK modes) & the outlines (which change with the font file)"""
+    h = hashlib.sha1(text.encode("utf-8"))
+
+    def add(el):
+        if len(el) > 0:
+            for child in el:
+                add(child)
+        else:
+            h.update(repr(el.v.value).encode("utf-8"))
+
+    if p is not None:
+        add(p)
+    return h.hexdigest()
+
+
+_scripts = {}
+_kwargs = {}
+
+
+def _execute(source, filename):
+    namespace = {
+        "__name__": "<run_path>",
+        "__file__": filename,
+        "__builtins__": builtins,
+    }
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace
+
+
+def script_file(path):
+    path = Path(path).expanduser().absolute()
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    script = _scripts.get(("FILE", str(path)))
+    if script is None or script.key != key:
+        script = Script(key, _execute(path.read_text(), str(path)))
+        _scripts[("FILE", str(path))] = script
+    return script
+
+
+def script_block(name):
+    import bpy
+
+    source = bpy.data.texts[name].as_string()
+    if not source:
+        return None
+
+    key = hash(source)
+
+    script = _scripts.get(("BLOCK", name))
+    if script is None or script.key != key:
+        script = Script(key, _execute(source, name))
+        _scripts[("BLOCK", name)] = script
+    return script
+
+
+def parse_kwargs(script_kwargs):
+    if script_kwargs not in _kwargs:
+        try:
+            _kwargs[script_kwargs] = eval(f"dict({script_kwargs})")
+        except Exception as e:
+            print(e)
+            print("failed to parse kwargs")
+            _kwargs[script_kwargs] = {}
+    return dict(_kwargs[script_kwargs])
+
+
+def clear(kind=None, name=None):
+    if kind is None:
+        _scripts.clear()
+        return
+
+    if kind == "FILE":
+        name = str(Path(name).expanduser().absolute())
+    _scripts.pop((kind, name), None)
+
+
+classes = []
+panels = []
@@ -0,0 +1,141 @@
+from pathlib import Path
+
+
+PARAGRAPH_SEPARATOR = "\n\n"
+CHUNK = 4096 # characters compared at a time when looking for an edit
+
+
+def common_prefix(a, b, limit):
+    """Length of the longest common prefix of two strings, at most `limit`; compares whole chunks, so long unchanged stretches cost few Python steps"""
+    n = 0
+    while n + CHUNK <= limit and a[n:n+CHUNK] == b[n:n+CHUNK]:
+        n += CHUNK
+    while n < limit and a[n] == b[n]:
+        n += 1
+    return n
+
+
+def common_suffix(a, b, limit):
+    n = 0
+    while n + CHUNK <= limit and a[len(a)-n-CHUNK:len(a)-n] == b[len(b)-n-CHUNK:len(b)-n]:
+        n += CHUNK
+    while n < limit and a[len(a)-n-1] == b[len(b)-n-1]:
+        n += 1
+    return n
+
+
+class TextSource():
+    """A document read from a text file or text-block, along with the offsets of its paragraphs, so an indexed lookup is just a slice"""
+
+    def __init__(self, key, text, paragraphs=None):
+        self.key = key
+        self.text = text
+        self.paragraphs = paragraphs if paragraphs is not None else self.split(0)
+
+    def split(self, start, resume=None):
+        """(start, end) of each paragraph from offset `start` (which must begin a paragraph) on; `resume` returns the rest of the offsets, if they're known from a paragraph start onwards"""
+        paragraphs = []
+        while True:
+            rest = resume(start) if resume else None
+            if rest is not None:
+                return paragraphs + rest
+            end = self.text.find(PARAGRAPH_SEPARATOR, start)
+            if end == -1:
+                paragraphs.append((start, len(self.text)))
+                return paragraphs
+            paragraphs.append((start, end))
+            start = end + len(PARAGRAPH_SEPARATOR)
+
+    def edited(self, key, text):
+        """This document after an edit, re-splitting only the paragraphs around the changed span: those before it are kept & those after it shifted"""
+        old = self.text
+        prefix = common_prefix(old, text, min(len(old), len(text)))
+        suffix = common_suffix(old, text, min(len(old), len(text)) - prefix)
+        delta = len(text) - len(old)
+
+        # the separator scan is the same as before up to the edit, & from any paragraph start inside the unchanged suffix on
+        kept = [(s, e) for s, e in self.paragraphs if e + len(PARAGRAPH_SEPARATOR) <= prefix]
+        start = kept[-1][1] + len(PARAGRAPH_SEPARATOR) if kept else 0
+        index = {s: i for i, (s, _) in enumerate(self.paragraphs)}
+
+        def resume(position):
+            if position >= len(text) - suffix and position - delta in index:
+                return [(s + delta, e + delta) for s, e in self.paragraphs[index[position - delta]:]]
+
+        source = TextSource(key, text, [])
+        source.paragraphs = kept + source.split(start, resume)
+        return source
+
+    def paragraph(self, index):
+        # same semantics as text.split("\n\n")[index-1], falling back to the last paragraph
+        try:
+            start, end = self.paragraphs[index-1]
+        except IndexError:
+            start, end = self.paragraphs[-1]
+        return self.text[start:end]
+
+
+_sources = {}
+
+
+def text_file(path):
+    path = Path(path).expanduser().absolute()
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    source = _sources.get(("FILE", str(path)))
+    if source is None or source.key != key:
+        source = TextSource(key, path.read_text())
+        _sources[("FILE", str(path))] = source
+    return source
+
+
+def block_identity(block):
+    """Which text block this is, & for one backed by a file, that file's mtime & size (reloading it replaces the text without marking it dirty)"""
+    import bpy
+
+    stat = None
+    if block.filepath and not block.is_in_memory:
+        try:
+            stat = Path(bpy.path.abspath(block.filepath)).stat()
+            stat = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+    return (block.as_pointer(), stat)
+
+
+def text_block(name):
+    """The text block's TextSource. Every edit marks a block dirty, so one read while clean (as loaded or saved) is trusted, unread, for as long as it stays clean; an edited block is read again, but only the paragraphs around the edit are re-split"""
+    import bpy
+
+    block = bpy.data.texts[name]
+    clean = not block.is_dirty and not block.is_modified
+    key = (block_identity(block), clean)
+
+    source = _sources.get(("BLOCK", name))
+    if source is not None and source.key == key and clean:
+        return source
+
+    text = block.as_string()
+    if source is None or source.key[0] != key[0]:
+        source = TextSource(key, text)
+    elif source.text != text:
+        source = source.edited(key, text)
+    else:
+        source.key = key
+    _sources[("BLOCK", name)] = source
+    return source
+
+
+def clear(kind=None, name=None):
+    if kind is None:
+        _sources.clear()
+        return
+
+    if kind == "FILE":
+        name = str(Path(name).expanduser().absolute())
+    _sources.pop((kind, name), None)
+
+
+classes = []
+panels = []
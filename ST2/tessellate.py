@@ -0,0 +1,637 @@
+# Outline -> triangle mesh: curve flattening, ear-clipping (with holes) & extrusion,
+# in NumPy and free of bpy, so the same code builds MESH tables headlessly
+# (meshbuilder.py) and live meshes inside Blender.
+
+import math, hashlib
+import numpy as np
+from fontTools.pens.basePen import BasePen
+from fontTools.pens.recordingPen import replayRecording
+
+
+EPSILON = 1e-9
+MAX_SEGMENTS = 64 # per curve
+MITER_LIMIT = 4
+
+
+class FlattenPen(BasePen):
+    """Collects closed contours as (n, 2) arrays, with curves flattened so no point of the curve is further than `tolerance` from the polyline"""
+
+    def __init__(self, tolerance, glyphSet=None):
+        super().__init__(glyphSet)
+        self.tolerance = tolerance
+        self.contours = []
+        self.current = []
+
+    def _moveTo(self, pt):
+        self.current = [pt]
+
+    def _lineTo(self, pt):
+        self.current.append(pt)
+
+    def _curveToOne(self, pt1, pt2, pt3):
+        p0 = np.array(self._getCurrentPoint())
+        p1, p2, p3 = np.array(pt1), np.array(pt2), np.array(pt3)
+        # Wang's formula: enough segments for the flattening error to stay under tolerance
+        dd = max(np.linalg.norm(p0 - 2*p1 + p2), np.linalg.norm(p1 - 2*p2 + p3))
+        t = np.linspace(0, 1, segment_count(0.75 * dd, self.tolerance) + 1)[1:, None]
+        mt = 1 - t
+        points = mt**3*p0 + 3*mt**2*t*p1 + 3*mt*t**2*p2 + t**3*p3
+        self.current.extend(map(tuple, points))
+
+    def _qCurveToOne(self, pt1, pt2):
+        p0 = np.array(self._getCurrentPoint())
+        p1, p2 = np.array(pt1), np.array(pt2)
+        dd = np.linalg.norm(p0 - 2*p1 + p2)
+        t = np.linspace(0, 1, segment_count(0.25 * dd, self.tolerance) + 1)[1:, None]
+        mt = 1 - t
+        points = mt**2*p0 + 2*mt*t*p1 + t**2*p2
+        self.current.extend(map(tuple, points))
+
+    def _closePath(self):
+        contour = clean(np.array(self.current, dtype=np.float64))
+        if len(contour) >= 3:
+            self.contours.append(contour)
+        self.current = []
+
+    def _endPath(self):
+        # open contours have no fill
+        self.current = []
+
+
+def segment_count(deviation, tolerance):
+    if tolerance <= 0:
+        return MAX_SEGMENTS
+    return int(min(max(math.ceil(math.sqrt(deviation / tolerance)), 1), MAX_SEGMENTS))
+
+
+def clean(contour):
+    """Drop repeated points (including a closing point that repeats the first)"""
+    if len(contour) == 0:
+        return contour
+    keep = np.linalg.norm(contour - np.roll(contour, 1, axis=0), axis=1) > EPSILON
+    if not keep.any():
+        return contour[:1]
+    return contour[keep]
+
+
+def flatten_recording(recording, tolerance):
+    """Contours for a RecordingPen's value (e.g. a coldtype P's `.v.value`)"""
+    pen = FlattenPen(tolerance)
+    replayRecording(recording, pen)
+    return pen.contours
+
+
+def merge_collinear(contour, tolerance):
+    """Drop points that lie within `tolerance` of the line between their (kept) neighbours, never leaving fewer than 3"""
+    if len(contour) <= 3 or tolerance <= 0:
+        return contour
+
+    kept = [contour[0]]
+    for i in range(1, len(contour)):
+        a, b, c = kept[-1], contour[i], contour[(i+1) % len(contour)]
+        ac = c - a
+        length = math.hypot(ac[0], ac[1])
+        if length > EPSILON and abs(cross(a, c, b)) / length <= tolerance and np.dot(b - a, ac) > 0 and np.dot(c - b, ac) > 0:
+            continue
+        kept.append(b)
+
+    if len(kept) < 3:
+        return contour
+    return np.array(kept)
+
+
+def control_box_size(recording):
+    """The larger side of the box around a recording's points (on- and off-curve), which always contains its outline"""
+    points = [pt for _, args in recording for pt in args]
+    if not points:
+        return 0
+    points = np.array(points, dtype=np.float64)
+    return float((points.max(axis=0) - points.min(axis=0)).max())
+
+
+def outline_key(recordings, *settings):
+    """A key for some outlines (RecordingPen values) plus whatever `settings` shape their mesh, with the outlines normalized to their corner (also returned), so repeated glyphs share a key wherever they sit"""
+    points = [pt for recording in recordings for _, args in recording for pt in args]
+    origin = np.array(points, dtype=np.float64).min(axis=0) if points else np.zeros(2)
+
+    h = hashlib.sha1(repr(settings).encode("utf-8"))
+    for recording in recordings:
+        for op, args in recording:
+            h.update(op.encode("utf-8"))
+            if args:
+                # + 0.0 so -0.0 & 0.0 hash the same
+                h.update((np.round(np.array(args, dtype=np.float64) - origin, 4) + 0.0).tobytes())
+    return h.hexdigest()[:16], origin
+
+
+def translate_recording(recording, dx, dy):
+    return [(op, tuple((x + dx, y + dy) for x, y in args)) for op, args in recording]
+
+
+def signed_area(contour):
+    x, y = contour[:, 0], contour[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def contains(contour, point):
+    """Even-odd point-in-polygon"""
+    x, y = contour[:, 0], contour[:, 1]
+    x2, y2 = np.roll(x, -1), np.roll(y, -1)
+    crosses = (y > point[1]) != (y2 > point[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xs = x + (point[1] - y) * (x2 - x) / (y2 - y)
+    return bool(np.count_nonzero(crosses & (point[0] < xs)) % 2)
+
+
+def cross(o, a, b):
+    return (a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) - (a[..., 1] - o[..., 1]) * (b[..., 0] - o[..., 0])
+
+
+PROBE_OFFSET = 1e-7 # of the outline's size, either side of an edge
+WINDING_CHUNK = 256 # points per (points x edges) block
+
+
+def winding(points, a, b):
+    """Winding number of each of `points` (n, 2) around the directed edges a[i] -> b[i]"""
+    out = np.zeros(len(points), dtype=np.int64)
+    for s in range(0, len(points), WINDING_CHUNK):
+        p = points[s:s+WINDING_CHUNK, None, :]
+        y = p[..., 1]
+        side = cross(a[None], b[None], p) # > 0 where the point is left of the edge
+        up = (a[None, :, 1] <= y) & (b[None, :, 1] > y) & (side > 0)
+        down = (a[None, :, 1] > y) & (b[None, :, 1] <= y) & (side < 0)
+        out[s:s+WINDING_CHUNK] = np.count_nonzero(up, axis=1) - np.count_nonzero(down, axis=1)
+    return out
+
+
+def edges(contours):
+    a = np.concatenate(contours)
+    b = np.concatenate([np.roll(c, -1, axis=0) for c in contours])
+    return a, b
+
+
+def filled_sides(probe_a, probe_b, a, b, size):
+    """Whether the nonzero fill of the edges a -> b covers the left & the right side of the midpoint of each probe edge probe_a -> probe_b"""
+    d = probe_b - probe_a
+    left = np.stack([-d[:, 1], d[:, 0]], axis=1) / np.maximum(np.linalg.norm(d, axis=1), EPSILON)[:, None]
+    mid = (probe_a + probe_b) / 2
+    offset = left * (size * PROBE_OFFSET)
+    return winding(mid + offset, a, b) != 0, winding(mid - offset, a, b) != 0
+
+
+def crossings(contours):
+    """{(contour, edge): [(t, point), ...]} for every point strictly inside an edge where another edge (of any contour) crosses or touches it"""
+    boxes = [(c.min(axis=0), c.max(axis=0)) for c in contours]
+    found = {}
+
+    for i, ci in enumerate(contours):
+        a1, b1 = edges([ci])
+        d1 = b1 - a1
+        for j in range(i, len(contours)):
+            if (boxes[i][0] > boxes[j][1]).any() or (boxes[j][0] > boxes[i][1]).any():
+                continue
+
+            a2, b2 = edges([contours[j]])
+            d2 = b2 - a2
+            w = a2[None] - a1[:, None]
+            denom = d1[:, None, 0] * d2[None, :, 1] - d1[:, None, 1] * d2[None, :, 0]
+            parallel = np.abs(denom) <= EPSILON * np.linalg.norm(d1, axis=1)[:, None] * np.linalg.norm(d2, axis=1)[None]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = (w[..., 0] * d2[None, :, 1] - w[..., 1] * d2[None, :, 0]) / denom
+                u = (w[..., 0] * d1[:, None, 1] - w[..., 1] * d1[:, None, 0]) / denom
+
+            t_inside = (t > EPSILON) & (t < 1 - EPSILON)
+            u_inside = (u > EPSILON) & (u < 1 - EPSILON)
+            t_on = (t > -EPSILON) & (t < 1 + EPSILON)
+            u_on = (u > -EPSILON) & (u < 1 + EPSILON)
+
+            for k, l in zip(*np.nonzero(~parallel & ((t_inside & u_on) | (u_inside & t_on)))):
+                # touching at a vertex: use that vertex exactly, so both edges split at the same point
+                if not u_inside[k, l]:
+                    point = a2[l] if u[k, l] < 0.5 else b2[l]
+                elif not t_inside[k, l]:
+                    point = a1[k] if t[k, l] < 0.5 else b1[k]
+                else:
+                    point = a1[k] + t[k, l] * d1[k]
+                if t_inside[k, l]:
+                    found.setdefault((i, k), []).append((t[k, l], point))
+                if u_inside[k, l] and i != j: # a contour against itself sees each pair both ways round
+                    found.setdefault((j, l), []).append((u[k, l], point))
+
+    return found
+
+
+def boundaries(contours, size):
+    """The contours' nonzero fill (what fonts use), as contours that don't cross & have the fill on their left (outers counter-clockwise, holes clockwise); contours that bound no fill (e.g. a same-direction contour inside another) are dropped, & crossing or overlapping ones are split where they meet & rejoined around the filled area"""
+    a, b = edges(contours)
+    found = crossings(contours)
+
+    if not found:
+        # each contour is a boundary or not as a whole: probe its longest edge
+        probe_a, probe_b = [], []
+        for c in contours:
+            k = int(np.argmax(np.linalg.norm(np.roll(c, -1, axis=0) - c, axis=1)))
+            probe_a.append(c[k])
+            probe_b.append(c[(k+1) % len(c)])
+        left, right = filled_sides(np.array(probe_a), np.array(probe_b), a, b, size)
+        return [c if l else c[::-1] for c, l, r in zip(contours, left, right) if l != r]
+
+    # split every edge where it's crossed; identical points become one vertex
+    vertices = {}
+    split = []
+    for i, c in enumerate(contours):
+        ring = []
+        for k, point in enumerate(c):
+            ring.append(vertices.setdefault(tuple(point), len(vertices)))
+            for _, q in sorted(found.get((i, k), []), key=lambda x: x[0]):
+                v = vertices.setdefault(tuple(q), len(vertices))
+                if v != ring[-1]:
+                    ring.append(v)
+        split.append(ring)
+
+    coords = np.array(list(vertices.keys()), dtype=np.float64)
+    pairs = np.array([(u, v) for ring in split for u, v in zip(ring, ring[1:] + ring[:1]) if u != v])
+    a, b = coords[pairs[:, 0]], coords[pairs[:, 1]]
+
+    # keep the edges with fill on exactly one side, turned to have it on their left
+    left, right = filled_sides(a, b, a, b, size)
+    keep = left != right
+    pairs = np.where(right[:, None], pairs[:, ::-1], pairs)[keep]
+
+    outgoing = {}
+    for e, (u, v) in enumerate(pairs):
+        outgoing.setdefault(u, []).append(e)
+
+    used = np.zeros(len(pairs), dtype=bool)
+    rings = []
+    for s in range(len(pairs)):
+        if used[s]:
+            continue
+        ring, e = [], s
+        while True:
+            used[e] = True
+            u, v = pairs[e]
+            ring.append(u)
+            if v == pairs[s][0]:
+                break
+            candidates = [f for f in outgoing.get(v, []) if not used[f]]
+            if not candidates:
+                break
+            # where boundaries touch, take the sharpest left turn, which keeps to the edge of the same filled area, so each ring stays simple
+            incoming = coords[v] - coords[u]
+            def turn(f):
+                out = coords[pairs[f][1]] - coords[v]
+                return math.atan2(incoming[0] * out[1] - incoming[1] * out[0], np.dot(incoming, out))
+            e = max(candidates, key=turn)
+        rings.append(coords[ring])
+
+    return [r for r in rings if len(r) >= 3 and abs(signed_area(r)) > EPSILON]
+
+
+class Outline():
+    """Contours oriented for filling (outers counter-clockwise, holes clockwise) & packed into one point array"""
+
+    def __init__(self, contours):
+        contours = [c for c in contours if len(c) >= 3]
+        if contours:
+            everything = np.concatenate(contours)
+            size = float((everything.max(axis=0) - everything.min(axis=0)).max())
+            contours = [c for c in boundaries(contours, size) if abs(signed_area(c)) > EPSILON]
+        areas = [signed_area(c) for c in contours]
+
+        self.parents = {} # hole index -> outer index
+        for i, c in enumerate(contours):
+            if areas[i] < 0:
+                # the middle of an edge, which (unlike a vertex) can't be shared with an outer
+                k = int(np.argmax(np.linalg.norm(np.roll(c, -1, axis=0) - c, axis=1)))
+                probe = (c[k] + c[(k+1) % len(c)]) / 2
+                containing = [j for j, o in enumerate(contours) if areas[j] > 0 and contains(o, probe)]
+                if containing:
+                    self.parents[i] = min(containing, key=lambda j: areas[j])
+
+        self.rings = [] # (start, count) into self.points, per contour
+        start = 0
+        for c in contours:
+            self.rings.append((start, len(c)))
+            start += len(c)
+
+        self.points = np.concatenate(contours) if contours else np.zeros((0, 2))
+        self.outers = [i for i in range(len(contours)) if areas[i] > 0]
+        self.triangles = None
+
+    def ring_indices(self, i):
+        start, count = self.rings[i]
+        return list(range(start, start + count))
+
+    def triangulate(self):
+        """(m, 3) indices into self.points, counter-clockwise; worked out once per Outline, so counting triangles & then extruding doesn't triangulate twice"""
+        if self.triangles is None:
+            self.triangles = self._triangulate()
+        return self.triangles
+
+    def _triangulate(self):
+        triangles = []
+        for outer in self.outers:
+            ring = self.ring_indices(outer)
+            holes = [self.ring_indices(h) for h, o in self.parents.items() if o == outer]
+            holes.sort(key=lambda h: -self.points[h, 0].max())
+
+            for idx, hole in enumerate(holes):
+                ring = bridge(self.points, ring, hole, holes[idx+1:])
+            triangles.append(earclip(self.points, ring))
+
+        if not triangles:
+            return np.zeros((0, 3), dtype=np.int32)
+        return np.concatenate(triangles).astype(np.int32)
+
+    def offset(self, distance):
+        """Points moved `distance` outward from the filled area, mitered at corners"""
+        if distance == 0:
+            return self.points.copy()
+
+        out = np.empty_like(self.points)
+        for start, count in self.rings:
+            p = self.points[start:start+count]
+            d_in = p - np.roll(p, 1, axis=0)
+            d_out = np.roll(p, -1, axis=0) - p
+            n_in = np.stack([d_in[:, 1], -d_in[:, 0]], axis=1)
+            n_out = np.stack([d_out[:, 1], -d_out[:, 0]], axis=1)
+            n_in /= np.maximum(np.linalg.norm(n_in, axis=1, keepdims=True), EPSILON)
+            n_out /= np.maximum(np.linalg.norm(n_out, axis=1, keepdims=True), EPSILON)
+            miter = n_in + n_out
+            miter /= np.maximum(np.linalg.norm(miter, axis=1, keepdims=True), EPSILON)
+            length = 1 / np.maximum(np.sum(miter * n_in, axis=1), 1 / MITER_LIMIT)
+            out[start:start+count] = p + miter * (length * distance)[:, None]
+        return out
+
+
+def segments_cross(p, q, a, b):
+    """Whether segment p-q properly crosses each of the segments a[i]-b[i]"""
+    d1, d2 = cross(a, b, p), cross(a, b, q)
+    d3, d4 = cross(p, q, a), cross(p, q, b)
+    return (d1 * d2 < -EPSILON) & (d3 * d4 < -EPSILON)
+
+
+def bridge(points, ring, hole, other_holes=()):
+    """Splice a (clockwise) hole into a (counter-clockwise) ring via a zero-width bridge between mutually visible vertices"""
+    hi = int(np.argmax(points[hole, 0]))
+    m = points[hole[hi]]
+
+    edges = [(ring, np.roll(ring, -1)), (hole, np.roll(hole, -1))]
+    edges += [(h, np.roll(h, -1)) for h in other_holes]
+    a = np.concatenate([points[np.asarray(e[0])] for e in edges])
+    b = np.concatenate([points[np.asarray(e[1])] for e in edges])
+
+    candidates = points[ring]
+    m_prev, m_next = points[hole[hi-1]], points[hole[(hi+1) % len(hole)]]
+    order = np.argsort(np.linalg.norm(candidates - m, axis=1), kind="stable")
+
+    def bridgeable(j, strict):
+        v = candidates[j]
+        # earlier bridges repeat vertices, so also check the bridge leaves this copy of v into the filled side
+        if segments_cross(m, v, a, b).any() or not in_corner(candidates[j-1], v, candidates[(j+1) % len(ring)], m, strict):
+            return False
+        # & (ideally) isn't in line with an edge at either end, which would leave a zero-width spike for earclip to drop
+        return not strict or in_corner(m_prev, m, m_next, v, strict)
+
+    choice = next((int(j) for strict in (True, False) for j in order if bridgeable(j, strict)), int(order[0]))
+    return ring[:choice+1] + hole[hi:] + hole[:hi+1] + ring[choice:]
+
+
+def in_corner(a, b, c, p, strict=False):
+    """Whether `p` is inside the corner a-b-c of a ring with its fill on the left (left of a->b & b->c at a convex corner, either at a reflex one); `strict` excludes the corner's edges"""
+    left = (lambda o, q: cross(o, q, p) > 0) if strict else (lambda o, q: cross(o, q, p) >= 0)
+    if cross(a, b, c) >= 0:
+        return left(a, b) and left(b, c)
+    return left(a, b) or left(b, c)
+
+
+EAR_CHUNK = 256 # candidate ears per (ears x reflex points) block
+
+
+def ears(coords, candidates, blockers):
+    """Which of the vertices `candidates` (of a ring of `coords`) are ears: no vertex of `blockers` is in or on their triangle (other than at its corners)"""
+    m = len(coords)
+    found = np.ones(len(candidates), dtype=bool)
+    if len(blockers) == 0:
+        return found
+
+    p = coords[blockers][None]
+    for s in range(0, len(candidates), EAR_CHUNK):
+        i = candidates[s:s+EAR_CHUNK]
+        a, b, c = coords[(i-1) % m][:, None], coords[i][:, None], coords[(i+1) % m][:, None]
+        inside = (cross(a, b, p) >= -EPSILON) & (cross(b, c, p) >= -EPSILON) & (cross(c, a, p) >= -EPSILON)
+        # a blocker at one of the corners (the ear's own neighbours, or a copy a bridge made) doesn't count
+        inside &= (np.linalg.norm(p - a, axis=2) > EPSILON) & (np.linalg.norm(p - b, axis=2) > EPSILON) & (np.linalg.norm(p - c, axis=2) > EPSILON)
+        found[s:s+EAR_CHUNK] = ~inside.any(axis=1)
+    return found
+
+
+def earclip(points, ring):
+    """Triangles (as index triples) for a simple counter-clockwise ring of point indices; each pass tests every convex vertex against every reflex one at once, then clips all the ears that don't share an edge"""
+    ring = np.asarray(ring, dtype=np.int64)
+    triangles = []
+
+    while len(ring) > 3:
+        m = len(ring)
+        coords = points[ring]
+        prev, following = np.roll(coords, 1, axis=0), np.roll(coords, -1, axis=0)
+        turn = cross(prev, coords, following)
+
+        spikes = np.flatnonzero((np.abs(turn) <= EPSILON) & (np.sum((coords - prev) * (following - coords), axis=1) < 0))
+        if len(spikes):
+            # a zero-width spike: drop the vertex, no triangle (one at a time, since dropping one can make or unmake its neighbours)
+            ring = np.delete(ring, spikes[0])
+            continue
+
+        # only reflex & straight-through points can be inside an ear; straight-through points are never clipped themselves
+        # (but left for later), so the side walls still line up with the cap's edges
+        convex = np.flatnonzero(turn > EPSILON)
+        found = convex[ears(coords, convex, np.flatnonzero(turn <= EPSILON))]
+
+        if len(found) == 0:
+            # self-intersecting (or all-collinear) input: force progress at the most convex vertex rather than loop forever
+            found = np.array([int(np.argmax(turn))])
+
+        # ears that don't share an edge can all go at once
+        clip = []
+        for i in found.tolist():
+            if (not clip or i - clip[-1] > 1) and len(clip) < m - 3:
+                clip.append(i)
+        if len(clip) > 1 and clip[0] == 0 and clip[-1] == m - 1:
+            clip.pop()
+
+        clip = np.array(clip)
+        triangles.append(np.stack([ring[(clip-1) % m], ring[clip], ring[(clip+1) % m]], axis=1))
+        ring = np.delete(ring, clip)
+
+    if len(ring) == 3 and cross(points[ring[0]], points[ring[1]], points[ring[2]]) >= 0:
+        triangles.append(ring[None])
+    return np.concatenate(triangles) if triangles else np.zeros((0, 3), dtype=np.int64)
+
+
+def extrude(outline, extrude, bevel=0):
+    """(positions (n, 3), triangles (m, 3)) for an Outline extruded `extrude` either side of z=0, like a Blender curve's Extrude; a `bevel` adds a chamfer of that size around both faces, like Bevel Depth (but flat rather than round)"""
+    triangles = outline.triangulate()
+    n = len(outline.points)
+    if n == 0 or len(triangles) == 0:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.int32)
+
+    rings = {
+        4: [(0, extrude + bevel), (bevel, extrude), (bevel, -extrude), (0, -extrude - bevel)],
+        2: [(0, extrude), (0, -extrude)],
+        1: [(0, 0)],
+    }[levels(extrude, bevel)]
+
+    positions = np.concatenate([
+        np.column_stack([outline.offset(distance), np.full(n, z)]) for distance, z in rings])
+
+    faces = [triangles, triangles[:, ::-1] + n * (len(rings) - 1)]
+    if len(rings) == 1:
+        faces = [triangles]
+
+    for level in range(len(rings) - 1):
+        top, bottom = level * n, (level + 1) * n
+        for start, count in outline.rings:
+            i = np.arange(start, start + count)
+            j = np.roll(i, -1)
+            faces.append(np.stack([i + top, j + bottom, j + top], axis=1))
+            faces.append(np.stack([i + top, i + bottom, j + bottom], axis=1))
+
+    return positions.astype(np.float32), np.concatenate(faces).astype(np.int32)
+
+
+def levels(extrude, bevel):
+    """How many rings of vertices extrude() stacks up"""
+    if bevel > 0:
+        return 4
+    return 2 if extrude > 0 else 1
+
+
+def triangle_count(outline, extrude, bevel=0):
+    """How many triangles extrude() will make of an Outline: its caps' triangles (once, or front & back) plus two per wall edge"""
+    cap = len(outline.triangulate())
+    if cap == 0:
+        return 0
+
+    n = levels(extrude, bevel)
+    return cap * (2 if n > 1 else 1) + 2 * len(outline.points) * (n - 1)
+
+
+COARSEN_STEPS = 12 # each doubles the tolerance
+
+
+def budgeted(recordings, tolerance, extrude, bevel=0, max_triangles=0, per_glyph=True):
+    """An Outline per recording, flattened at `tolerance` times that glyph's size (so small glyphs get fewer points than big ones) & with collinear points merged; with `max_triangles`, tolerances are doubled (glyph by glyph, or for all the glyphs at once) until their extruded meshes fit"""
+    sizes = [control_box_size(r) for r in recordings]
+
+    def build(i, coarseness):
+        t = tolerance * sizes[i] * coarseness
+        return Outline([merge_collinear(c, t) for c in flatten_recording(recordings[i], t)])
+
+    outlines = [build(i, 1) for i in range(len(recordings))]
+    if max_triangles <= 0:
+        return outlines
+
+    if per_glyph:
+        for i in range(len(outlines)):
+            coarseness = 1
+            for _ in range(COARSEN_STEPS):
+                if triangle_count(outlines[i], extrude, bevel) <= max_triangles:
+                    break
+                coarseness *= 2
+                outlines[i] = build(i, coarseness)
+    else:
+        coarseness = 1
+        for _ in range(COARSEN_STEPS):
+            if sum(triangle_count(o, extrude, bevel) for o in outlines) <= max_triangles:
+                break
+            coarseness *= 2
+            outlines = [build(i, coarseness) for i in range(len(recordings))]
+
+    return outlines
+
+
+def convex_hull(points):
+    """Counter-clockwise convex hull (Andrew's monotone chain) of (n, 2) points"""
+    points = np.unique(np.asarray(points, dtype=np.float64), axis=0)
+    if len(points) < 3:
+        return points
+
+    def half(pts):
+        hull = []
+        for p in pts:
+            while len(hull) >= 2 and cross(hull[-2], hull[-1], p) <= EPSILON:
+                hull.pop()
+            hull.append(p)
+        return hull[:-1]
+
+    return np.array(half(points) + half(points[::-1]))
+
+
+def is_convex(polygon):
+    p = np.asarray(polygon)
+    return bool((cross(np.roll(p, 1, axis=0), p, np.roll(p, -1, axis=0)) >= -EPSILON).all())
+
+
+def distinct(polygon):
+    """A polygon's points without repeats, in order (keeping the first of each), e.g. where rings touch"""
+    _, first = np.unique(polygon, axis=0, return_index=True)
+    return polygon[np.sort(first)]
+
+
+def convex_parts(outline, max_parts=0):
+    """Split an Outline into convex polygons (Hertel-Mehlhorn: merge its triangles across every diagonal that keeps both sides convex); with `max_parts`, the smallest part is then repeatedly replaced, together with a neighbour, by their convex hull, which over-covers the outline a little but never leaves any of it out"""
+    points = outline.points
+    # bridged rings repeat vertices, so polygons are kept to ones visiting each vertex once (which p.index relies on):
+    # zero-area triangles through a repeated vertex are dropped, & edges more than one triangle has are never merged across
+    triangles = [t for t in outline.triangulate().tolist() if len(set(t)) == 3]
+    polygons = dict(enumerate(triangles))
+    owner = {} # directed edge -> polygon id
+    repeated = set()
+    for i, polygon in polygons.items():
+        for edge in zip(polygon, polygon[1:] + polygon[:1]):
+            if edge in owner:
+                repeated.add(edge)
+            owner[edge] = i
+
+    for (a, b) in list(owner.keys()):
+        if (a, b) in repeated or (b, a) in repeated:
+            continue
+        i, j = owner.get((a, b)), owner.get((b, a))
+        if i is None or j is None or i == j:
+            continue
+        p, q = polygons[i], polygons[j]
+        k, l = p.index(b), q.index(a)
+        # p rotated to run b..a & q to run a..b, joined without the shared edge
+        merged = p[k:] + p[:k] + (q[l:] + q[:l])[1:-1]
+        if len(set(merged)) < len(merged) or not is_convex(points[merged]):
+            continue
+
+        for edge in [(a, b), (b, a)]:
+            owner.pop(edge, None)
+        for c, d in zip(q, q[1:] + q[:1]):
+            if owner.get((c, d)) == j:
+                owner[(c, d)] = i
+        polygons[i] = merged
+        del polygons[j]
+
+    parts = [distinct(points[polygon]) for polygon in polygons.values()]
+    if max_parts <= 0:
+        return parts
+
+    parts = [[set(polygon), points[polygon]] for polygon in polygons.values()]
+    while len(parts) > max(max_parts, 1):
+        parts.sort(key=lambda part: abs(signed_area(part[1])))
+        smallest = parts.pop(0)
+        neighbours = [part for part in parts if part[0] & smallest[0]] or parts
+
+        def grown(part):
+            hull = convex_hull(np.concatenate([part[1], smallest[1]]))
+            return abs(signed_area(hull)) - abs(signed_area(part[1])), hull
+
+        best = min(neighbours, key=lambda part: grown(part)[0])
+        best[0] |= smallest[0]
+        best[1] = grown(best)[1]
+
+    return [distinct(part[1]) for part in parts]
@@ -1,89 +1,270 @@
-import bpy, tempfile, math, inspect, time
+import bpy, tempfile, math, time
+import numpy as np
 from mathutils import Vector
 from pathlib import Path
 
-from ST2 import util
+from ST2 import util, scripting, sandbox, prefetch, glb, meshcache, tessellate, collision, instancing
 
 
-MESH_CACHE_COLLECTION = "ST2.MeshCache"
-
-
-def read_mesh_glyphs_into_cache(font, p, mesh_table):
-    if MESH_CACHE_COLLECTION not in bpy.data.collections:
-        coll = bpy.data.collections.new(MESH_CACHE_COLLECTION)
-        bpy.context.scene.collection.children.link(coll)
+def glb_material(description):
+    name = description["name"]
+    if name in bpy.data.materials:
+        return bpy.data.materials[name]
     
-    mcc = bpy.data.collections[MESH_CACHE_COLLECTION]
-    mcc.hide_select = True
-    mcc.hide_viewport = True
-    mcc.hide_render = True
+    mat = bpy.data.materials.new(name)
+    mat.diffuse_color = description["baseColorFactor"]
+    mat.use_nodes = True
+    bsdf = mat.node_tree.nodes.get("Principled BSDF")
+    if bsdf:
+        bsdf.inputs["Base Color"].default_value = description["baseColorFactor"]
+        bsdf.inputs["Metallic"].default_value = description["metallicFactor"]
+        bsdf.inputs["Roughness"].default_value = description["roughnessFactor"]
+    return mat
+
+
+def set_triangles(mesh, positions, indices):
+    """Fill an empty mesh with triangles in one foreach_set per attribute: positions (n, 3), indices (3 * triangles,) int32"""
+    triangles = len(indices) // 3
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set("co", positions.ravel())
+    mesh.loops.add(len(indices))
+    mesh.loops.foreach_set("vertex_index", indices)
+    mesh.polygons.add(triangles)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, len(indices), 3, dtype=np.int32))
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set("loop_total", np.full(triangles, 3, dtype=np.int32))
+
+
+def pen_leaves(p):
+    """Each leaf of a (possibly nested) P, in drawing order"""
+    if len(p) > 0:
+        for el in p:
+            yield from pen_leaves(el)
+    else:
+        yield p
+
+
+def pen_recordings(p):
+    """The RecordingPen value of each leaf of a (possibly nested) P, in drawing order"""
+    for leaf in pen_leaves(p):
+        yield leaf.v.value
+
+
+def set_attribute(mesh, name, data_type, domain, values):
+    """(Re)create a generic attribute on `mesh` & fill it in one foreach_set"""
+    if name in mesh.attributes:
+        mesh.attributes.remove(mesh.attributes[name])
+    attribute = mesh.attributes.new(name, data_type, domain)
+    if len(values):
+        attribute.data.foreach_set("value", values)
+    return attribute
+
+
+# (name, attribute type, numpy type) of the per-glyph data T.tag_glyphs stores
+GLYPH_ATTRIBUTES = [
+    ("char_index", "INT", np.int32),
+    ("glyph_index", "INT", np.int32),
+    ("line", "INT", np.int32),
+    ("position", "FLOAT", np.float32),
+]
+
+
+def glyph_attributes(leaves):
+    """name -> (attribute type, a value per leaf) for the GLYPH_ATTRIBUTES"""
+    return {name: (data_type, np.array([leaf.data(name, 0) for leaf in leaves], dtype=dtype))
+        for name, data_type, dtype in GLYPH_ATTRIBUTES}
+
+
+def outlines_mesh(mesh, outlines, extrude, bevel, attributes=None):
+    """Replace `mesh`'s geometry with tessellate.Outlines, triangulated & extruded; `attributes` (name -> (attribute type, a value per outline)) become face attributes, so every triangle knows which glyph it belongs to"""
+    positions, indices, triangles = [], [], []
+    count = 0
+    for outline in outlines:
+        glyph_positions, glyph_triangles = tessellate.extrude(outline, extrude, bevel)
+        positions.append(glyph_positions)
+        indices.append(glyph_triangles.ravel() + count)
+        triangles.append(len(glyph_triangles))
+        count += len(glyph_positions)
+
+    mesh.clear_geometry()
+    if count:
+        set_triangles(mesh, np.concatenate(positions), np.concatenate(indices).astype(np.int32))
+        for name, (data_type, values) in (attributes or {}).items():
+            set_attribute(mesh, name, data_type, "FACE", np.repeat(values, triangles))
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def outline_mesh(mesh, p, data):
+    """Replace `mesh`'s geometry with `p` flattened, triangulated & extruded by tessellate.py, using mesh_extrude & mesh_bevel_depth in the same local units a text curve's extrude & bevel use"""
+    # 3*scale b/c of the 3pt fontSize hardcoded in base_style_kwargs
+    tolerance = data.mesh_tolerance * 3 * data.scale
+    leaves = list(pen_leaves(p))
+    outlines = [tessellate.Outline(tessellate.flatten_recording(leaf.v.value, tolerance)) for leaf in leaves]
+    return outlines_mesh(mesh, outlines, data.mesh_extrude, data.mesh_bevel_depth, glyph_attributes(leaves))
+
+
+def mesh_from_glb(name, data):
+    """Build a mesh datablock straight from GLB bytes (no temp file, no import operator); raises glb.UnsupportedGLB for anything glb.decode can't handle"""
+    decoded = glb.decode(data)
+
+    positions = glb.yup_to_zup(decoded.positions)
+    indices = decoded.indices.astype(np.int32)
+
+    mesh = bpy.data.meshes.new(name)
+    set_triangles(mesh, positions, indices)
+    mesh.polygons.foreach_set("material_index", decoded.material_indices)
+
+    if decoded.uvs is not None:
+        uvs = decoded.uvs[indices] * np.array([1, -1], dtype=np.float32) + np.array([0, 1], dtype=np.float32)
+        mesh.uv_layers.new(name="UVMap").data.foreach_set("uv", uvs.ravel())
+
+    for description in decoded.materials:
+        mesh.materials.append(glb_material(description))
+
+    mesh.update(calc_edges=True)
+    mesh.validate()
+
+    if decoded.normals is not None:
+        mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=bool))
+        if hasattr(mesh, "use_auto_smooth"):
+            mesh.use_auto_smooth = True
+        mesh.normals_split_custom_set_from_vertices(glb.yup_to_zup(decoded.normals))
     
-    font_name = font.path.stem
+    return mesh
+
 
-    for x in p:
-        key = f"{font_name}.{x.glyphName}"
+def mesh_from_glb_operator(name, data):
+    """Fallback for GLBs glb.decode doesn't support (textures, etc.), via Blender's full glTF importer"""
+    with tempfile.NamedTemporaryFile("wb", suffix=".glb", delete=False) as glbf:
+        glbf.write(data)
+    
+    bpy.ops.import_scene.gltf(filepath=glbf.name)
+    Path(glbf.name).unlink()
+
+    obj = bpy.context.object
+    mesh = obj.data
+    mesh.name = name
+    bpy.data.objects.remove(obj, do_unlink=True)
+    return mesh
+
+
+def projected_ppem(obj, scene, data):
+    """Roughly how many pixels tall an em of this object's text is in the active camera's render (None if there's no camera)"""
+    camera = scene.camera
+    if camera is None or camera.type != "CAMERA":
+        return None
+
+    render = scene.render
+    pct = render.resolution_percentage / 100
+    res_x, res_y = render.resolution_x * pct, render.resolution_y * pct
+    if camera.data.sensor_fit == "VERTICAL" or (camera.data.sensor_fit == "AUTO" and res_y > res_x):
+        res = res_y
+    else:
+        res = res_x
+
+    # 3*scale b/c of the 3pt fontSize hardcoded in base_style_kwargs
+    em = 3 * data.scale * max(obj.matrix_world.to_scale())
+
+    if camera.data.type == "ORTHO":
+        return em / camera.data.ortho_scale * res
+
+    depth = -(camera.matrix_world.inverted() @ obj.matrix_world.translation).z
+    if depth <= 0:
+        return 0 # behind the camera
+    return em / depth * (res / 2) / math.tan(camera.data.angle / 2)
+
+
+def mesh_ppem(obj, scene, data):
+    """The ppem to pick a MESH strike by (None meaning the most detailed one): full detail when asked for or in final renders, otherwise the projected size"""
+    if data.mesh_lod == "FULL":
+        return None
+    # is_job_running is Blender 3.3+
+    if data.mesh_lod_render_full and hasattr(bpy.app, "is_job_running") and bpy.app.is_job_running("RENDER"):
+        return None
+    return projected_ppem(obj, scene, data)
+
+
+def read_mesh_glyphs_into_cache(font, p, mesh_table, ppem=None):
+    """Import every glyph prototype `p` needs (from the strike best suited to `ppem`) that isn't cached yet, in one pass; "dupe" glyphs share the mesh of the glyph they reference. Returns the chosen strike's ppem, for build_mesh"""
+    mcc = meshcache.collection()
+    strike = mesh_table.strikeForPpem(ppem)
+    version = meshcache.font_version(font.path)
+    meshcache.clear_stale(font.path, version)
+
+    for glyphName in dict.fromkeys(x.glyphName for x in p):
+        key = meshcache.prototype_key(font.path, strike.ppem, glyphName)
+        if key in bpy.data.objects:
+            continue
         
-        if key not in bpy.data.objects:
-            mg = mesh_table.strikes[1000].glyphs[x.glyphName]
+        mg = strike.glyphs[glyphName]
+        source = strike.resolve(glyphName)
+        mesh_name = meshcache.prototype_key(font.path, strike.ppem, source.glyphName)
 
-            with tempfile.NamedTemporaryFile("wb", suffix=".glb", delete=False) as glbf:
-                glbf.write(mg.meshData)
-            
-            bpy.ops.import_scene.gltf(filepath=glbf.name)
-            Path(glbf.name).unlink()
-            
-            obj = bpy.context.object
-            obj.name = key
-            obj.st2.meshOffsetX = mg.originOffsetX
-            obj.st2.meshOffsetY = mg.originOffsetY
+        mesh = bpy.data.meshes.get(mesh_name)
+        if mesh is None:
+            try:
+                mesh = mesh_from_glb(mesh_name, source.meshData)
+            except glb.UnsupportedGLB as e:
+                print(">>> falling back to glTF importer:", glyphName, e)
+                mesh = mesh_from_glb_operator(mesh_name, source.meshData)
+        
+        obj = bpy.data.objects.new(key, mesh)
+        meshcache.stamp(obj, version)
+        obj.st2.meshOffsetX = mg.originOffsetX
+        obj.st2.meshOffsetY = mg.originOffsetY
+        mcc.objects.link(obj)
+    
+    meshcache.touch(meshcache.prototype_key(font.path, strike.ppem, x.glyphName) for x in p)
+    return strike.ppem
 
-            mcc.objects.link(obj)
 
-            for c in obj.users_collection:
-                if c != mcc:
-                    c.objects.unlink(obj)    
-            #print(">>> imported mesh:", x.glyphName)
+def is_mesh_font_obj(obj):
+    """An empty whose children (if any) are all glyph instances, as create_live_mesh_font makes"""
+    return obj.type == "EMPTY" and all(c.type == "MESH" for c in obj.children)
 
 
-def build_mesh(empty, p, data):
+def build_mesh(empty, p, data, ppem):
+    """Place one instance per glyph under `empty`; instances link their prototype's mesh datablock (so memory scales with unique glyphs, not characters) and are only touched when their glyph or placement changed"""
     font = data.font()
     current = {}
 
-    for o in bpy.data.objects:
-        if o.parent == empty:
-            idx = int(o.name.split(".")[-1])
-            current[idx] = o
+    for o in empty.children:
+        idx = int(o.name.split(".")[-1])
+        current[idx] = o
+
+    scale = Vector((0.3*data.scale, 0.3*data.scale, 0.3*data.scale))
 
     for idx, x in enumerate(p):
-        key = f"{font.path.stem}.{x.glyphName}"
+        key = meshcache.prototype_key(font.path, ppem, x.glyphName)
         prototype = bpy.data.objects[key]
-        existing = current.get(idx, None)
-        
-        if existing:
-            mesh_glyph = existing
-        else:
-            mesh_glyph = prototype.copy()
+        mesh_glyph = current.get(idx, None)
         
-        mesh_glyph.data = prototype.data.copy()
-        mesh_glyph.name = f"{empty.name}.glyph.{idx}"
-        mesh_glyph.parent = empty
-        mesh_glyph.st2.parent = empty.name
-
-        mesh_glyph.scale = (0.3*data.scale, 0.3*data.scale, 0.3*data.scale)
+        if mesh_glyph is None:
+            mesh_glyph = bpy.data.objects.new(f"{empty.name}.glyph.{idx}", prototype.data)
+            mesh_glyph.parent = empty
+            mesh_glyph.st2.parent = empty.name
+            empty.users_collection[0].objects.link(mesh_glyph)
+        elif mesh_glyph.data != prototype.data:
+            mesh_glyph.data = prototype.data
 
         amb = x.ambit(tx=0, ty=0)
         # 0.003 is b/c of the 3pt fontSize hardcoded above
-        mesh_glyph.location = (
+        location = Vector((
             amb.x + prototype.st2.meshOffsetX*0.003*data.scale,
             0, #mesh_glyph.location.y,
-            prototype.st2.meshOffsetY*0.003*data.scale)
+            prototype.st2.meshOffsetY*0.003*data.scale))
 
-        if existing is None:
-            empty.users_collection[0].objects.link(mesh_glyph)
+        if (mesh_glyph.location - location).length > 1e-6:
+            mesh_glyph.location = location
+        if (mesh_glyph.scale - scale).length > 1e-6:
+            mesh_glyph.scale = scale
     
     for idx, o in current.items():
         if idx >= len(p):
-            bpy.data.objects.remove(current[idx], do_unlink=True)
+            bpy.data.objects.remove(o, do_unlink=True)
+    
+    meshcache.trim(bpy.context.scene)
 
 
 class T():
@@ -100,6 +281,9 @@ class T():
 
         self.font = self.st2.font()
         self.text = self.st2.build_text()
+
+        self.prepared = None
+        self.pending = None
         
         self.base_name = "ST2::File" if self.st2.text_mode != "UI" else "ST2:" + self.text[:20].replace("\n", "")
     
@@ -110,17 +294,56 @@ class T():
             p = self.build_multi_style()
 
         self.align(p)
+        self.tag_glyphs(p)
         
         # not good if we want to do stagger line-wise, need to preserve this info
         p.collapse()
         return p
     
+    def tag_glyphs(self, p):
+        """Store each glyph's line, character index (the first character of its shaping cluster, in the whole text), glyph index (in the whole text), normalized position (0-1 along the whole text) & advance as data on its leaves (every layer, for color glyphs), since collapse() drops the line structure"""
+        # both build_single_style & build_multi_style set multiline, so `p` is always lines of glyphs (however deep a glyph is, e.g. a color glyph's layers), each line shaped on its own
+        lines = list(p)
+        count = sum(len(line) for line in lines)
+        text_lines = self.text.split("\n")
+        line_start = 0
+        glyph_index = 0
+
+        for line_index, line in enumerate(lines):
+            for index_in_line, glyph in enumerate(line):
+                frame = glyph.data("frame")
+                # the shaper's cluster is an offset into the line's text, shared by a ligature's characters & by a base & its marks
+                cluster = glyph.data("glyphCluster", index_in_line)
+                for leaf in pen_leaves(glyph):
+                    leaf.data(line=line_index
+                        , char_index=line_start + cluster
+                        , glyph_index=glyph_index
+                        , position=glyph_index/(count-1) if count > 1 else 0.0
+                        , advance=float(frame.w) if frame is not None else 0.0)
+                glyph_index += 1
+            line_start += len(text_lines[line_index] if line_index < len(text_lines) else "") + 1
+    
+    def prepare(self):
+        """Build the base vectors and, for sandboxed scripts, hand `modify` off to a worker process, so several objects' scripts can run in parallel before any of them is drawn"""
+        self.prepared = self.base_vectors()
+        self.pending = None
+
+        if self.st2.script_enabled and self.st2.script_sandboxed:
+            self.pending = sandbox.submit(self.st2, self.prepared)
+        
+        return self
+    
     def two_dimensional(self, glyphwise=False, shapewise=False):
-        p = self.base_vectors()
+        if self.prepared is None:
+            self.prepare()
+        
+        p, self.prepared = self.prepared, None
 
-        if self.st2.script_enabled:
+        if self.pending is not None:
+            p, self.pending = self.pending.result(), None
+        elif self.st2.script_enabled and not self.st2.script_sandboxed:
             p = self.apply_script(p)
-        if self.st2.combine_glyphs and not glyphwise:
+        if self.combines_glyphs(glyphwise):
             p = p.pen()
         if self.st2.remove_overlap:
             p.removeOverlap(use_skia_pathops_draw=False)
@@ -132,6 +355,12 @@ class T():
         
         return p
     
+    def combines_glyphs(self, glyphwise=False):
+        """Whether two_dimensional merges the glyphs into one outline; only curves are, since a MESH font's glyphs are placed one by one, and mesh & instance output tessellate each glyph by itself (tagged by tag_glyphs) into what's still a single object"""
+        if glyphwise or not self.st2.combine_glyphs or self.st2.mesh() is not None:
+            return False
+        return self.st2.output_mode == "CURVE" or self.st2.baked
+    
     def base_style_kwargs(self):
         kp = None
         if self.st2.kerning_pairs and self.st2.kerning_pairs_enabled:
@@ -148,22 +377,33 @@ class T():
             , fit=self.st2.fit if self.st2.fit_enable else None
             , **self.st2.features(self.font))
     
-    def build_single_style(self):
-        from ST2.importer import ct
-
-        return ct.StSt(self.text
-            , **self.base_style_kwargs()
-            , **self.st2.variations(self.font)
+    def single_style_kwargs(self, meta=None):
+        """The StSt arguments build_single_style uses; with another font's fontindex.FontMetadata, the variations are for that font's axes (as prefetch shapes neighbouring fonts)"""
+        return dict(**self.base_style_kwargs()
+            , **self.st2.variations(meta)
             , multiline=True
             , leading=self.st2.leading
             , strip=False)
+    
+    def build_single_style(self):
+        from ST2.importer import ct
+
+        kwargs = self.single_style_kwargs()
+        
+        p = None
+        if self.st2.font_path:
+            p = prefetch.take(self.st2.font_path, self.text, kwargs)
+        
+        if p is None:
+            p = ct.StSt(self.text, **kwargs)
+        return p
 
     def build_multi_style(self):
         from ST2.importer import ct
 
         def styler(x):
             _vars = {}
-            for idx, (k, _) in enumerate(self.st2.visible_variation_axes(self.font).items()):
+            for idx, (k, _) in enumerate(self.st2.visible_variation_axes().items()):
                 dp = f"fvar_axis{idx+1}"
                 fvar_offset = getattr(self.st2, f"{dp}_offset")
                 found = False
@@ -212,55 +452,23 @@ class T():
             p.t(0, -ah)
 
     def apply_script(self, p):
-        from runpy import run_path
-        from tempfile import NamedTemporaryFile
-
-        res = None
+        script = None
         if self.st2.script_mode == "FILE" and self.st2.script_file:
             try:
-                res = run_path(self.st2.script_file)
+                script = scripting.script_file(self.st2.script_file)
             except Exception as e:
                 print("Could not run script", e)
         elif self.st2.script_mode == "BLOCK":
             try:
-                script_text = bpy.data.texts[self.st2.script_block].as_string()
-                if script_text:
-                    tmp_path = None
-                    with NamedTemporaryFile("w", suffix=".py", delete=False) as tf:
-                        tf.write(script_text)
-                        tmp_path = Path(tf.name)
-                    try:
-                        res = run_path(tmp_path)
-                    except Exception as e:
-                        print("Could not run block", e)
-                    finally:
-                        tmp_path.unlink()
+                script = scripting.script_block(self.st2.script_block)
             except KeyError:
                 print("No block with that name")
+            except Exception as e:
+                print("Could not run block", e)
         
-        if res:
-            if "modify" in res:
-                fn = res["modify"]
-                arg_count = len(inspect.signature(fn).parameters)
-                
-                args = [self.st2]
-                if arg_count > 1:
-                    try:
-                        args.append(eval(f"dict({self.st2.script_kwargs})"))
-                    except Exception as e:
-                        print(e)
-                        print("failed to parse kwargs")
-                        args.append({})
-
-                if arg_count > 2:
-                    args.append(p)
-                
-                #if arg_count > 3:
-                #    args.append(txtObj)
-                
-                return fn(*args)
-                #if output is not None:
-                #    txtObj.draw(output, set_origin=False, fill=False)
+        if script:
+            if script.modify:
+                return script.run(self.st2, p, self.scene.frame_current)
             else:
                 print(">>> SCRIPT ERROR: no `modify` function found")
 
@@ -302,6 +510,10 @@ class T():
         return p
     
     def create_live_text(self, p):
+        mesh_table = self.st2.mesh()
+        if mesh_table is not None:
+            return self.create_live_mesh_font(p, mesh_table)
+
         if p.depth() == 0 or True:
             return self.create_live_single(p)
         else:
@@ -331,17 +543,72 @@ class T():
         to.extrude(0)
 
         if self.obj: # converting
-            data = self.obj.data
-            if self.obj.type == "EMPTY":
-                data = util.get_children(self.obj)[0].data
-
-            to.obj.data = data.copy()
+            self.copy_curve_data(to)
             to.obj.animation_data_clear()
             self.st2.copy_to(to.obj.st2)
         
         to.draw(p, set_origin=False, fill=True)
         return to
     
+    def create_live_mesh_font(self, p, mesh_table):
+        """An empty parenting one instance per glyph, showing the glyph's mesh from the font's MESH table, from the strike matching the text's projected size"""
+        from ST2.importer import cb
+
+        empty = cb.BpyObj.Empty("ST2:Text", self.collection)
+        if self.obj: # converting
+            empty.obj.location = self.obj.location
+            empty.obj.rotation_euler = self.obj.rotation_euler
+            empty.obj.scale = self.obj.scale
+
+        ppem = read_mesh_glyphs_into_cache(self.font, p, mesh_table, mesh_ppem(empty.obj, self.scene, self.st2))
+        build_mesh(empty.obj, p, self.st2, ppem)
+        return empty
+    
+    def copy_curve_data(self, to):
+        """Give a new text curve this object's curve settings; mesh output has no curve, so its extrude, bevel & materials are carried over instead"""
+        if self.obj.type == "MESH":
+            to.extrude(self.st2.mesh_extrude)
+            to.obj.data.bevel_depth = self.st2.mesh_bevel_depth
+            for material in self.obj.data.materials:
+                to.obj.data.materials.append(material)
+            return
+
+        data = self.obj.data
+        if self.obj.type == "EMPTY":
+            children = util.get_children(self.obj)
+            if not children or children[0].type != "CURVE": # a mesh font's glyph instances
+                return
+            data = children[0].data
+        to.obj.data = data.copy()
+    
+    def create_live_mesh(self, p, instances=False):
+        from ST2.importer import cb
+
+        mesh = bpy.data.meshes.new("ST2:Text")
+        if not instances:
+            outline_mesh(mesh, p, self.st2)
+        obj = bpy.data.objects.new("ST2:Text", mesh)
+
+        if self.obj: # converting
+            for material in getattr(self.obj.data, "materials", []):
+                mesh.materials.append(material)
+            obj.scale = self.obj.scale
+            for collection in self.obj.users_collection:
+                collection.objects.link(obj)
+        else:
+            self.scene.collection.objects.link(obj)
+
+        if instances:
+            instancing.add_modifier(obj)
+            instancing.write_points(obj, p, self.st2)
+
+        to = cb.BpyObj()
+        to.obj = obj
+        return to
+    
+    def create_live_instances(self, p):
+        return self.create_live_mesh(p, instances=True)
+    
     def add_parented_glyph(self, idx, p, parent, data):
         from ST2.importer import cb
 
@@ -372,8 +639,40 @@ class T():
 
         selected = self.obj.select_get()
 
+        mesh_table = self.st2.mesh()
+        if mesh_table is not None and not self.st2.baked:
+            if not is_mesh_font_obj(self.obj):
+                return self.swap_metadata(self.create_live_mesh_font(p, mesh_table), selected)
+
+            if self.st2.auto_rename:
+                self.obj.name = self.base_name
+
+            ppem = read_mesh_glyphs_into_cache(self.font, p, mesh_table, mesh_ppem(self.obj, self.scene, self.st2))
+            build_mesh(self.obj, p, self.st2, ppem)
+            return
+
         if p.depth() == 0 or True:
-            if self.obj.type == "EMPTY":
+            if self.st2.output_mode == "INSTANCES" and not self.st2.baked:
+                if not instancing.is_instancer(self.obj):
+                    return self.swap_metadata(self.create_live_instances(p), selected)
+                
+                if self.st2.auto_rename:
+                    self.obj.name = self.base_name
+
+                instancing.write_points(self.obj, p, self.st2)
+                return
+
+            if self.st2.output_mode == "MESH" and not self.st2.baked:
+                if self.obj.type != "MESH" or instancing.is_instancer(self.obj):
+                    return self.swap_metadata(self.create_live_mesh(p), selected)
+                
+                if self.st2.auto_rename:
+                    self.obj.name = self.base_name
+
+                outline_mesh(self.obj.data, p, self.st2)
+                return
+
+            if self.obj.type == "EMPTY" or (self.obj.type == "MESH" and not self.st2.baked):
                 return self.swap_metadata(self.create_live_single(p), selected)
 
             to = cb.BpyObj()
@@ -405,13 +704,34 @@ class T():
                 if i not in children_reused:
                     bpy.data.objects.remove(c, do_unlink=True)
     
+    def convert_budgeted(self, obj, p):
+        """Convert a (selected) exported text curve to a mesh tessellated by tessellate.py, at a tolerance relative to each glyph's size & within the export's triangle cap, rather than at the curve's fixed resolution"""
+        curve = obj.data
+        extrude, bevel = curve.extrude, curve.bevel_depth
+
+        # the curve's own tessellation is thrown away, so make it as cheap as possible
+        curve.resolution_u = 1
+        curve.extrude = 0
+        curve.bevel_depth = 0
+        bpy.ops.object.convert(target="MESH")
+
+        leaves = list(pen_leaves(p))
+        outlines = tessellate.budgeted([leaf.v.value for leaf in leaves],
+            self.st2.export_tolerance,
+            extrude,
+            bevel,
+            max_triangles=self.st2.export_max_triangles,
+            per_glyph=self.st2.export_budget_scope == "GLYPH")
+        outlines_mesh(obj.data, outlines, extrude, bevel, glyph_attributes(leaves))
+    
     def convert_live_to_baked(self, p, framewise, glyphwise, shapewise, parent):
         from ST2.importer import cb
         output = []
+        bodies = [] # (obj, collision proxies), made rigid bodies together once every glyph is exported
 
         def export(glyph=None, idx=None):
             txtObj = (cb.BpyObj.Curve(f"{self.obj.name}Frozen", self.collection))
-            txtObj.obj.data = self.obj.data.copy()
+            self.copy_curve_data(txtObj)
             txtObj.obj.animation_data_clear()
             txtObj.obj.scale = self.obj.scale
             txtObj.obj.location = self.obj.location
@@ -462,14 +782,22 @@ class T():
             txtObj.obj.select_set(True)
             
             if self.st2.export_meshes:
-                bpy.ops.object.convert(target="MESH")
+                extrude, bevel = txtObj.obj.data.extrude, txtObj.obj.data.bevel_depth
+                if self.st2.export_budgeted:
+                    self.convert_budgeted(txtObj.obj, glyph if glyph else p)
+                else:
+                    bpy.ops.object.convert(target="MESH")
+                if self.st2.export_rigidbody_active:
+                    # proxies go in before transforms are applied, while the mesh is still in the outlines' space
+                    proxies = collision.add_proxies(txtObj.obj,
+                        list(pen_recordings(glyph if glyph else p)),
+                        extrude,
+                        bevel,
+                        self.st2.export_rigidbody_parts)
                 if self.st2.export_apply_transforms:
                     bpy.ops.object.transform_apply(location=0, rotation=1, scale=1, properties=0)
                 if self.st2.export_rigidbody_active:
-                    bpy.ops.rigidbody.object_add()
-                    txtObj.obj.rigid_body.type = "ACTIVE"
-                    #bpy.ops.object.transform_apply(location=0, rotation=1, scale=1, properties=0)
-                    pass
+                    bodies.append((txtObj.obj, proxies))
             
             if origin == "GEOMETRIC":
                 bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY')
@@ -506,6 +834,9 @@ class T():
             res, origin_pt = export()
             output.append(res)
         
+        if bodies:
+            collision.add_rigid_bodies(bodies, self.scene)
+        
         return output
 
 
@@ -1,4 +1,5 @@
-import bpy, platform
+import bpy, os, platform
+from pathlib import Path
 
 
 def _os(): return platform.system()
@@ -7,6 +8,29 @@ def on_mac(): return _os() == "Darwin"
 def on_linux(): return _os() == "Linux"
 
 
+def normalize(path):
+    """The absolute form of a path, as a string, for keying caches & comparing paths"""
+    return str(Path(path).expanduser().absolute())
+
+
+def modified(path, recursive=True):
+    """(mtime_ns, size) of a file; for a directory (e.g. a .ufo), the newest mtime & the total size of everything inside it (or, not `recursive`, of the files directly in it), since editing a file doesn't change its directory's own mtime"""
+    stat = os.stat(path)
+    if not os.path.isdir(path):
+        return stat.st_mtime_ns, stat.st_size
+
+    newest, size = stat.st_mtime_ns, 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for name in dirnames + filenames:
+            stat = os.stat(os.path.join(dirpath, name))
+            newest = max(newest, stat.st_mtime_ns)
+            if name in filenames:
+                size += stat.st_size
+        if not recursive:
+            break
+    return newest, size
+
+
 def clear_frame_changers(fn):
     for funcs in [
         bpy.app.handlers.frame_change_pre,
@@ -24,6 +48,14 @@ def clear_frame_changers(fn):
                 pass
 
 
+def clear_handler(handlers, fn):
+    for handler in [h for h in handlers if h.__name__ == fn.__name__]:
+        try:
+            handlers.remove(handler)
+        except ValueError:
+            pass
+
+
 def ensure_frame_changer(frame_changers, fn, src=None):
     found = False
     for fc in frame_changers:
@@ -34,6 +66,21 @@ def ensure_frame_changer(frame_changers, fn, src=None):
         frame_changers.append(fn)
 
 
+def resident_memory():
+    """Bytes of the process's current resident set, or None where it can't be read cheaply"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
 def get_children(ko):
     children = []
     for o in bpy.data.objects:
@@ -0,0 +1,122 @@
+import bpy, threading
+from concurrent.futures import ThreadPoolExecutor
+from bpy.app.handlers import persistent
+
+from ST2 import fontcache, fontindex
+
+
+MAX_WORKERS = 4
+
+_executor = None
+_progress = dict(total=0, done=0)
+_progress_lock = threading.Lock() # "done" is counted from the worker threads
+
+
+def referenced_font_paths():
+    paths = set()
+    for scene in bpy.data.scenes:
+        if scene.st2.font_path:
+            paths.add(scene.st2.font_path)
+    for obj in bpy.data.objects:
+        if obj.st2.font_path and obj.st2.updatable:
+            paths.add(obj.st2.font_path)
+    return sorted(paths)
+
+
+def warm_font(font_path, large=False):
+    """Index the font's metadata & (unless it's large) parse it with a first shaping, so the first panel draw/typeset finds it ready"""
+    from ST2.importer import ct
+
+    try:
+        with fontcache.shaping(): # sources' metadata is read off the parsed font
+            meta = fontindex.metadata(font_path)
+            if large:
+                return
+            
+            font = fontcache.load(font_path)
+            if meta.mesh:
+                font.font.ttFont["MESH"]
+            ct.StSt("A", font, 1)
+    except Exception as e:
+        print(">>> could not warm font", font_path, e)
+    finally:
+        with _progress_lock:
+            _progress["done"] += 1
+
+
+def in_progress():
+    return _progress["done"] < _progress["total"]
+
+
+def progress_text():
+    return f"ST2: loading fonts {_progress['done']}/{_progress['total']}"
+
+
+def _report_progress():
+    try:
+        workspace = bpy.context.workspace
+        if in_progress():
+            workspace.status_text_set(progress_text())
+        else:
+            workspace.status_text_set(None)
+    except AttributeError:
+        pass
+
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == "VIEW_3D":
+                area.tag_redraw()
+
+    if in_progress():
+        return 0.25
+    else:
+        print("/warmed fonts")
+        return None
+
+
+def warm_fonts(font_paths):
+    global _executor
+
+    if not font_paths:
+        return
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="st2-warmup")
+
+    scene = bpy.context.scene
+    with _progress_lock:
+        _progress["total"] += len(font_paths)
+    for font_path in font_paths:
+        _executor.submit(warm_font, font_path, fontcache.is_large(font_path, scene))
+
+    if not bpy.app.timers.is_registered(_report_progress):
+        bpy.app.timers.register(_report_progress, first_interval=0.1)
+
+
+@persistent
+def warm_fonts_on_load(_):
+    from ST2 import importer
+
+    if importer.coldtype_status == -2:
+        importer.do_import()
+    if importer.C is None:
+        return
+
+    paths = referenced_font_paths()
+    print("warming fonts...", len(paths))
+    warm_fonts(paths)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if bpy.app.timers.is_registered(_report_progress):
+        bpy.app.timers.unregister(_report_progress)
+    with _progress_lock:
+        _progress.update(total=0, done=0)
+
+
+classes = []
+panels = []
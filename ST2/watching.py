@@ -0,0 +1,174 @@
+import os, time, struct
+from pathlib import Path
+
+from ST2 import util
+
+
+DEBOUNCE = 0.3 # seconds of quiet after the last event before a change is reported
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o0004000
+IN_CLOEXEC = 0o2000000
+
+IN_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+inotify_event = struct.Struct("iIII")
+
+
+class Watcher():
+    """Collects changes to a set of files, reporting each change once its burst of events (e.g. an editor's multi-step save) has settled"""
+
+    def __init__(self):
+        self.paths = set()
+        self.pending = {}
+
+    def watch(self, paths):
+        self.paths = set(util.normalize(p) for p in paths if p)
+        for path in list(self.pending.keys()):
+            if path not in self.paths:
+                del self.pending[path]
+
+    def changed(self):
+        now = time.monotonic()
+        for path in self.events():
+            if path in self.paths:
+                self.pending[path] = now
+
+        settled = set(p for p, t in self.pending.items() if now - t >= DEBOUNCE)
+        for path in settled:
+            del self.pending[path]
+        return settled
+
+    def events(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class PollingWatcher(Watcher):
+    def __init__(self):
+        super().__init__()
+        self.stats = {}
+
+    def _stat(self, path):
+        try:
+            return util.modified(path)
+        except OSError:
+            return None
+
+    def watch(self, paths):
+        super().watch(paths)
+        for path in self.paths:
+            if path not in self.stats:
+                self.stats[path] = self._stat(path)
+        for path in list(self.stats.keys()):
+            if path not in self.paths:
+                del self.stats[path]
+
+    def events(self):
+        events = []
+        for path, last in self.stats.items():
+            stat = self._stat(path)
+            if stat != last:
+                self.stats[path] = stat
+                events.append(path)
+        return events
+
+
+class InotifyWatcher(Watcher):
+    """Watches the parent directories of files (so atomic rename-saves are seen) via Linux inotify; a watched directory (e.g. a .ufo) is watched along with every directory inside it, since inotify isn't recursive, & any event inside it counts as a change to it"""
+
+    def __init__(self):
+        super().__init__()
+        import ctypes, ctypes.util
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {} # dir -> wd
+        self.wds = {} # wd -> dir
+        self.packages = {} # watched directory -> the directories inside it (listed when first watched & after each change)
+
+    def watch(self, paths):
+        super().watch(paths)
+        for package in list(self.packages.keys()):
+            if package not in self.paths:
+                del self.packages[package]
+        for path in self.paths:
+            if path not in self.packages and os.path.isdir(path):
+                self.packages[path] = [dirpath for dirpath, _, _ in os.walk(path)]
+        self._sync()
+
+    def _sync(self):
+        directories = set(str(Path(p).parent) for p in self.paths)
+        for package_directories in self.packages.values():
+            directories.update(package_directories)
+
+        for d in directories:
+            if d not in self.directories:
+                wd = self.libc.inotify_add_watch(self.fd, d.encode("utf-8"), IN_WATCH_MASK)
+                if wd >= 0:
+                    self.directories[d] = wd
+                    self.wds[wd] = d
+
+        for d in list(self.directories.keys()):
+            if d not in directories:
+                wd = self.directories.pop(d)
+                self.wds.pop(wd, None)
+                self.libc.inotify_rm_watch(self.fd, wd)
+
+    def owner(self, path):
+        """The watched path an event at `path` is a change to"""
+        for package in self.packages:
+            if path.startswith(package + os.sep):
+                return package
+        return path
+
+    def events(self):
+        events = []
+        while True:
+            try:
+                buf = os.read(self.fd, 64*1024)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+
+            offset = 0
+            while offset < len(buf):
+                wd, mask, cookie, length = inotify_event.unpack_from(buf, offset)
+                offset += inotify_event.size
+                name = buf[offset:offset+length].rstrip(b"\0").decode("utf-8", "replace")
+                offset += length
+                if wd in self.wds and name:
+                    events.append(self.owner(os.path.join(self.wds[wd], name)))
+
+        changed = set(events) & set(self.packages.keys())
+        for package in changed:
+            # (re)list it, so new directories (e.g. a layer) are watched too
+            self.packages[package] = [dirpath for dirpath, _, _ in os.walk(package)]
+        if changed:
+            self._sync()
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher():
+    if util.on_linux():
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            print("inotify unavailable, polling instead:", e)
+    return PollingWatcher()
+
+
+classes = []
+panels = []
@@ -8,6 +8,12 @@ def vec(a, b, c):
     import mathutils
     return mathutils.Vector([a, b, c])
 
+def attribute(obj, name):
+    import numpy as np
+    values = np.zeros(len(obj.data.attributes[name].data), dtype=np.int32)
+    obj.data.attributes[name].data.foreach_get("value", values)
+    return values
+
 def new_text(text):
     tag = f"ST2:{text}"
     
@@ -0,0 +1,43 @@
+# Tests for the modules that don't need Blender: python -m pytest tests/headless
+# (ST2/__init__.py imports bpy, so the modules are imported straight from ST2/)
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "ST2"))
+
+
+@pytest.fixture
+def square_font(tmp_path):
+    """A TrueType font with a square "A", a triangle "B" & a "C" drawn exactly like the "A" (which the MESH builder stores as a dupe)"""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    def glyph(*contours):
+        pen = TTGlyphPen(None)
+        for contour in contours:
+            pen.moveTo(contour[0])
+            for pt in contour[1:]:
+                pen.lineTo(pt)
+            pen.closePath()
+        return pen.glyph()
+
+    square = [(100, 0), (100, 600), (700, 600), (700, 0)]
+    counter = [(250, 150), (550, 150), (550, 450), (250, 450)]
+    triangle = [(100, 0), (400, 600), (700, 0)]
+
+    fb = FontBuilder(1000, isTTF=True)
+    fb.setupGlyphOrder([".notdef", "A", "B", "C"])
+    fb.setupCharacterMap({ord("A"): "A", ord("B"): "B", ord("C"): "C"})
+    fb.setupGlyf({".notdef": glyph(), "A": glyph(square, counter), "B": glyph(triangle), "C": glyph(square, counter)})
+    fb.setupHorizontalMetrics({name: (800, 0) for name in fb.font.getGlyphOrder()})
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": "Square", "styleName": "Regular"})
+    fb.setupOS2()
+    fb.setupPost()
+
+    path = tmp_path / "Square.ttf"
+    fb.save(str(path))
+    return path
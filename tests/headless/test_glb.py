@@ -0,0 +1,43 @@
+import numpy as np
+
+import glb
+
+
+def mesh(count=200, seed=0):
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform([-50, 0, -5], [150, 80, 5], (count, 3)).astype(np.float32)
+    normals = rng.normal(size=(count, 3))
+    normals = (normals / np.linalg.norm(normals, axis=1, keepdims=True)).astype(np.float32)
+    indices = rng.integers(0, count, count * 3).astype(np.uint32)
+    return glb.Mesh(positions, normals, None, indices, np.zeros(count, dtype=np.int32), [])
+
+
+def test_round_trip():
+    original = mesh()
+    decoded = glb.decode(glb.encode(original))
+
+    assert np.array_equal(decoded.positions, original.positions)
+    assert np.allclose(decoded.normals, original.normals, atol=1e-6)
+    assert np.array_equal(decoded.indices, original.indices)
+
+
+def test_quantized_round_trip():
+    original = mesh()
+    data = glb.encode(original, quantize=True)
+    assert glb.is_quantized(data)
+    decoded = glb.decode(data)
+
+    # int16 positions across the mesh's extent (200 wide at most), int8 normals
+    extent = (original.positions.max(axis=0) - original.positions.min(axis=0)).max()
+    assert np.abs(decoded.positions - original.positions).max() <= extent / 65535 * 1.01
+    assert np.abs(decoded.normals - original.normals).max() <= 1.5 / 127
+    assert np.array_equal(decoded.indices, original.indices)
+    assert len(data) < len(glb.encode(original))
+
+
+def test_quantize():
+    plain = glb.encode(mesh())
+    quantized = glb.quantize(plain)
+    assert glb.is_quantized(quantized) and not glb.is_quantized(plain)
+    assert glb.quantize(quantized) == quantized
+    assert np.allclose(glb.decode(quantized).positions, glb.decode(plain).positions, atol=0.01)
@@ -0,0 +1,115 @@
+import numpy as np
+from fontTools.ttLib import TTFont
+from fontTools.ttLib.ttFont import registerCustomTableClass
+
+import glb, meshbuilder, meshtable
+
+
+registerCustomTableClass("MESH", meshtable.__name__, "table__M_E_S_H")
+
+
+def save_mesh_font(font_path, output, strikes, graphicType="glb "):
+    """Add a MESH table to a font & read it back; `strikes` is ppem -> {glyphName: (originOffsetX, originOffsetY, meshData)}"""
+    font = TTFont(font_path)
+    table = meshtable.table__M_E_S_H("MESH")
+    for ppem, glyphs in strikes.items():
+        strike = table.strikes[ppem] = meshtable.Strike(ppem=ppem)
+        for name, (x, y, meshData) in glyphs.items():
+            strike.glyphs[name] = meshtable.Glyph(glyphName=name, originOffsetX=x, originOffsetY=y, graphicType=graphicType, meshData=meshData)
+    font["MESH"] = table
+    font.save(output)
+    return TTFont(output)["MESH"]
+
+
+def test_decompile_lazily(square_font, tmp_path):
+    table = save_mesh_font(square_font, tmp_path / "Square-mesh.ttf", {
+        100: {"A": (1, 2, b"small A"), "B": (3, 4, b"small B")},
+        1000: {"A": (10, -20, b"big A")},
+    })
+    assert sorted(table.strikes.keys()) == [100, 1000]
+
+    glyphs = table.strikes[100].glyphs
+    assert "B" in glyphs and not glyphs.glyphs # nothing decompiled until it's looked up
+    glyph = glyphs["B"]
+    assert list(glyphs.glyphs.keys()) == ["B"]
+
+    assert (glyph.originOffsetX, glyph.originOffsetY) == (3, 4)
+    # a slice of the table data, not a copy
+    assert isinstance(glyph.meshData, memoryview) and bytes(glyph.meshData) == b"small B"
+    assert bytes(table.strikes[1000].glyphs["A"].meshData) == b"big A"
+    assert table.strikes[1000].glyphs["A"].originOffsetY == -20
+
+
+def test_compile_decompile_dupes(square_font, tmp_path):
+    mesh_a, mesh_b = b"mesh of A" * 50, b"mesh of B" * 50
+    table = save_mesh_font(square_font, tmp_path / "Square-mesh.ttf", {
+        1000: {"A": (0, 0, mesh_a), "B": (10, -1, mesh_b), "C": (20, -2, mesh_a)}, # "C" is byte-identical to "A"
+    })
+    strike = table.strikes[1000]
+    assert list(strike.glyphs.keys()) == [".notdef", "A", "B", "C"]
+    assert strike.glyphs[".notdef"].graphicType is None # an empty record
+
+    # "C" is stored as a reference to "A", but reads as its own glyph with A's mesh
+    assert strike.glyphs["C"].graphicType == "dupe"
+    assert strike.glyphs["C"].referenceGlyphName == "A"
+    assert (strike.glyphs["C"].originOffsetX, strike.glyphs["C"].originOffsetY) == (20, -2)
+    assert bytes(strike.meshData("C")) == mesh_a
+    assert bytes(strike.meshData("B")) == mesh_b
+
+    # & A's mesh is only stored once
+    assert len(TTFont(tmp_path / "Square-mesh.ttf").reader["MESH"]) < 2 * len(mesh_a) + len(mesh_b)
+
+
+def test_smaller_text_picks_smaller_strike(square_font, tmp_path):
+    table = save_mesh_font(square_font, tmp_path / "Square-mesh.ttf",
+        {ppem: {"A": (0, 0, f"A at {ppem}".encode())} for ppem in (24, 200, 1000)})
+
+    # typesetter.mesh_ppem: the projected size, or None for full detail
+    assert table.strikeForPpem(None).ppem == 1000
+    assert table.strikeForPpem(12).ppem == 24
+    assert table.strikeForPpem(24).ppem == 24
+    assert table.strikeForPpem(60).ppem == 200
+    assert table.strikeForPpem(800).ppem == 1000
+    assert table.strikeForPpem(4000).ppem == 1000
+    assert bytes(table.strikeForPpem(60).meshData("A")) == b"A at 200"
+
+    picked = [table.strikeForPpem(ppem).ppem for ppem in range(1, 2000, 7)]
+    assert picked == sorted(picked)
+
+
+def glyph_glb(width, seed):
+    rng = np.random.default_rng(seed)
+    positions = (rng.uniform(0, 1, (12, 3)) * [width, 6, 0.4]).astype(np.float32)
+    indices = rng.integers(0, 12, 3 * 12).astype(np.uint32)
+    return glb.encode(glb.Mesh(positions, None, None, indices, np.zeros(12, dtype=np.int32), []))
+
+
+def test_compressed_round_trip(square_font, tmp_path):
+    meshes = {"A": glyph_glb(8, 0), "B": glyph_glb(7, 1), "C": glyph_glb(8, 0)}
+    table = save_mesh_font(square_font, tmp_path / "Square-mesh.ttf",
+        {1000: {name: (0, 0, meshData) for name, meshData in meshes.items()}},
+        graphicType=meshtable.COMPRESSED_GRAPHIC_TYPE)
+    strike = table.strikes[1000]
+
+    assert strike.glyphs["A"].graphicType == meshtable.COMPRESSED_GRAPHIC_TYPE
+    assert strike.glyphs["C"].graphicType == "dupe"
+    for name, meshData in meshes.items():
+        # quantized, then handed back as plain GLB
+        assert glb.is_quantized(strike.meshData(name))
+        decoded, original = glb.decode(strike.meshData(name)), glb.decode(meshData)
+        assert np.array_equal(decoded.indices, original.indices)
+        assert np.allclose(decoded.positions, original.positions, atol=8 / 65534 * 1.01)
+
+
+def mesh_table(font_path, tmp_path, **kwargs):
+    output = meshbuilder.build(font_path, tmp_path / "Square-mesh.ttf", workers=1, **kwargs)
+    return TTFont(output)["MESH"]
+
+
+def test_dupes_stored_once(square_font, tmp_path):
+    # the builder dedupes identical outlines, the strike identical payloads
+    table = mesh_table(square_font, tmp_path, extrude=40)
+    strike = table.strikes[1000]
+    assert strike.glyphs["C"].graphicType == "dupe"
+    assert strike.meshData("C") == strike.meshData("A")
+    assert strike.meshData("B") != strike.meshData("A")
@@ -0,0 +1,95 @@
+import pickle
+from types import SimpleNamespace
+
+import pytest
+from fontTools.pens.recordingPen import RecordingPen
+
+import sandbox
+
+
+class Pen(RecordingPen):
+    """Just enough of a coldtype P for pack & unpack: nested leaves with a recording, data, attrs & a tag"""
+
+    def __init__(self, children=()):
+        super().__init__()
+        self.v = SimpleNamespace(value=self.value)
+        self.children = list(children)
+        self._data, self._attrs, self._tag = {}, {}, None
+
+    def __len__(self):
+        return len(self.children)
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def data(self, **kwargs):
+        self._data.update(kwargs)
+        return self
+
+    def tag(self, value):
+        self._tag = value
+        return self
+
+
+def test_pack_keeps_data_attrs_and_tags():
+    leaf = Pen()
+    leaf.moveTo((0, 0))
+    leaf.lineTo((10, 0))
+    leaf.lineTo((0, 10))
+    leaf.closePath()
+    leaf.data(line=1, frame=(0, 0, 10, 12), fn=lambda: None)
+    leaf._attrs = {"default": {"fill": (1, 0, 0, 1)}}
+    leaf.glyphName = "A"
+    p = Pen([leaf]).tag("word")
+
+    packed = pickle.loads(pickle.dumps(sandbox.pack(p)))
+    q = sandbox.unpack(packed, Pen)
+
+    assert q._tag == "word"
+    (copy,) = q
+    assert copy.value == leaf.value
+    assert copy._data == {"line": 1, "frame": (0, 0, 10, 12)} # the function can't be pickled
+    assert copy._attrs == leaf._attrs
+    assert copy.glyphName == "A"
+
+
+def test_snapshot_api():
+    settings = dict(text="Hi", scale=2.0, fvar_axis1=0.25, fvar_axis2=0.75, fea_liga=True, fea_ss01=False, nested=dict(depth=3))
+    st2 = sandbox.Snapshot(settings, dict(text="HI", axes={"wght": {}, "wdth": {}}, font_path=None))
+
+    assert st2.text == "Hi" and st2.scale == 2.0
+    assert st2.nested.depth == 3
+    assert st2.build_text() == "HI"
+    assert st2.variations() == {"wght": 0.25, "wdth": 0.75}
+    assert st2.variations(SimpleNamespace(visible_axes={"opsz": {}})) == {"opsz": 0.25}
+    assert st2.features() == {"liga": True, "ss01": False}
+    assert dict(st2.snapshot())["nested"] == (("depth", 3),)
+
+
+SCRIPT = """
+class Result():
+    def __init__(self, value):
+        self.v = type("V", (), {"value": value})()
+    def __len__(self):
+        return 0
+
+def modify(st2, kwargs):
+    return Result([("moveTo", ((len(st2.build_text()), st2.nested.depth),)),
+        ("lineTo", ((st2.variations()["wght"], kwargs["x"]),))])
+"""
+
+
+def test_worker_runs_modify_with_snapshot():
+    settings = dict(fvar_axis1=0.5, nested=dict(depth=3))
+    job = (("BLOCK", "script", 0), "script", lambda: SCRIPT,
+        (settings, dict(text="Hello", axes={"wght": {}}, font_path=None)),
+        dict(x=7),
+        None)
+
+    try:
+        result = sandbox.Pending(job, None, timeout=30)
+        status, value = result.worker.results.get(timeout=30)
+        assert status == "ok", value
+        assert value[1] == [("moveTo", ((5, 3),)), ("lineTo", ((0.5, 7),))]
+    finally:
+        sandbox.shutdown()
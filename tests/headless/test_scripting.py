@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import scripting
+
+
+class Pen():
+    """Just enough of a coldtype P for Script.run: nested leaves with a recording"""
+
+    def __init__(self, value=None, children=()):
+        self.v = SimpleNamespace(value=value or [])
+        self.children = list(children)
+
+    def __len__(self):
+        return len(self.children)
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def copy(self):
+        return self
+
+
+class Settings():
+    def __init__(self, text):
+        self.text = text
+        self.script_kwargs = ""
+
+    def snapshot(self):
+        return (("script_kwargs", self.script_kwargs),)
+
+    def build_text(self):
+        return self.text
+
+
+def glyph(x):
+    return Pen([("moveTo", ((x, 0),)), ("lineTo", ((x + 1, 0),)), ("lineTo", ((x, 1),)), ("closePath", ())])
+
+
+def counting_script(tmp_path, body="return p"):
+    path = tmp_path / "script.py"
+    path.write_text(f"calls = []\ndef modify(st2, kwargs, p):\n    calls.append(1)\n    {body}\n")
+    scripting.clear()
+    return path, scripting.script_file(path)
+
+
+def test_results_cached(tmp_path):
+    _, script = counting_script(tmp_path)
+    st2, p = Settings("Hello"), Pen(children=[glyph(0)])
+
+    script.run(st2, p, 1)
+    script.run(st2, p, 1)
+    assert len(script.namespace["calls"]) == 1
+
+    script.run(st2, p, 2)
+    assert len(script.namespace["calls"]) == 2
+
+
+def test_text_invalidates_results(tmp_path):
+    # e.g. an edited text file or block, which leaves the settings as they were
+    _, script = counting_script(tmp_path)
+    st2, p = Settings("Hello"), Pen(children=[glyph(0)])
+
+    script.run(st2, p, 1)
+    st2.text = "Hullo"
+    script.run(st2, p, 1)
+    assert len(script.namespace["calls"]) == 2
+
+
+def test_outlines_invalidate_results(tmp_path):
+    # e.g. a font file changed on disk
+    _, script = counting_script(tmp_path)
+    st2 = Settings("Hello")
+
+    first = script.run(st2, Pen(children=[glyph(0)]), 1)
+    second = script.run(st2, Pen(children=[glyph(5)]), 1)
+    assert len(script.namespace["calls"]) == 2
+    assert first.children[0].v.value != second.children[0].v.value
+
+
+def test_edited_file_recompiles(tmp_path):
+    path, script = counting_script(tmp_path)
+    assert scripting.script_file(path) is script
+
+    path.write_text("def modify(st2, kwargs, p):\n    return None\n")
+    edited = scripting.script_file(path)
+    assert edited is not script
+    assert edited.run(Settings("Hello"), Pen(), 1) is None
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+import sources
+
+
+@pytest.mark.parametrize("text", [
+    "One",
+    "One\n\nTwo\n\nThree",
+    "One\nstill one\n\nTwo\n\n\n\nFour",
+    "\n\nTwo\n\n",
+    "",
+])
+def test_paragraphs(text):
+    source = sources.TextSource(None, text)
+    expected = text.split("\n\n")
+    assert [text[start:end] for start, end in source.paragraphs] == expected
+
+    for index in range(1, len(expected) + 1):
+        assert source.paragraph(index) == expected[index-1]
+    # past the end: the last paragraph
+    assert source.paragraph(len(expected) + 5) == expected[-1]
+
+
+def test_text_file_reread_when_changed(tmp_path):
+    path = tmp_path / "text.txt"
+    path.write_text("One\n\nTwo")
+    sources.clear()
+
+    source = sources.text_file(path)
+    assert source.paragraph(2) == "Two"
+    assert sources.text_file(path) is source
+
+    path.write_text("One\n\nTwo, edited\n\nThree")
+    edited = sources.text_file(path)
+    assert edited is not source
+    assert edited.paragraph(2) == "Two, edited"
+
+    sources.clear("FILE", path)
+    assert sources.text_file(path) is not edited
+
+
+def test_edited_resplits_around_the_edit():
+    rng = random.Random(0)
+    alphabet = ["a", "b", " ", "\n", "\n\n"]
+    text = "".join(rng.choice(alphabet) for _ in range(3000))
+    source = sources.TextSource(None, text)
+
+    for _ in range(300):
+        start = rng.randrange(len(text) + 1)
+        end = min(len(text), start + rng.choice([0, 1, 2, 5, 50]))
+        inserted = "".join(rng.choice(alphabet) for _ in range(rng.choice([0, 1, 2, 6])))
+        text = text[:start] + inserted + text[end:]
+
+        source = source.edited(None, text)
+        assert source.paragraphs == sources.TextSource(None, text).paragraphs
+        assert [source.paragraph(i+1) for i in range(len(source.paragraphs))] == text.split("\n\n")
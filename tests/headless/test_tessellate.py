@@ -0,0 +1,149 @@
+import numpy as np
+import pytest
+from fontTools.pens.recordingPen import RecordingPen
+
+import tessellate
+
+
+def rect(pen, x, y, w, h, clockwise=False):
+    points = [(x, y), (x+w, y), (x+w, y+h), (x, y+h)]
+    if clockwise:
+        points.reverse()
+    pen.moveTo(points[0])
+    for pt in points[1:]:
+        pen.lineTo(pt)
+    pen.closePath()
+
+
+def triangle_areas(outline):
+    p, t = outline.points, outline.triangulate()
+    return 0.5 * tessellate.cross(p[t[:, 0]], p[t[:, 1]], p[t[:, 2]])
+
+
+def outline(recording):
+    return tessellate.Outline(tessellate.flatten_recording(recording, 0.5))
+
+
+# TrueType outers run clockwise, CFF ones counter-clockwise
+@pytest.mark.parametrize("truetype", [False, True])
+@pytest.mark.parametrize("tail, area", [
+    (10, 100*100 - 60*60 + 20*30), # overlaps the bottom of the "C" only
+    (40, 100*100 - 60*60 + 20*30 + 20*20), # reaches through into the counter
+])
+def test_overlapping_components(truetype, tail, area):
+    # a base glyph with a counter & a "cedilla" component drawn over it, as decomposed accented glyphs are
+    pen = RecordingPen()
+    rect(pen, 0, 0, 100, 100, clockwise=truetype)
+    rect(pen, 20, 20, 60, 60, clockwise=not truetype)
+    rect(pen, 40, -30, 20, 30 + tail, clockwise=truetype)
+
+    areas = triangle_areas(outline(pen.value))
+    assert (areas > -1e-9).all()
+    assert areas.sum() == pytest.approx(area)
+
+
+def test_bar_across_counter():
+    # e.g. a barred o: the bar splits the counter in two
+    pen = RecordingPen()
+    rect(pen, 0, 0, 100, 100)
+    rect(pen, 20, 20, 60, 60, clockwise=True)
+    rect(pen, -10, 40, 120, 20)
+
+    o = outline(pen.value)
+    areas = triangle_areas(o)
+    assert (areas > -1e-9).all()
+    assert areas.sum() == pytest.approx(100*100 - 2*60*20 + 2*10*20)
+    assert len([i for i in range(len(o.rings)) if i in o.parents]) == 2
+
+
+def test_overlapping_curves():
+    # two overlapping discs: the area of their union
+    def disc(pen, cx, cy, r):
+        k = 0.5523 * r # Bezier circle handles
+        pen.moveTo((cx + r, cy))
+        pen.curveTo((cx + r, cy + k), (cx + k, cy + r), (cx, cy + r))
+        pen.curveTo((cx - k, cy + r), (cx - r, cy + k), (cx - r, cy))
+        pen.curveTo((cx - r, cy - k), (cx - k, cy - r), (cx, cy - r))
+        pen.curveTo((cx + k, cy - r), (cx + r, cy - k), (cx + r, cy))
+        pen.closePath()
+
+    pen = RecordingPen()
+    disc(pen, 0, 0, 100)
+    disc(pen, 100, 0, 100)
+    areas = triangle_areas(tessellate.Outline(tessellate.flatten_recording(pen.value, 0.01)))
+
+    r, d = 100, 100
+    lens = 2 * r**2 * np.arccos(d / (2*r)) - d/2 * np.sqrt(4*r**2 - d**2)
+    assert (areas > -1e-9).all()
+    assert areas.sum() == pytest.approx(2 * np.pi * r**2 - lens, rel=1e-3)
+
+
+@pytest.mark.parametrize("extrude, bevel", [(0, 0), (10, 0), (10, 2)])
+def test_triangle_count(extrude, bevel):
+    pen = RecordingPen()
+    rect(pen, 0, 0, 100, 100, clockwise=True)
+    rect(pen, 20, 20, 60, 60)
+    rect(pen, 40, -30, 20, 70, clockwise=True)
+
+    o = outline(pen.value)
+    assert tessellate.triangle_count(o, extrude, bevel) == len(tessellate.extrude(o, extrude, bevel)[1])
+
+
+def test_budgeted_cap():
+    pen = RecordingPen()
+    pen.moveTo((0, 0))
+    pen.curveTo((0, 200), (300, 200), (300, 0))
+    pen.curveTo((300, -200), (0, -200), (0, 0))
+    pen.closePath()
+
+    for max_triangles in [400, 100, 40]:
+        o, = tessellate.budgeted([pen.value], 0.0001, 10, 2, max_triangles=max_triangles)
+        assert len(tessellate.extrude(o, 10, 2)[1]) <= max_triangles
+
+
+def closed_edges(triangles):
+    """Whether every directed edge has its reverse in another triangle, i.e. a closed mesh with consistent winding"""
+    edges = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]])
+    directed = set(map(tuple, edges))
+    return len(directed) == len(edges) and all((b, a) in directed for a, b in directed)
+
+
+@pytest.mark.parametrize("truetype", [False, True])
+@pytest.mark.parametrize("bevel", [0, 2])
+def test_extrude_winding(truetype, bevel):
+    # whichever way the contours run, the extruded glyph is closed & faces outwards
+    pen = RecordingPen()
+    rect(pen, 0, 0, 100, 100, clockwise=truetype)
+    rect(pen, 20, 20, 60, 60, clockwise=not truetype)
+
+    o = outline(pen.value)
+    assert triangle_areas(o).sum() == pytest.approx(100*100 - 60*60)
+
+    positions, triangles = tessellate.extrude(o, 10, bevel)
+    assert closed_edges(triangles)
+
+    v = positions[triangles].astype(np.float64)
+    volume = np.einsum("ij,ij->i", v[:, 0], np.cross(v[:, 1], v[:, 2])).sum() / 6
+    if bevel:
+        assert volume > (100*100 - 60*60) * 2 * 10
+    else:
+        assert volume == pytest.approx((100*100 - 60*60) * 2 * 10)
+
+
+@pytest.mark.parametrize("max_parts", [0, 3])
+def test_convex_parts_of_bridged_rings(max_parts):
+    # the counters are bridged into the outer ring, which repeats the bridges' vertices
+    pen = RecordingPen()
+    rect(pen, 0, 0, 100, 100)
+    rect(pen, 20, 20, 25, 60, clockwise=True)
+    rect(pen, 55, 20, 25, 60, clockwise=True)
+
+    parts = tessellate.convex_parts(outline(pen.value), max_parts)
+    for part in parts:
+        assert len(np.unique(part, axis=0)) == len(part)
+        assert tessellate.is_convex(part)
+        assert tessellate.signed_area(part) > 0
+    if max_parts:
+        assert len(parts) <= max_parts
+    else:
+        assert sum(tessellate.signed_area(part) for part in parts) == pytest.approx(100*100 - 2*25*60)
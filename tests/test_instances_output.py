@@ -0,0 +1,22 @@
+from .common import * #INLINE
+
+@b3d_runnable()
+def test_instances_output(bw:BpyWorld):
+    from ST2 import instancing
+
+    to = common(bw)
+    to.obj.st2.text = "Hello"
+    to.obj.st2.output_mode = "INSTANCES"
+
+    instancer = bpy.context.object
+    assert instancing.is_instancer(instancer)
+    assert len(instancer.data.vertices) == 5, "a point per glyph"
+    assert list(attribute(instancer, "char_index")) == [0, 1, 2, 3, 4]
+
+    outlines = attribute(instancer, instancing.OUTLINE_ATTRIBUTE)
+    assert outlines[2] == outlines[3], "both l's share a prototype"
+    assert len(set(outlines)) == 4
+
+    instancer.st2.text = "Hell"
+    assert bpy.context.object == instancer, "only the points are rewritten"
+    assert len(instancer.data.vertices) == 4
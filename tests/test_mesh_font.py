@@ -0,0 +1,27 @@
+from .common import * #INLINE
+
+@b3d_runnable()
+def test_mesh_font(bw:BpyWorld):
+    from pathlib import Path
+    from ST2 import meshbuilder
+
+    to = common(bw)
+    # combine_glyphs stays at its default; a MESH font's glyphs are placed one by one regardless
+    assert to.obj.st2.combine_glyphs
+
+    mesh_font = meshbuilder.build(nickel.path, Path(bpy.app.tempdir) / "Nickel-mesh.ttf", extrude=40, workers=1)
+    to.obj.st2.use_mesh = True
+    to.obj.st2.font_path = str(mesh_font)
+    to.obj.st2.text = "Hello"
+
+    empty = bpy.context.object
+    assert empty.type == "EMPTY"
+
+    glyphs = sorted(empty.children, key=lambda o: int(o.name.split(".")[-1]))
+    assert len(glyphs) == 5, "one instance per glyph"
+    assert all(g.type == "MESH" for g in glyphs)
+    assert glyphs[2].data == glyphs[3].data, "both l's share a prototype mesh"
+    assert glyphs[0].location.x < glyphs[1].location.x < glyphs[4].location.x
+
+    empty.st2.text = "Hell"
+    assert len(empty.children) == 4
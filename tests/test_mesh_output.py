@@ -0,0 +1,28 @@
+from .common import * #INLINE
+
+@b3d_runnable()
+def test_mesh_output(bw:BpyWorld):
+    to = common(bw)
+    to.obj.data.extrude = 0.1
+    to.obj.st2.text = "Hello¶World"
+    to.obj.st2.output_mode = "MESH"
+
+    mesh = bpy.context.object
+    assert mesh.type == "MESH"
+    assert mesh.st2.mesh_extrude == pytest.approx(0.1), "starts from the curve's extrude"
+    assert len(mesh.data.polygons) > 0
+
+    # combine_glyphs is on by default, but every triangle still knows its glyph
+    assert mesh.st2.combine_glyphs
+    assert set(attribute(mesh, "glyph_index")) == set(range(10))
+    assert set(attribute(mesh, "line")) == {0, 1}
+    assert set(attribute(mesh, "char_index")) == set(range(11)) - {5}
+
+    mesh.st2.text = "Hello"
+    assert bpy.context.object == mesh, "edited in place"
+    assert set(attribute(mesh, "glyph_index")) == set(range(5))
+
+    mesh.st2.output_mode = "CURVE"
+    curve = bpy.context.object
+    assert curve.type == "CURVE"
+    assert curve.data.extrude == pytest.approx(0.1), "carries the extrude back"